@@ -0,0 +1,218 @@
+"""
+Benchmark dos Page Objects contra o servidor mock (servidor_mock.py).
+
+Para cada caso (casos.py), abre o portal mock num Chromium local, executa as
+etapas (metodos dos Page Objects) e mede cada uma. Com --repeticoes N, reporta
+mediana/min/max por etapa e, quando o fluxo tem Espera, quanto tempo foi gasto
+em cada tipo de espera - combinado com --latencia-api-ms mostra quais esperas
+dominam conforme o servidor fica lento.
+
+Cada execucao e gravada em benchmark/resultados/historico.jsonl com o commit
+atual; a tabela final compara com a ultima execucao de outro commit na mesma
+configuracao de latencia.
+
+Uso:
+    python benchmark/bench.py
+    python benchmark/bench.py --casos iaf,car --repeticoes 5 --latencia-api-ms 800
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from casos import CASOS, RAIZ_REPO, ativar_fluxo, importar
+from servidor_mock import ConfigLatencia, ServidorMock
+
+logger = logging.getLogger("benchmark")
+
+ARQUIVO_HISTORICO = os.path.join(os.path.dirname(__file__), "resultados", "historico.jsonl")
+
+
+# ── Execucao ──────────────────────────────────────────────────────────
+
+async def executar_caso(browser, servidor: ServidorMock, caso) -> dict:
+    """Uma repeticao do caso: contexto limpo, portal aberto e etapas cronometradas."""
+    ativar_fluxo(caso.fluxo)
+    context = await browser.new_context(locale="pt-BR", accept_downloads=True)
+    page = await context.new_page()
+    page.set_default_timeout(30000)
+
+    tempos, erros = {}, {}
+    try:
+        inicio = time.perf_counter()
+        await page.goto(servidor.url(caso.portal), wait_until="domcontentloaded")
+        tempos["goto"] = (time.perf_counter() - inicio) * 1000
+
+        for nome, etapa in caso.etapas(page):
+            inicio = time.perf_counter()
+            try:
+                await etapa()
+            except Exception as e:
+                erros[nome] = f"{type(e).__name__}: {e}"
+            tempos[nome] = (time.perf_counter() - inicio) * 1000
+
+        esperas = {}
+        try:
+            esperas = importar("workflow.components.espera").Espera.da_pagina(page).resumo()
+        except ImportError:
+            pass  # Fluxo sem o componente de esperas
+    finally:
+        await context.close()
+
+    return {"tempos": tempos, "erros": erros, "esperas": esperas}
+
+
+def _agregar(caso: str, repeticoes: list) -> dict:
+    """Mediana/min/max por etapa e tempo de espera por condicao (soma das repeticoes / n)."""
+    etapas = {}
+    for nome in repeticoes[0]["tempos"]:
+        valores = [r["tempos"][nome] for r in repeticoes if nome in r["tempos"]]
+        etapas[f"{caso}.{nome}"] = {
+            "mediana_ms": round(statistics.median(valores), 1),
+            "min_ms": round(min(valores), 1),
+            "max_ms": round(max(valores), 1),
+        }
+
+    esperas = {}
+    for r in repeticoes:
+        for detalhe in r["esperas"].get("detalhes", []):
+            chave = f"{caso}.{detalhe.get('condicao')}"
+            esperas[chave] = esperas.get(chave, 0) + detalhe.get("decorrido_ms", 0) / len(repeticoes)
+
+    erros = {f"{caso}.{k}": v for r in repeticoes for k, v in r["erros"].items()}
+    return {"etapas": etapas, "esperas": {k: round(v, 1) for k, v in esperas.items()}, "erros": erros}
+
+
+async def executar(nomes: list, repeticoes: int, latencia: ConfigLatencia) -> dict:
+    resultado = {"etapas": {}, "esperas": {}, "erros": {}}
+    async with ServidorMock(latencia) as servidor:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                for nome in nomes:
+                    caso = CASOS[nome]
+                    logger.info(f"Caso '{nome}' ({caso.fluxo}) x{repeticoes}...")
+                    execucoes = [await executar_caso(browser, servidor, caso) for _ in range(repeticoes)]
+                    agregado = _agregar(nome, execucoes)
+                    for chave in resultado:
+                        resultado[chave].update(agregado[chave])
+            finally:
+                await browser.close()
+    return resultado
+
+
+# ── Historico entre commits ───────────────────────────────────────────
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=RAIZ_REPO, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def montar_registro(resultado: dict, latencia: ConfigLatencia, repeticoes: int) -> dict:
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD") or "desconhecido",
+        "alteracoes_locais": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "latencia": latencia.resumo(),
+        "repeticoes": repeticoes,
+        **resultado,
+    }
+
+
+def gravar(registro: dict):
+    os.makedirs(os.path.dirname(ARQUIVO_HISTORICO), exist_ok=True)
+    with open(ARQUIVO_HISTORICO, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+def referencia_anterior(registro: dict):
+    """Ultima execucao de outro commit com a mesma latencia (base de comparacao)."""
+    if not os.path.exists(ARQUIVO_HISTORICO):
+        return None
+    anterior = None
+    with open(ARQUIVO_HISTORICO, "r", encoding="utf-8") as f:
+        for linha in f:
+            try:
+                r = json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+            if r.get("commit") != registro["commit"] and r.get("latencia") == registro["latencia"]:
+                anterior = r
+    return anterior
+
+
+def imprimir(registro: dict, anterior: dict):
+    base = anterior["etapas"] if anterior else {}
+    titulo_base = f"vs {anterior['commit']}" if anterior else "sem base"
+    print(f"\nCommit {registro['commit']}{' (+alteracoes)' if registro['alteracoes_locais'] else ''} | "
+          f"latencia {registro['latencia']} | {registro['repeticoes']} repeticao(oes)")
+    print(f"{'etapa':<48} {'mediana':>10} {'min':>10} {'max':>10} {titulo_base:>14}")
+    for nome, t in registro["etapas"].items():
+        delta = ""
+        if nome in base:
+            diferenca = t["mediana_ms"] - base[nome]["mediana_ms"]
+            delta = f"{diferenca:+.0f} ms"
+        print(f"{nome:<48} {t['mediana_ms']:>10.0f} {t['min_ms']:>10.0f} {t['max_ms']:>10.0f} {delta:>14}")
+
+    if registro["esperas"]:
+        print("\nTempo medio por espera (Espera):")
+        for nome, ms in sorted(registro["esperas"].items(), key=lambda kv: -kv[1]):
+            print(f"  {nome:<46} {ms:>10.0f} ms")
+
+    for nome, erro in registro["erros"].items():
+        print(f"ERRO {nome}: {erro}")
+
+
+def _argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos Page Objects contra o servidor mock.")
+    parser.add_argument("--casos", default=",".join(CASOS), help=f"Lista separada por virgula ({', '.join(CASOS)})")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--latencia-ms", type=int, default=0)
+    parser.add_argument("--latencia-api-ms", type=int, default=0)
+    parser.add_argument("--jitter-ms", type=int, default=0)
+    parser.add_argument("--sem-historico", action="store_true", help="Nao grava em resultados/historico.jsonl")
+    parser.add_argument("--verbose", action="store_true", help="Mostra os logs dos Page Objects")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = _argumentos()
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    logger.setLevel(logging.INFO)
+
+    nomes = [n.strip() for n in args.casos.split(",") if n.strip()]
+    desconhecidos = [n for n in nomes if n not in CASOS]
+    if desconhecidos:
+        raise SystemExit(f"Casos desconhecidos: {desconhecidos}. Opcoes: {list(CASOS)}")
+
+    latencia = ConfigLatencia(args.latencia_ms, args.latencia_api_ms, args.jitter_ms)
+    resultado = asyncio.run(executar(nomes, args.repeticoes, latencia))
+
+    registro = montar_registro(resultado, latencia, args.repeticoes)
+    anterior = referencia_anterior(registro)
+    if not args.sem_historico:
+        gravar(registro)
+
+    imprimir(registro, anterior)
+
+
+if __name__ == "__main__":
+    main()
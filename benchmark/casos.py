@@ -0,0 +1,119 @@
+"""
+Casos do benchmark: cada caso abre um portal do servidor mock e executa, em
+ordem, metodos de Page Objects de um fluxo. Cada etapa e cronometrada
+separadamente pelo bench.py.
+
+Os fluxos tem pacotes `workflow` homonimos, entao o Page Object e importado
+so depois de ativar_fluxo() trocar a raiz do fluxo no sys.path.
+"""
+
+import importlib
+import os
+import sys
+import tempfile
+
+RAIZ_REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def ativar_fluxo(fluxo: str):
+    """Deixa `import workflow...` apontando para a raiz do fluxo indicado."""
+    for nome in [m for m in sys.modules if m == "workflow" or m.startswith("workflow.")]:
+        del sys.modules[nome]
+    raizes = {os.path.join(RAIZ_REPO, c.fluxo) for c in CASOS.values()}
+    sys.path[:] = [p for p in sys.path if p not in raizes]
+    sys.path.insert(0, os.path.join(RAIZ_REPO, fluxo))
+
+
+def importar(modulo: str):
+    return importlib.import_module(modulo)
+
+
+class Caso:
+    """Portal do mock + fluxo dono dos Page Objects + etapas(page) -> [(nome, coroutine_fn)]."""
+
+    def __init__(self, nome: str, fluxo: str, portal: str, etapas):
+        self.nome = nome
+        self.fluxo = fluxo
+        self.portal = portal
+        self.etapas = etapas
+
+
+# ── Etapas por portal ─────────────────────────────────────────────────
+
+def _etapas_iaf(page):
+    iaf = importar("workflow.pages.iaf_page").IAFPage(page)
+    return [
+        ("aguardar_carregamento", iaf.aguardar_carregamento),
+        ("extrair_panorama", iaf.extrair_panorama),
+        ("extrair_pilares", iaf.extrair_pilares),
+        ("extrair_indicadores", iaf.extrair_indicadores),
+        ("extrair_data_atualizacao", iaf.extrair_data_atualizacao),
+        ("extrair_painel", iaf.extrair_painel),
+    ]
+
+
+def _etapas_sgi(page):
+    ranking = importar("workflow.pages.loja.ranking_vendas_page").RankingVendasPage(page)
+    return [
+        ("preencher_estrutura", ranking.preencher_estrutura),
+        ("selecionar_ciclos", lambda: ranking.selecionar_ciclos("202601", "202602")),
+        ("preencher_filtros_adicionais", ranking.preencher_filtros_adicionais),
+        ("buscar", ranking.buscar),
+        ("extrair_tabela", ranking.extrair_tabela),
+    ]
+
+
+def _etapas_cns(page):
+    logger = importar("workflow.components.wide_logger").WideLogger("benchmark")
+    boletos = importar("workflow.pages.portalBoletos").PortalBoletosPage(page, logger)
+    destino = tempfile.mkdtemp(prefix="bench_cns_")
+    return [
+        ("fill_dates", lambda: boletos.fill_dates("01/03/2026", "31/05/2026")),
+        ("click_filtrar", boletos.click_filtrar),
+        ("export_to_json", lambda: boletos.export_to_json(destino)),
+    ]
+
+
+def _etapas_car(page):
+    logger = importar("workflow.components.wide_logger").WideLogger("benchmark")
+    car = importar("workflow.pages.calendarioCar").CalendarioCarPage(page, logger)
+    return [
+        ("select_filters", lambda: car.select_filters("13406", 3, 2026)),
+        ("click_buscar", car.click_buscar),
+        ("extract_calendar_data", car.extract_calendar_data),
+    ]
+
+
+def _etapas_retaguarda(page):
+    retaguarda = importar("workflow.pages.retaguarda").RetaguardaPage(page)
+    produtos = [
+        {"produto": "250589", "quantidade": "2"},
+        {"produto": "250590", "quantidade": "1"},  # sem resultado no mock
+        {"produto": "250591", "quantidade": "8"},  # sem saldo no mock
+    ]
+    return [
+        ("preencher_cabecalho_baixa", lambda: retaguarda.preencher_cabecalho_baixa("CP8374_2026-03-16.xls", "Avarias")),
+        ("iterar_produtos_guia", lambda: retaguarda.iterar_produtos_guia(produtos)),
+        ("gravar_requisicao", retaguarda.gravar_requisicao),
+    ]
+
+
+def _etapas_tangerino(page):
+    solides = importar("workflow.pages.solides").SolidesPage(page)
+    return [
+        ("selecionar_filial_select2", lambda: solides.selecionar_filial_select2("Matriz")),
+        ("preencher_datas", lambda: solides.preencher_datas("01/03/2026", "31/03/2026")),
+        ("selecionar_formato_excel", solides.selecionar_formato_excel),
+    ]
+
+
+CASOS = {
+    c.nome: c for c in (
+        Caso("iaf", "flow_envio_iaf", "iaf", _etapas_iaf),
+        Caso("sgi", "flow_envio_resultados_vd", "sgi", _etapas_sgi),
+        Caso("cns", "flow_envio_recebimentos_pagamentos", "cns", _etapas_cns),
+        Caso("car", "flow_envio_recebimentos_pagamentos", "car", _etapas_car),
+        Caso("retaguarda", "flow_financeiro/baixas", "retaguarda", _etapas_retaguarda),
+        Caso("tangerino", "flow_rh/scrape_solides", "tangerino", _etapas_tangerino),
+    )
+}
@@ -0,0 +1,253 @@
+"""
+Servidor local que imita os portais usados pelos Page Objects.
+
+Serve fixtures HTML/JS (benchmark/fixtures) com as mesmas estruturas que os
+Page Objects procuram, e APIs JSON que essas fixtures consultam via fetch:
+
+  /iaf          -> #IAFConsolidatedIndicators (ant-table), pilares e rankings Flora
+  /sgi          -> #ContentPlaceHolder1_grdRankingVendas + loader #UpdateProgress1
+  /cns          -> #ctl00_ContentBody_gvBRW paginado por __doPostBack (form POST)
+  /car          -> comboboxes Flora + [data-testid=calendar]
+  /retaguarda   -> dropdowns Flora, modal de produto e botao Gravar
+  /tangerino    -> selects Select2 (filial e formato) e datas Wicket
+
+Latencia configuravel para ver quais esperas dominam:
+  --latencia-ms      atraso de toda resposta (documentos e APIs)
+  --latencia-api-ms  atraso extra das APIs (/api/*), o que os loaders/spinners esperam
+  --jitter-ms        variacao aleatoria somada aos atrasos
+
+Uso isolado (para abrir no navegador):
+    python benchmark/servidor_mock.py --porta 8765 --latencia-api-ms 800
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+PORTAIS = ("iaf", "sgi", "car", "retaguarda", "tangerino")
+
+LINHAS_CNS = 57
+LINHAS_POR_PAGINA_CNS = 20
+
+
+class ConfigLatencia:
+    """Atrasos aplicados pelo middleware (em ms)."""
+
+    def __init__(self, latencia_ms: int = 0, latencia_api_ms: int = 0, jitter_ms: int = 0):
+        self.latencia_ms = latencia_ms
+        self.latencia_api_ms = latencia_api_ms
+        self.jitter_ms = jitter_ms
+
+    def atraso_s(self, caminho: str) -> float:
+        atraso = self.latencia_ms
+        if caminho.startswith("/api/"):
+            atraso += self.latencia_api_ms
+        if self.jitter_ms:
+            atraso += random.randint(0, self.jitter_ms)
+        return atraso / 1000
+
+    def resumo(self) -> dict:
+        return {
+            "latencia_ms": self.latencia_ms,
+            "latencia_api_ms": self.latencia_api_ms,
+            "jitter_ms": self.jitter_ms,
+        }
+
+
+@web.middleware
+async def _middleware_latencia(request, handler):
+    atraso = request.app["latencia"].atraso_s(request.path)
+    if atraso:
+        await asyncio.sleep(atraso)
+    return await handler(request)
+
+
+# ── Portais estaticos ─────────────────────────────────────────────────
+
+async def _portal(request):
+    nome = request.match_info["portal"]
+    if nome not in PORTAIS:
+        raise web.HTTPNotFound()
+    return web.FileResponse(os.path.join(DIRETORIO_FIXTURES, f"{nome}.html"))
+
+
+# ── APIs consultadas pelas fixtures ───────────────────────────────────
+
+def _indicadores_iaf() -> list:
+    nomes = [
+        "Venda Total", "Venda Digital", "Ticket Médio", "Itens por Atendimento",
+        "Base Ativa", "Recompra", "NPS", "Estoque Saudável",
+        "Treinamentos", "Auditoria", "Ruptura", "Cadastro de Clientes",
+    ]
+    return [
+        {
+            "nome": nome,
+            "habilitador": "Sim" if i % 3 else "Não",
+            "realizado": f"{90 + i},{i}0%",
+            "atingimento": f"{20 + i} pts\n{95 + i}%",
+            "meta": f"{30 + i} pts\n{100 + i}%",
+            "falta_meta": f"{10 - i % 5} pts\n{5 + i}%",
+        }
+        for i, nome in enumerate(nomes)
+    ]
+
+
+async def _api_iaf_summary(request):
+    return web.json_response({
+        "updatedAt": "2026-02-23T09:56:06",
+        "score": 587.3,
+        "rankings": {"Brasil": "152º", "Regional": "12º", "Clube": "3º"},
+        "pillars": [
+            {"name": "Vendas", "points": "210,50 pts", "goal": "Meta: 300 pts", "achievement": "70,17%", "missing": "89,50 pts"},
+            {"name": "Clientes", "points": "180,00 pts", "goal": "Meta: 250 pts", "achievement": "72,00%", "missing": "70,00 pts"},
+            {"name": "Operação", "points": "196,80 pts", "goal": "Meta: 365 pts", "achievement": "53,92%", "missing": "168,20 pts"},
+        ],
+        "indicators": _indicadores_iaf(),
+    })
+
+
+async def _api_sgi_ranking(request):
+    linhas = [
+        [f"GERENCIA {i:02d}", str(100 + i), str(10 + i), f"{1000 + i * 37},00", f"{i * 1234 + 56:,}".replace(",", ".") + ",78", f"{i * 999:,}".replace(",", ".") + ",00"]
+        for i in range(1, 16)
+    ]
+    return web.json_response({"linhas": linhas})
+
+
+async def _api_car_calendario(request):
+    mes = int(request.query.get("mes", 1))
+    ano = int(request.query.get("ano", 2026))
+    dias = [
+        {"data": f"{d:02d}-{mes:02d}-{ano}", "valor": f"R$ {d * 123},45", "status": "PAID" if d < 15 else "SCHEDULED", "titulos": f"{d % 4 + 1} títulos"}
+        for d in range(1, 29)
+        if d % 3
+    ]
+    return web.json_response({
+        "total_recebimentos": "R$ 12.345,67",
+        "total_agendamentos": "R$ 8.901,23",
+        "dias": dias,
+    })
+
+
+async def _api_retaguarda_produtos(request):
+    termo = request.query.get("q", "")
+    # Codigos terminados em 0 "nao existem", para exercitar o caminho sem resultado
+    if not termo or termo.endswith("0"):
+        return web.json_response({"produtos": []})
+    return web.json_response({"produtos": [{"codigo": termo, "descricao": f"PRODUTO {termo}"}]})
+
+
+async def _api_retaguarda_gravar(request):
+    return web.json_response({"ok": True})
+
+
+async def _api_tangerino_ajax(request):
+    return web.json_response({"ok": True})
+
+
+# ── CNS (ASP.NET GridView com postback) ───────────────────────────────
+
+def _html_cns(pagina: int, com_grid: bool) -> str:
+    with open(os.path.join(DIRETORIO_FIXTURES, "cns.html"), "r", encoding="utf-8") as f:
+        modelo = f.read()
+
+    if not com_grid:
+        return modelo.replace("<!--GRID-->", "")
+
+    total_paginas = -(-LINHAS_CNS // LINHAS_POR_PAGINA_CNS)
+    inicio = (pagina - 1) * LINHAS_POR_PAGINA_CNS
+    linhas = [
+        '<tr class="GridHeader"><th>Funções</th><th>Nosso Número</th><th>Vencimento</th>'
+        '<th>Valor</th><th>Situação</th></tr>'
+    ]
+    for i in range(inicio, min(inicio + LINHAS_POR_PAGINA_CNS, LINHAS_CNS)):
+        linhas.append(
+            f'<tr><td><img alt=""/></td><td><span>{900000 + i}</span></td>'
+            f'<td>{(i % 28) + 1:02d}/03/2026</td><td><span>{i * 10 + 5},00</span></td><td>Aberto</td></tr>'
+        )
+    paginador = "".join(
+        f"<td><span>{p}</span></td>" if p == pagina
+        else f"<td><a href=\"javascript:__doPostBack('ctl00$ContentBody$gvBRW','Page${p}')\">{p}</a></td>"
+        for p in range(1, total_paginas + 1)
+    )
+    linhas.append(f'<tr class="GridPager"><td colspan="5"><table><tr>{paginador}</tr></table></td></tr>')
+    grid = f'<table id="ctl00_ContentBody_gvBRW"><tbody>{"".join(linhas)}</tbody></table>'
+    return modelo.replace("<!--GRID-->", grid)
+
+
+async def _cns(request):
+    com_grid, pagina = False, 1
+    if request.method == "POST":
+        form = await request.post()
+        com_grid = True
+        argumento = form.get("__EVENTARGUMENT", "")
+        if argumento.startswith("Page$"):
+            pagina = int(argumento.split("$", 1)[1])
+    return web.Response(text=_html_cns(pagina, com_grid), content_type="text/html")
+
+
+# ── Aplicacao ─────────────────────────────────────────────────────────
+
+def criar_app(latencia: ConfigLatencia = None) -> web.Application:
+    app = web.Application(middlewares=[_middleware_latencia])
+    app["latencia"] = latencia or ConfigLatencia()
+    app.router.add_get("/api/iaf/summary", _api_iaf_summary)
+    app.router.add_get("/api/sgi/ranking", _api_sgi_ranking)
+    app.router.add_get("/api/car/calendario", _api_car_calendario)
+    app.router.add_get("/api/retaguarda/produtos", _api_retaguarda_produtos)
+    app.router.add_post("/api/retaguarda/gravar", _api_retaguarda_gravar)
+    app.router.add_post("/api/tangerino/ajax", _api_tangerino_ajax)
+    app.router.add_route("*", "/cns", _cns)
+    app.router.add_get("/{portal}", _portal)
+    return app
+
+
+class ServidorMock:
+    """Sobe o servidor no loop atual (usado pelo bench.py)."""
+
+    def __init__(self, latencia: ConfigLatencia = None, porta: int = 0):
+        self.latencia = latencia or ConfigLatencia()
+        self.porta = porta
+        self._runner = None
+
+    async def __aenter__(self):
+        self._runner = web.AppRunner(criar_app(self.latencia))
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", self.porta)
+        await site.start()
+        # Porta 0 = porta livre escolhida pelo sistema
+        self.porta = site._server.sockets[0].getsockname()[1]
+        logger.info(f"Servidor mock em {self.url('')} ({self.latencia.resumo()})")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._runner.cleanup()
+
+    def url(self, caminho: str) -> str:
+        return f"http://127.0.0.1:{self.porta}/{caminho.lstrip('/')}"
+
+
+def _argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor mock dos portais.")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia-ms", type=int, default=int(os.environ.get("MOCK_LATENCIA_MS", 0)))
+    parser.add_argument("--latencia-api-ms", type=int, default=int(os.environ.get("MOCK_LATENCIA_API_MS", 0)))
+    parser.add_argument("--jitter-ms", type=int, default=int(os.environ.get("MOCK_JITTER_MS", 0)))
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stdout)
+    args = _argumentos()
+    latencia = ConfigLatencia(args.latencia_ms, args.latencia_api_ms, args.jitter_ms)
+    logger.info(f"Portais: {', '.join(PORTAIS + ('cns',))} | latencia: {json.dumps(latencia.resumo())}")
+    web.run_app(criar_app(latencia), host="127.0.0.1", port=args.porta)
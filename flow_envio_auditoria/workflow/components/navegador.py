@@ -5,17 +5,23 @@ Módulo para configuração do navegador Playwright com técnicas de evasão (St
 from playwright.async_api import async_playwright
 import logging
 
+from workflow.components.gravacao_har import GravacaoHar, modo_har
+from workflow.components.bloqueio_recursos import BloqueadorRecursos, resolver_perfil
+
 logger = logging.getLogger(__name__)
 
 # User-Agent moderno para evitar detecção
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
 
 class Navegador:
-    def __init__(self):
+    def __init__(self, perfil_bloqueio: str = None):
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
+        self.perfil_bloqueio = resolver_perfil(perfil_bloqueio)
+        self.bloqueador = None
+        self.har = GravacaoHar(modo_har()) if modo_har() else None
 
     async def setup_browser(self):        
         logger.info("Iniciando browser (Modo: Stealth)...")
@@ -35,33 +41,51 @@ class Navegador:
             "--disable-extensions",
         ]
 
-        self.browser = await self.playwright.chromium.launch(
-            headless=True,
-            channel="chromium",
-            args=args
-        )
+        if self.har and self.har.reproduzindo:
+            self.browser, self.context = await self.har.abrir_navegador_reproducao(self.playwright)
+        else:
+            self.browser = await self.playwright.chromium.launch(
+                headless=True,
+                channel="chromium",
+                args=args
+            )
 
-        self.context = await self.browser.new_context(
-            user_agent=USER_AGENT,
-            locale='pt-BR',
-            timezone_id='America/Sao_Paulo',
-            viewport={'width': 1920, 'height': 1080}
-        )
+            self.context = await self.browser.new_context(
+                user_agent=USER_AGENT,
+                locale='pt-BR',
+                timezone_id='America/Sao_Paulo',
+                viewport={'width': 1920, 'height': 1080}
+            )
 
         # Script avançado para evitar detecção de automação
         await self.context.add_init_script(""""
             Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
         """)
 
+        # Gravacao/reproducao de HAR (NAVEGADOR_HAR), registrada antes do bloqueio
+        if self.har:
+            await self.har.instalar(self.context)
+
+        # Bloqueio de recursos pesados (imagens, fontes, analytics) conforme o perfil do portal
+        if self.perfil_bloqueio:
+            self.bloqueador = BloqueadorRecursos(self.perfil_bloqueio)
+            await self.bloqueador.instalar(self.context)
+
         self.page = await self.context.new_page()
         return self.page
 
+    def resumo_bloqueio(self) -> dict:
+        """Economia do bloqueio de recursos para o wide event (vazio se desativado)."""
+        return self.bloqueador.resumo() if self.bloqueador else {}
+
     async def stop_browser(self):
         """Fecha o browser e limpa os recursos."""
         try:
             if self.page:
                 await self.page.close()
-            if self.context:
+            if self.har:
+                await self.har.finalizar(self.context)
+            elif self.context:
                 await self.context.close()
             if self.browser:
                 await self.browser.close()
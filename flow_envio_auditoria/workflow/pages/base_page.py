@@ -1,11 +1,14 @@
 import logging
 from playwright.async_api import Page
 
+from workflow.components.espera import Espera
+
 logger = logging.getLogger(__name__)
 
 class BasePage:
     def __init__(self, page: Page):
         self.page = page
+        self.espera = Espera.da_pagina(page)
 
     async def wait_for_loader(self, selector="#UpdateProgress1", timeout: int = 60000):
         """Aguarda o loader sumir da tela."""
@@ -24,8 +24,8 @@ class VidibrAuditoriaPage(BasePage):
         logger.info("Abrindo seleção de Avaliações Realizadas...")
         await self.btn_avaliacoes.wait_for(state="visible", timeout=15000)
         await self.btn_avaliacoes.click()
-        # Hard wait como no modelo (POST_CLICK_DELAY)
-        await asyncio.sleep(2)
+        # Aguarda o diálogo de jobs terminar a animação (antes: POST_CLICK_DELAY fixo de 2s)
+        await self.espera.seletor_estavel(".alert-radio-group", substitui_ms=2000)
 
     async def listar_formularios(self) -> List[str]:
         """Lista os nomes dos formulários disponíveis."""
@@ -68,8 +68,8 @@ class VidibrAuditoriaPage(BasePage):
         except Exception:
             logger.warning("Timeout em networkidle, tentando continuar...")
         
-        # POST_CLICK_DELAY adicional para garantir renderização
-        await asyncio.sleep(3)
+        # Aguarda a renderização do formulário assentar (antes: POST_CLICK_DELAY fixo de 3s)
+        await self.espera.dom_quieto(substitui_ms=3000)
 
     async def selecionar_local_mais_recente(self) -> str:
         """Clica no filtro de local (data-cy) e seleciona o primeiro espaço."""
@@ -82,7 +82,7 @@ class VidibrAuditoriaPage(BasePage):
         logger.info("Filtro de local clicado.")
         
         # Aguarda o dropdown de rádios aparecer
-        await asyncio.sleep(1)
+        await self.espera.seletor_estavel(".alert-radio-group", substitui_ms=1000)
         radio_group = self.page.locator(".alert-radio-group")
         await radio_group.wait_for(state="visible", timeout=10000)
         logger.info("Dropdown de local aberto!")
@@ -134,7 +134,7 @@ class VidibrAuditoriaPage(BasePage):
         except Exception:
             logger.warning("Timeout em networkidle após seleção de local.")
         
-        await asyncio.sleep(3)
+        await self.espera.dom_quieto(substitui_ms=3000)
         
         logger.info(f"Local selecionado com sucesso: {local_selecionado[:70]}")
         return local_selecionado
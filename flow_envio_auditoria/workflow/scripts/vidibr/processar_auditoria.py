@@ -4,6 +4,7 @@ import os
 import sys
 import asyncio
 from dotenv import load_dotenv
+from workflow.components.espera import Espera
 from workflow.components.navegador import Navegador
 from workflow.pages.vidibr.login_page import VidibrLoginPage
 from workflow.pages.vidibr.auditoria_page import VidibrAuditoriaPage
@@ -23,7 +24,7 @@ LAST_FORM_FILE = "ultimo_formulario.txt"
 
 class AuditoriaOrquestrador:
     def __init__(self):
-        self.navegador = Navegador()
+        self.navegador = Navegador(perfil_bloqueio="vidibr")
         self.page = None
 
     async def executar(self):
@@ -89,6 +90,9 @@ class AuditoriaOrquestrador:
             logger.error(f"Erro Crítico: {e}", exc_info=True)
             sys.exit(1)
         finally:
+            logger.info(f"Bloqueio de recursos: {self.navegador.resumo_bloqueio()}")
+            if self.page:
+                logger.info(f"Esperas: {Espera.da_pagina(self.page).resumo()}")
             await self.navegador.stop_browser()
 
 if __name__ == "__main__":
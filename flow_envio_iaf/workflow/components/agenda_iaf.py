@@ -0,0 +1,145 @@
+"""
+Agenda preditiva das verificacoes de atualizacao do IAF.
+
+Cada verificacao registra a data_atualizacao observada (dia + horario). Com
+o historico dos horarios em que o dashboard costuma atualizar, recomendar()
+diz quanto esperar ate a proxima verificacao:
+
+  - antes da janela historica: uma unica sondagem na abertura da janela;
+  - perto da moda (horario mais comum): sondagens densas;
+  - no resto da janela: sondagens espacadas;
+  - ja atualizado hoje: so amanha, na abertura da janela.
+
+    agenda = AgendaIAF()
+    agenda.registrar("23/02/2026, às 09:56:06")
+    agenda.recomendar(atualizado_hoje=False)  # {"esperar_s": 300, "fase": "moda", ...}
+
+Com poucas amostras a recomendacao e um intervalo fixo (fase "padrao").
+
+Variaveis de ambiente:
+  - IAF_HISTORICO_DIR: diretorio do historico (padrao: <fluxo>/historico).
+"""
+
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(__file__), "..", "..", "historico")
+ARQUIVO_AGENDA = "atualizacoes_iaf.json"
+
+# Dias de historico considerados (e mantidos no arquivo)
+JANELA_DIAS = 60
+# Abaixo disso a distribuicao nao e confiavel: intervalo fixo
+MIN_AMOSTRAS = 5
+INTERVALO_PADRAO_S = 900
+
+FAIXA_MODA_MIN = 15       # largura das faixas para achar o horario mais comum
+MARGEM_MIN = 15           # antecedencia da primeira sondagem frente a janela
+DENSO_RAIO_MIN = 30       # +- em volta da moda com sondagem densa
+INTERVALO_DENSO_S = 300
+INTERVALO_ESPACADO_S = 900
+INTERVALO_TARDIO_S = 1800
+
+_RE_DATA_HORA = re.compile(r'(\d{2})/(\d{2})/(\d{4})\D+(\d{2}):(\d{2})')
+
+
+def _hhmm(minutos: int) -> str:
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+def _percentil(ordenados: list, fracao: float) -> int:
+    return ordenados[int(fracao * (len(ordenados) - 1))]
+
+
+class AgendaIAF:
+    """Historico dos horarios de atualizacao do dashboard e recomendacao da proxima verificacao."""
+
+    def __init__(self, diretorio: str = None):
+        diretorio = diretorio or os.environ.get("IAF_HISTORICO_DIR", DIRETORIO_PADRAO)
+        self.caminho = os.path.join(diretorio, ARQUIVO_AGENDA)
+        self.atualizacoes = {}
+        if os.path.exists(self.caminho):
+            try:
+                with open(self.caminho, "r", encoding="utf-8") as f:
+                    self.atualizacoes = json.load(f).get("atualizacoes", {})
+            except Exception as e:
+                logger.warning(f"Historico de atualizacoes ilegivel, recomecando: {e}")
+
+    def registrar(self, texto_data: str) -> bool:
+        """Guarda o horario de atualizacao do dia exibido; False se o texto nao tiver horario."""
+        match = _RE_DATA_HORA.search(texto_data or "")
+        if not match:
+            return False
+        dia = f"{match.group(3)}-{match.group(2)}-{match.group(1)}"
+        horario = f"{match.group(4)}:{match.group(5)}"
+        if self.atualizacoes.get(dia) == horario:
+            return True
+
+        self.atualizacoes[dia] = horario
+        for antigo in sorted(self.atualizacoes)[:-JANELA_DIAS]:
+            del self.atualizacoes[antigo]
+        try:
+            os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+            temporario = f"{self.caminho}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump({"atualizacoes": self.atualizacoes}, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(temporario, self.caminho)
+        except Exception as e:
+            logger.warning(f"Nao foi possivel salvar o historico de atualizacoes: {e}")
+        return True
+
+    def distribuicao(self) -> dict:
+        """Inicio (p5), moda e fim (p95) da janela historica, em minutos do dia."""
+        minutos = sorted(int(h[:2]) * 60 + int(h[3:]) for h in self.atualizacoes.values())
+        if len(minutos) < MIN_AMOSTRAS:
+            return {"amostras": len(minutos)}
+
+        faixas = {}
+        for m in minutos:
+            faixas[m // FAIXA_MODA_MIN] = faixas.get(m // FAIXA_MODA_MIN, 0) + 1
+        faixa_moda = max(sorted(faixas), key=lambda f: faixas[f])
+        return {
+            "amostras": len(minutos),
+            "inicio": _percentil(minutos, 0.05),
+            "moda": faixa_moda * FAIXA_MODA_MIN + FAIXA_MODA_MIN // 2,
+            "fim": _percentil(minutos, 0.95),
+        }
+
+    def recomendar(self, atualizado_hoje: bool = False, agora: datetime = None) -> dict:
+        """Quanto esperar ate a proxima verificacao, e por que (fase)."""
+        agora = agora or datetime.now()
+        dist = self.distribuicao()
+        if "moda" not in dist:
+            esperar_s, fase = INTERVALO_PADRAO_S, "padrao"
+        else:
+            agora_min = agora.hour * 60 + agora.minute
+            abertura = max(dist["inicio"] - MARGEM_MIN, 0)
+            if atualizado_hoje:
+                esperar_s, fase = ((24 * 60 - agora_min) + abertura) * 60, "amanha"
+            elif agora_min < abertura:
+                esperar_s, fase = (abertura - agora_min) * 60, "antes_da_janela"
+            elif abs(agora_min - dist["moda"]) <= DENSO_RAIO_MIN:
+                esperar_s, fase = INTERVALO_DENSO_S, "moda"
+            elif agora_min < dist["moda"]:
+                # Espacado, sem passar do inicio da faixa densa
+                ate_densa_s = (dist["moda"] - DENSO_RAIO_MIN - agora_min) * 60
+                esperar_s, fase = min(INTERVALO_ESPACADO_S, max(ate_densa_s, 60)), "janela"
+            elif agora_min <= dist["fim"]:
+                esperar_s, fase = INTERVALO_ESPACADO_S, "janela"
+            else:
+                esperar_s, fase = INTERVALO_TARDIO_S, "atrasado"
+
+        recomendacao = {
+            "fase": fase,
+            "esperar_s": int(esperar_s),
+            "proxima_verificacao": (agora + timedelta(seconds=esperar_s)).strftime("%Y-%m-%dT%H:%M"),
+            "amostras": dist["amostras"],
+        }
+        for chave in ("inicio", "moda", "fim"):
+            if chave in dist:
+                recomendacao[chave] = _hhmm(dist[chave])
+        return recomendacao
@@ -0,0 +1,229 @@
+"""
+Historico dos snapshots do dashboard IAF em SQLite.
+
+Cada SnapshotIAF devolvido por IAFPage.extrair_tudo() e gravado uma vez
+por data_atualizacao, com pilares e indicadores em tabelas proprias
+(indexadas por nome) e os valores numericos do modelo:
+
+    historico = HistoricoIAF()
+    snapshot_id = historico.registrar(snapshot)
+    if historico.ja_enviado(snapshot_id):
+        ...                                  # nada mudou desde o ultimo envio
+    deltas = historico.deltas(snapshot_id)   # variacao frente ao dia anterior
+
+O envio marca o snapshot (marcar_enviado), e e isso que permite pular
+formatacao e envio quando o dashboard nao mudou desde a ultima mensagem.
+
+Variaveis de ambiente:
+  - IAF_HISTORICO_DIR: diretorio do banco (padrao: <fluxo>/historico).
+                       No Kestra, apontar para um volume persistente.
+  - IAF_UNIDADES:      se definida (extracao multiunidade), o historico nao e usado.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+from workflow.components.modelo_iaf import SnapshotIAF
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(__file__), "..", "..", "historico")
+ARQUIVO_BANCO = "iaf.sqlite3"
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    data_atualizacao TEXT NOT NULL UNIQUE,
+    dia TEXT NOT NULL,
+    capturado_em TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    pontuacao REAL,
+    dados TEXT NOT NULL,
+    enviado_em TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_dia ON snapshots (dia);
+CREATE INDEX IF NOT EXISTS idx_snapshots_enviado ON snapshots (enviado_em);
+
+CREATE TABLE IF NOT EXISTS pilares (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    nome TEXT NOT NULL,
+    pontos TEXT, meta TEXT, atingimento TEXT, falta_meta TEXT,
+    pontos_num REAL,
+    atingimento_pct REAL
+);
+CREATE INDEX IF NOT EXISTS idx_pilares_nome ON pilares (nome, snapshot_id);
+
+CREATE TABLE IF NOT EXISTS indicadores (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    nome TEXT NOT NULL,
+    habilitador TEXT, realizado TEXT, atingimento TEXT, meta TEXT, falta_meta TEXT,
+    atingimento_pct REAL
+);
+CREATE INDEX IF NOT EXISTS idx_indicadores_nome ON indicadores (nome, snapshot_id);
+"""
+
+_RE_DATA = re.compile(r'(\d{2})/(\d{2})/(\d{4})')
+
+
+def _dia(data_atualizacao: str) -> str:
+    """'23/02/2026, às 09:56:06' -> '2026-02-23' (hoje, se nao houver data)."""
+    match = _RE_DATA.search(data_atualizacao or "")
+    if match:
+        return f"{match.group(3)}-{match.group(2)}-{match.group(1)}"
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def historico_habilitado() -> bool:
+    """O historico e da unidade unica; na extracao multiunidade (IAF_UNIDADES) fica de fora."""
+    return not os.environ.get("IAF_UNIDADES", "").strip()
+
+
+def hash_snapshot(snapshot: SnapshotIAF) -> str:
+    """Hash do conteudo exibido (sem os payloads brutos da API)."""
+    conteudo = snapshot.como_dict(incluir_api=False)
+    return hashlib.sha256(json.dumps(conteudo, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class HistoricoIAF:
+    """Snapshots do IAF por data_atualizacao, com pilares e indicadores consultaveis."""
+
+    def __init__(self, diretorio: str = None):
+        diretorio = diretorio or os.environ.get("IAF_HISTORICO_DIR", DIRETORIO_PADRAO)
+        os.makedirs(diretorio, exist_ok=True)
+        self.caminho = os.path.join(diretorio, ARQUIVO_BANCO)
+        self.conexao = sqlite3.connect(self.caminho)
+        self.conexao.execute("PRAGMA foreign_keys = ON")
+        self.conexao.executescript(ESQUEMA)
+
+    def fechar(self):
+        self.conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fechar()
+
+    # ── Gravacao ──────────────────────────────────────────────────────
+
+    def registrar(self, snapshot: SnapshotIAF) -> int:
+        """
+        Grava o snapshot (um por data_atualizacao) e devolve o id.
+        Se a mesma data ja existe com outro conteudo, o snapshot e substituido
+        e volta a contar como nao enviado.
+        """
+        data_atualizacao = snapshot.data_atualizacao
+        hash_atual = hash_snapshot(snapshot)
+        existente = self.conexao.execute(
+            "SELECT id, hash FROM snapshots WHERE data_atualizacao = ?", (data_atualizacao,)
+        ).fetchone()
+        if existente and existente[1] == hash_atual:
+            return existente[0]
+
+        pontuacao = snapshot.soma_pontos
+        conteudo = json.dumps(snapshot.como_dict(incluir_api=False), ensure_ascii=False)
+        capturado_em = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+        with self.conexao:
+            if existente:
+                snapshot_id = existente[0]
+                self.conexao.execute(
+                    "UPDATE snapshots SET capturado_em = ?, hash = ?, pontuacao = ?, dados = ?, enviado_em = NULL "
+                    "WHERE id = ?",
+                    (capturado_em, hash_atual, pontuacao, conteudo, snapshot_id),
+                )
+                self.conexao.execute("DELETE FROM pilares WHERE snapshot_id = ?", (snapshot_id,))
+                self.conexao.execute("DELETE FROM indicadores WHERE snapshot_id = ?", (snapshot_id,))
+            else:
+                snapshot_id = self.conexao.execute(
+                    "INSERT INTO snapshots (data_atualizacao, dia, capturado_em, hash, pontuacao, dados) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (data_atualizacao, _dia(data_atualizacao), capturado_em, hash_atual, pontuacao, conteudo),
+                ).lastrowid
+
+            self.conexao.executemany(
+                "INSERT INTO pilares VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (snapshot_id, p.nome, p.pontos, p.meta, p.atingimento, p.falta_meta,
+                     p.pontos_num, p.atingimento_pct)
+                    for p in snapshot.pilares
+                ],
+            )
+            self.conexao.executemany(
+                "INSERT INTO indicadores VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (snapshot_id, i.nome, i.habilitador, i.realizado, i.atingimento, i.meta, i.falta_meta,
+                     i.atingimento_pct)
+                    for i in snapshot.indicadores
+                ],
+            )
+
+        logger.info(f"Snapshot IAF '{data_atualizacao}' gravado no histórico (id {snapshot_id}).")
+        return snapshot_id
+
+    def marcar_enviado(self, snapshot_id: int = None):
+        """Marca o snapshot (padrao: o capturado por ultimo) como enviado."""
+        if snapshot_id is None:
+            linha = self.conexao.execute("SELECT id FROM snapshots ORDER BY capturado_em DESC, id DESC LIMIT 1").fetchone()
+            if not linha:
+                return
+            snapshot_id = linha[0]
+        with self.conexao:
+            self.conexao.execute(
+                "UPDATE snapshots SET enviado_em = ? WHERE id = ?",
+                (time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), snapshot_id),
+            )
+
+    # ── Consulta ──────────────────────────────────────────────────────
+
+    def ja_enviado(self, snapshot_id: int = None) -> bool:
+        """O snapshot (padrao: o capturado por ultimo) tem o mesmo conteudo do ultimo enviado?"""
+        if snapshot_id is None:
+            linha = self.conexao.execute("SELECT hash FROM snapshots ORDER BY capturado_em DESC, id DESC LIMIT 1").fetchone()
+        else:
+            linha = self.conexao.execute("SELECT hash FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+        ultimo_enviado = self.conexao.execute(
+            "SELECT hash FROM snapshots WHERE enviado_em IS NOT NULL ORDER BY enviado_em DESC LIMIT 1"
+        ).fetchone()
+        return bool(linha and ultimo_enviado and linha[0] == ultimo_enviado[0])
+
+    def deltas(self, snapshot_id: int) -> dict:
+        """
+        Variacao frente ao snapshot do dia anterior mais recente: pontuacao total,
+        pontos/atingimento por pilar e atingimento por indicador. {} sem referencia.
+        """
+        atual = self.conexao.execute("SELECT dia, pontuacao FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+        if not atual:
+            return {}
+        anterior = self.conexao.execute(
+            "SELECT id, data_atualizacao, pontuacao FROM snapshots WHERE dia < ? ORDER BY dia DESC, id DESC LIMIT 1",
+            (atual[0],),
+        ).fetchone()
+        if not anterior:
+            return {}
+
+        pilares = self.conexao.execute(
+            "SELECT a.nome, a.pontos_num - b.pontos_num, a.atingimento_pct - b.atingimento_pct "
+            "FROM pilares a JOIN pilares b ON b.nome = a.nome AND b.snapshot_id = ? "
+            "WHERE a.snapshot_id = ?",
+            (anterior[0], snapshot_id),
+        ).fetchall()
+        indicadores = self.conexao.execute(
+            "SELECT a.nome, a.atingimento_pct - b.atingimento_pct "
+            "FROM indicadores a JOIN indicadores b ON b.nome = a.nome AND b.snapshot_id = ? "
+            "WHERE a.snapshot_id = ?",
+            (anterior[0], snapshot_id),
+        ).fetchall()
+
+        return {
+            "referencia": anterior[1],
+            "pontuacao": (atual[1] or 0.0) - (anterior[2] or 0.0),
+            "pilares": {nome: {"pontos": pontos, "atingimento": atingimento} for nome, pontos, atingimento in pilares},
+            "indicadores": {nome: {"atingimento": atingimento} for nome, atingimento in indicadores},
+        }
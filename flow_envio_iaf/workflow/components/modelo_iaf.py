@@ -0,0 +1,174 @@
+"""
+Modelo tipado dos dados do dashboard IAF.
+
+IAFPage.extrair_tudo() devolve um SnapshotIAF: os textos exibidos no
+dashboard (como vieram do DOM) e, ao lado, os numeros ja convertidos do
+formato brasileiro - uma unica vez, na extracao. Markdown, WhatsApp e
+historico leem os campos numericos direto, sem regex.
+
+    snapshot = SnapshotIAF.de_dict(dados)
+    snapshot.soma_pontos                 # soma de Pilar.pontos_num
+    snapshot.salvar_json("dados_iaf.json")   # textos + numeros, p/ consumidores
+    SnapshotIAF.carregar_json("dados_iaf.json")  # sem reconverter
+"""
+
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+
+# Meta de pontos do CP usada na classificação
+META_CP = 915.0
+
+RE_PONTOS = re.compile(r'([\d\.,]+)\s*pts?')
+RE_PERCENTUAL = re.compile(r'([\d\.,]+)%')
+RE_MOEDA = re.compile(r'R\$\s*([\d\.,]+)')
+
+
+def numero_br(texto: str, regex: re.Pattern = RE_PONTOS) -> float:
+    """Primeiro número casado por `regex` em `texto` ("1.587,30" -> 1587.3); 0.0 se não houver."""
+    if not texto or texto == "N/D":
+        return 0.0
+    match = regex.search(texto)
+    if match:
+        try:
+            return float(match.group(1).replace('.', '').replace(',', '.'))
+        except ValueError:
+            pass
+    return 0.0
+
+
+def ultima_linha(texto: str) -> str:
+    """Última linha não vazia (o % vem abaixo dos pontos nas células do dashboard)."""
+    if not texto:
+        return "N/D"
+    for seg in reversed(texto.replace('<br>', '\n').split('\n')):
+        if seg.strip():
+            return seg.strip()
+    return "N/D"
+
+
+def percentual(texto: str) -> float:
+    """Percentual da última linha de `texto` ("10 pts\\n97,5%" -> 97.5)."""
+    return numero_br(ultima_linha(texto), RE_PERCENTUAL)
+
+
+def formatar_pontos(pontos: float) -> str:
+    """290.0 -> "290 pts"; 97.3 -> "97,30 pts"."""
+    if pontos == int(pontos):
+        return f"{int(pontos)} pts"
+    return f"{pontos:.2f} pts".replace('.', ',')
+
+
+def classificar(pontos: float, sem_classificacao: str = "Sem classificação") -> tuple:
+    """Retorna (classificação, percentual formatado) da pontuação frente à META_CP."""
+    atingimento_pct = pontos / META_CP
+    percentual_fmt = f"{(atingimento_pct * 100):.2f}%".replace(".", ",")
+
+    if atingimento_pct >= 0.95:
+        return "Diamante", percentual_fmt
+    if atingimento_pct >= 0.85:
+        return "Ouro", percentual_fmt
+    if atingimento_pct >= 0.75:
+        return "Prata", percentual_fmt
+    if atingimento_pct >= 0.65:
+        return "Bronze", percentual_fmt
+    return sem_classificacao, percentual_fmt
+
+
+@dataclass(slots=True)
+class Panorama:
+    pontuacao_cp: str = "N/D"
+    classificacao: str = "N/D"
+    classificacao_pct: str = "N/D"
+    rankings: dict = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class Pilar:
+    nome: str = "N/D"
+    pontos: str = "N/D"
+    meta: str = "N/D"
+    atingimento: str = "N/D"
+    falta_meta: str = "N/D"
+    pontos_num: float = None
+    meta_num: float = None
+    atingimento_pct: float = None
+    falta_meta_num: float = None
+
+    def __post_init__(self):
+        # Converte só o que não veio pronto (ex.: ao recarregar o JSON)
+        if self.pontos_num is None:
+            self.pontos_num = numero_br(self.pontos)
+        if self.meta_num is None:
+            self.meta_num = numero_br(self.meta)
+        if self.atingimento_pct is None:
+            self.atingimento_pct = percentual(self.atingimento)
+        if self.falta_meta_num is None:
+            self.falta_meta_num = numero_br(self.falta_meta)
+
+
+@dataclass(slots=True)
+class Indicador:
+    nome: str = "N/D"
+    habilitador: str = "N/D"
+    realizado: str = "N/D"
+    atingimento: str = "N/D"
+    meta: str = "N/D"
+    falta_meta: str = "N/D"
+    realizado_moeda: float = None
+    meta_moeda: float = None
+    atingimento_pct: float = None
+    falta_meta_pct: float = None
+
+    def __post_init__(self):
+        if self.realizado_moeda is None:
+            self.realizado_moeda = numero_br(self.realizado, RE_MOEDA)
+        if self.meta_moeda is None:
+            self.meta_moeda = numero_br(self.meta, RE_MOEDA)
+        if self.atingimento_pct is None:
+            self.atingimento_pct = percentual(self.atingimento)
+        if self.falta_meta_pct is None:
+            self.falta_meta_pct = percentual(self.falta_meta)
+
+
+@dataclass(slots=True)
+class SnapshotIAF:
+    data_atualizacao: str = "N/D"
+    panorama: Panorama = field(default_factory=Panorama)
+    pilares: list = field(default_factory=list)
+    indicadores: list = field(default_factory=list)
+    api: dict = field(default_factory=dict)
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "SnapshotIAF":
+        """Monta o snapshot a partir do dict de extração (ou do JSON salvo)."""
+        return cls(
+            data_atualizacao=dados.get("data_atualizacao") or "N/D",
+            panorama=Panorama(**dados.get("panorama", {})),
+            pilares=[Pilar(**p) for p in dados.get("pilares", [])],
+            indicadores=[Indicador(**i) for i in dados.get("indicadores", [])],
+            api=dados.get("api", {}),
+        )
+
+    @property
+    def soma_pontos(self) -> float:
+        return sum(p.pontos_num for p in self.pilares)
+
+    def como_dict(self, incluir_api: bool = True) -> dict:
+        dados = asdict(self)
+        if not incluir_api:
+            dados.pop("api")
+        return dados
+
+    def salvar_json(self, caminho: str):
+        """Grava textos + números (sem os payloads brutos da API) para consumidores externos."""
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.como_dict(incluir_api=False), f, ensure_ascii=False, indent=2)
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar_json(cls, caminho: str) -> "SnapshotIAF":
+        with open(caminho, "r", encoding="utf-8") as f:
+            return cls.de_dict(json.load(f))
@@ -9,6 +9,9 @@ Configuracoes criticas:
 IMPORTANTE: Sempre usar o contexto default do Browserless (browser.contexts[0])
 para manter as flags anti-deteccao. Criar um new_context() perde o stealth.
 Cookies do state.json sao injetados manualmente no contexto default.
+
+Respostas JSON de xhr/fetch sao capturadas no contexto (CapturaRespostas)
+para que os page objects leiam os dados da API em vez do DOM renderizado.
 """
 
 from playwright.async_api import async_playwright
@@ -18,28 +21,40 @@ import logging
 import os
 from urllib.parse import quote
 
+from workflow.components.bloqueio_recursos import BloqueadorRecursos, resolver_perfil
+from workflow.components.captura_respostas import CapturaRespostas
+from workflow.components.gravacao_har import GravacaoHar, modo_har
+
 logger = logging.getLogger(__name__)
 
 
 class Navegador:
-    def __init__(self):
+    def __init__(self, perfil_bloqueio: str = None):
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
+        self.perfil_bloqueio = resolver_perfil(perfil_bloqueio)
+        self.bloqueador = None
+        self.captura = None
+        self.har = GravacaoHar(modo_har()) if modo_har() else None
 
     async def setup_browser(self):
         """
         Inicia o browser.
         - Docker/Kestra: conecta ao Browserless via CDP (headless gerenciado pelo Browserless).
         - Local (Windows): lança Chromium local com headless=False para visualização.
+        - NAVEGADOR_HAR=reproduzir: Chromium local headless servindo o HAR gravado (offline).
         """
         self.playwright = await async_playwright().start()
 
         # Verifica se estamos em ambiente Docker/Kestra (geralmente sem display)
         is_docker = os.path.exists("/.dockerenv")
 
-        if is_docker:
+        if self.har and self.har.reproduzindo:
+            self.browser, self.context = await self.har.abrir_navegador_reproducao(self.playwright)
+            is_docker = False
+        elif is_docker:
             # --- Modo Docker: conecta ao Browserless via CDP ---
             logger.info("Ambiente Docker detectado. Conectando ao Browserless (stealth=ON)...")
             cdp_url = self._build_cdp_url()
@@ -74,6 +89,18 @@ class Navegador:
             )
             logger.info("Contexto criado (headless=False, downloads=ON).")
 
+        # Gravacao/reproducao de HAR (antes do bloqueio, para o bloqueio decidir primeiro)
+        if self.har:
+            await self.har.instalar(self.context)
+
+        # Bloqueio de recursos pesados (imagens, fontes, analytics) conforme o perfil do portal
+        if self.perfil_bloqueio:
+            self.bloqueador = BloqueadorRecursos(self.perfil_bloqueio)
+            await self.bloqueador.instalar(self.context)
+
+        # Respostas JSON (xhr/fetch) ficam disponiveis para os page objects
+        self.captura = CapturaRespostas.do_contexto(self.context)
+
         # Carrega cookies do state.json manualmente no contexto
         script_dir = os.path.dirname(__file__)
         state_path = os.path.join(script_dir, "..", "..", "state.json")
@@ -156,9 +183,19 @@ class Navegador:
         except Exception as e:
             logger.error(f"Erro ao salvar estado da sessao: {e}")
 
+    def resumo_bloqueio(self) -> dict:
+        """Economia do bloqueio de recursos para o wide event (vazio se desativado)."""
+        return self.bloqueador.resumo() if self.bloqueador else {}
+
+    def resumo_captura(self) -> dict:
+        """Endpoints JSON capturados na execucao, para o wide event."""
+        return self.captura.resumo() if self.captura else {}
+
     async def stop_browser(self):
         """Fecha o browser e limpa os recursos."""
         try:
+            if self.har:
+                await self.har.finalizar(self.context)
             if self.browser:
                 await self.browser.close()
             if self.playwright:
@@ -0,0 +1,110 @@
+"""
+Replay HTTP das APIs da Extranet, sem Browserless.
+
+Depois que uma execucao com navegador autentica e captura as chamadas de API
+(CapturaRespostas.receita), a receita e salva ao lado da sessao em cache
+(SessaoExtranet). Nas execucoes seguintes, enquanto a sessao for valida, as
+mesmas chamadas sao refeitas direto por HTTP com os cookies da sessao e o
+bearer capturado - sem abrir navegador nem subir o driver do Playwright:
+uma requests.Session com pool de conexoes, chamada em threads com
+concorrencia limitada.
+
+Se a sessao expirou ou a API recusar (401/403/redirect para o login), o
+chamador recebe SessaoHttpExpirada e volta para o caminho com navegador.
+"""
+
+import asyncio
+import json
+import logging
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from workflow.components.sessao_extranet import LOGIN_HOST, SessaoExtranet
+
+logger = logging.getLogger(__name__)
+
+
+class SessaoHttpExpirada(Exception):
+    """A API recusou a sessao em cache: e preciso autenticar pelo navegador."""
+
+
+def caminho_receita(sessao: SessaoExtranet, nome: str) -> str:
+    """Receitas ficam junto do arquivo de sessao do mesmo usuario."""
+    return sessao.caminho.replace(".json", f".receita_{nome}.json")
+
+
+def salvar_receita(sessao: SessaoExtranet, nome: str, receita: dict):
+    if not receita.get("chamadas"):
+        logger.info(f"Nenhuma chamada de API capturada para a receita '{nome}'.")
+        return
+    caminho = caminho_receita(sessao, nome)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(receita, f)
+    logger.info(f"Receita '{nome}' salva com {len(receita['chamadas'])} chamada(s).")
+
+
+def carregar_receita(sessao: SessaoExtranet, nome: str):
+    caminho = caminho_receita(sessao, nome)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ClienteApiExtranet:
+    """Cliente HTTP (requests com pool de conexoes) com os cookies/bearer de uma sessao da Extranet."""
+
+    def __init__(self, storage_state: dict, autorizacao: str = None, max_concorrencia: int = 4,
+                 timeout_s: float = 30):
+        self.storage_state = storage_state
+        self.autorizacao = autorizacao
+        self.max_concorrencia = max_concorrencia
+        self.timeout_s = timeout_s
+        self._semaforo = asyncio.Semaphore(max_concorrencia)
+        self.http = None
+
+    async def __aenter__(self):
+        self.http = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=self.max_concorrencia, pool_maxsize=self.max_concorrencia)
+        self.http.mount("https://", adaptador)
+        self.http.headers["accept"] = "application/json"
+        if self.autorizacao:
+            self.http.headers["authorization"] = self.autorizacao
+        for cookie in self.storage_state.get("cookies", []):
+            self.http.cookies.set(
+                cookie["name"], cookie["value"],
+                domain=cookie.get("domain", ""), path=cookie.get("path", "/"), secure=cookie.get("secure", False),
+            )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self.http:
+            self.http.close()
+
+    def _requisitar(self, chamada: dict):
+        corpo = chamada.get("corpo")
+        cabecalhos = {}
+        if corpo and corpo.lstrip()[:1] in ("{", "["):
+            cabecalhos["content-type"] = "application/json"
+        return self.http.request(
+            chamada.get("metodo", "GET"), chamada["url"], data=corpo, headers=cabecalhos,
+            allow_redirects=False, timeout=self.timeout_s,
+        )
+
+    async def chamar(self, chamada: dict):
+        """Refaz uma chamada da receita e devolve o JSON."""
+        async with self._semaforo:
+            resposta = await asyncio.to_thread(self._requisitar, chamada)
+
+        if resposta.status_code in (401, 403) or LOGIN_HOST in resposta.headers.get("location", ""):
+            raise SessaoHttpExpirada(f"{resposta.status_code} em {chamada['url']}")
+        if resposta.is_redirect or not resposta.ok:
+            raise RuntimeError(f"HTTP {resposta.status_code} em {chamada['url']}")
+        return resposta.json()
+
+    async def chamar_todas(self, chamadas: list) -> list:
+        """Refaz as chamadas em paralelo (limitado pelo semaforo), na mesma ordem."""
+        return await asyncio.gather(*(self.chamar(c) for c in chamadas))
@@ -0,0 +1,171 @@
+"""
+Cache de sessao da Extranet Grupo Boticario (Azure B2C).
+
+Evita o login completo (form B2C + callback OAuth + esperas) a cada execucao:
+  - A sessao e salva como storage_state + metadados de expiracao,
+    em um arquivo por (tenant, usuario).
+  - Antes de usar, a validade e conferida sem rede (metadados) e depois
+    com uma unica navegacao ate a pagina alvo: se cair no login B2C,
+    o cache e descartado e o chamador faz o login completo.
+
+Variaveis de ambiente:
+  - EXTRANET_SESSAO_DIR:     diretorio dos arquivos de sessao (padrao: <fluxo>/.sessoes).
+                             No Kestra, apontar para um volume persistente.
+  - EXTRANET_SESSAO_TTL_MIN: validade maxima de uma sessao em minutos (padrao: 60).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+TENANT_ID = "1e6392bd-5377-48f0-9a8e-467f5b381b18"
+POLITICA_B2C = "B2C_1A_JIT_SIGNUPORSIGNIN_FEDCORP_APIGEE_PRD"
+LOGIN_HOST = "login.extranet.grupoboticario.com.br"
+DOMINIO_EXTRANET = "grupoboticario.com.br"
+
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(__file__), "..", "..", ".sessoes")
+
+# Margem de seguranca: sessao que expira em menos que isso e tratada como expirada
+MARGEM_EXPIRACAO_S = 120
+
+
+class SessaoExtranet:
+    """Sessao da Extranet em cache, chaveada por credencial e tenant."""
+
+    def __init__(self, usuario: str, tenant: str = TENANT_ID):
+        self.usuario = usuario
+        self.tenant = tenant
+        self.chave = hashlib.sha256(f"{tenant}:{POLITICA_B2C}:{usuario}".encode("utf-8")).hexdigest()[:16]
+
+        diretorio = os.environ.get("EXTRANET_SESSAO_DIR", DIRETORIO_PADRAO)
+        self.caminho = os.path.join(diretorio, f"extranet_{self.chave}.json")
+        self.ttl_s = int(os.environ.get("EXTRANET_SESSAO_TTL_MIN", "60")) * 60
+
+    # ── Persistencia ──────────────────────────────────────────────────
+
+    def carregar(self):
+        """Retorna o storage_state em cache, ou None se ausente/expirado."""
+        if not os.path.exists(self.caminho):
+            logger.info("Nenhuma sessao Extranet em cache.")
+            return None
+
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        except Exception as e:
+            logger.warning(f"Cache de sessao Extranet ilegivel, descartando: {e}")
+            self.invalidar()
+            return None
+
+        meta = dados.get("meta", {})
+        restante_s = meta.get("expira_em", 0) - time.time()
+        if meta.get("tenant") != self.tenant or restante_s <= MARGEM_EXPIRACAO_S:
+            logger.info("Sessao Extranet em cache expirada.")
+            self.invalidar()
+            return None
+
+        logger.info(f"Sessao Extranet em cache encontrada (expira em {int(restante_s // 60)} min).")
+        return dados.get("storage_state")
+
+    async def salvar(self, context):
+        """Salva o storage_state atual com os metadados de expiracao."""
+        try:
+            state = await context.storage_state()
+            agora = time.time()
+            expiracoes = [
+                c["expires"] for c in state.get("cookies", [])
+                if DOMINIO_EXTRANET in c.get("domain", "") and c.get("expires", -1) > agora
+            ]
+            expira_em = min([agora + self.ttl_s] + expiracoes)
+
+            os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+            temporario = f"{self.caminho}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump({
+                    "meta": {"tenant": self.tenant, "criado_em": agora, "expira_em": expira_em},
+                    "storage_state": state,
+                }, f)
+            os.replace(temporario, self.caminho)
+            logger.info(f"Sessao Extranet salva em cache (expira em {int((expira_em - agora) // 60)} min).")
+        except Exception as e:
+            logger.warning(f"Nao foi possivel salvar a sessao Extranet: {e}")
+
+    def invalidar(self):
+        """Remove o arquivo de cache."""
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
+
+    # ── Uso no navegador ──────────────────────────────────────────────
+
+    async def restaurar(self, context) -> bool:
+        """Aplica cookies e localStorage do cache no contexto. Retorna False se nao ha cache valido."""
+        state = self.carregar()
+        if not state:
+            return False
+
+        cookies = state.get("cookies", [])
+        if cookies:
+            await context.add_cookies(cookies)
+
+        # localStorage so pode ser escrito na origem correta: injeta via init script
+        origens = {
+            o["origin"]: {item["name"]: item["value"] for item in o.get("localStorage", [])}
+            for o in state.get("origins", []) if o.get("localStorage")
+        }
+        if origens:
+            await context.add_init_script(
+                "(origens => {"
+                " const dados = origens[window.location.origin];"
+                " if (!dados) return;"
+                " for (const [k, v] of Object.entries(dados)) {"
+                "   if (window.localStorage.getItem(k) === null) window.localStorage.setItem(k, v);"
+                " }"
+                f"}})({json.dumps(origens)})"
+            )
+
+        logger.info(f"Sessao Extranet restaurada do cache ({len(cookies)} cookies, {len(origens)} origens).")
+        return True
+
+    async def validar(self, page, url_alvo: str, pronto, timeout: int = 20000) -> bool:
+        """
+        Navega ate url_alvo e aguarda o que acontecer primeiro:
+          - redirecionamento para o login B2C -> sessao invalida (cache descartado)
+          - `pronto` satisfeito -> sessao valida
+        `pronto` pode ser um Locator (aguarda visivel) ou um predicado de URL.
+        """
+        try:
+            await page.goto(url_alvo, wait_until="domcontentloaded", timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Falha ao navegar para validar sessao: {e}")
+
+        if LOGIN_HOST in page.url:
+            logger.info("Sessao Extranet em cache rejeitada (redirecionou para o login).")
+            self.invalidar()
+            return False
+
+        if callable(pronto):
+            espera_pronto = page.wait_for_url(pronto, timeout=timeout)
+        else:
+            espera_pronto = pronto.wait_for(state="visible", timeout=timeout)
+
+        tarefa_login = asyncio.ensure_future(page.wait_for_url(lambda url: LOGIN_HOST in url, timeout=timeout))
+        tarefa_pronto = asyncio.ensure_future(espera_pronto)
+        feitas, pendentes = await asyncio.wait({tarefa_login, tarefa_pronto}, return_when=asyncio.FIRST_COMPLETED)
+        for tarefa in pendentes:
+            tarefa.cancel()
+        await asyncio.gather(*pendentes, return_exceptions=True)
+
+        if tarefa_pronto in feitas and tarefa_pronto.exception() is None:
+            logger.info("Sessao Extranet em cache validada.")
+            return True
+
+        logger.info("Sessao Extranet em cache rejeitada (pagina alvo nao carregou autenticada).")
+        self.invalidar()
+        return False
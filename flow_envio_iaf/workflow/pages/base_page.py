@@ -2,8 +2,16 @@ import logging
 from playwright.async_api import Page, Response
 import os
 
+from workflow.components.espera import Espera
+from workflow.components.metricas_acoes import MetricasAcoes
+from workflow.components.sessao_extranet import SessaoExtranet
+
 logger = logging.getLogger(__name__)
 
+URL_ALVO_IAF = "https://extranet.grupoboticario.com.br/mfe/gi/iaf-consolidated/summary"
+# Conteúdo que só aparece com a SPA autenticada (tabela de indicadores ou data de atualização)
+SELETOR_IAF_PRONTO = "#IAFConsolidatedIndicators, span.sc-dlWCHZ"
+
 class BasePage:
     """
     Classe base para todas as páginas (Page Objects).
@@ -12,19 +20,24 @@ class BasePage:
 
     def __init__(self, page: Page):
         self.page = page
+        self.origem_sessao = None
+        self.espera = Espera.da_pagina(page)
+        self.metricas = MetricasAcoes.do_contexto(page.context)
 
     async def navegar(self, url: str):
         """Navega para uma URL específica."""
         logger.info(f"Navegando para: {url}")
-        response = await self.page.goto(url, wait_until="domcontentloaded")
+        async with self.metricas.medir("navegar", url.split("?")[0]):
+            response = await self.page.goto(url, wait_until="domcontentloaded")
         return response
 
     async def extrair_texto(self, seletor: str, timeout: int = 5000) -> str:
         """Espera um elemento e retorna seu texto."""
         try:
-            elemento = self.page.locator(seletor).first
-            await elemento.wait_for(state="visible", timeout=timeout)
-            return await elemento.inner_text()
+            async with self.metricas.medir("extrair_texto", seletor):
+                elemento = self.page.locator(seletor).first
+                await elemento.wait_for(state="visible", timeout=timeout)
+                return await elemento.inner_text()
         except Exception as e:
             logger.warning(f"Erro ao extrair texto de {seletor}: {e}")
             return ""
@@ -32,9 +45,10 @@ class BasePage:
     async def clicar(self, seletor: str, timeout: int = 5000):
         """Clica em um elemento."""
         try:
-            elemento = self.page.locator(seletor).first
-            await elemento.wait_for(state="visible", timeout=timeout)
-            await elemento.click()
+            async with self.metricas.medir("clicar", seletor):
+                elemento = self.page.locator(seletor).first
+                await elemento.wait_for(state="visible", timeout=timeout)
+                await elemento.click()
         except Exception as e:
             logger.error(f"Erro ao clicar em {seletor}: {e}")
             raise e
@@ -42,9 +56,10 @@ class BasePage:
     async def preencher(self, seletor: str, valor: str, timeout: int = 5000):
         """Preenche um campo de input."""
         try:
-            elemento = self.page.locator(seletor).first
-            await elemento.wait_for(state="visible", timeout=timeout)
-            await elemento.fill(valor)
+            async with self.metricas.medir("preencher", seletor):
+                elemento = self.page.locator(seletor).first
+                await elemento.wait_for(state="visible", timeout=timeout)
+                await elemento.fill(valor)
         except Exception as e:
             logger.error(f"Erro ao preencher {seletor}: {e}")
             raise e
@@ -53,7 +68,25 @@ class BasePage:
         """
         Realiza o login utilizando credenciais e, logo após, 
         navega para a página alvo (iaf-consolidated summary).
+
+        Reaproveita a sessão em cache (SessaoExtranet) quando ainda válida;
+        só cai no formulário B2C se o cache estiver ausente, expirado ou rejeitado.
+        A origem fica em self.origem_sessao ("cache" ou "login").
         """
+        sessao = SessaoExtranet(usuario)
+        if await sessao.restaurar(self.page.context):
+            pronto = self.page.locator(SELETOR_IAF_PRONTO).first
+            if await sessao.validar(self.page, URL_ALVO_IAF, pronto):
+                self.origem_sessao = "cache"
+                logger.info("Sessão em cache válida: login pulado.")
+                return
+
+        await self._login_completo(usuario, senha)
+        await sessao.salvar(self.page.context)
+        self.origem_sessao = "login"
+
+    async def _login_completo(self, usuario: str, senha: str):
+        """Login pelo formulário B2C + callback OAuth, terminando na URL alvo."""
         logger.info("Iniciando processo de login...")
         
         # Navega para a página de login
@@ -71,19 +104,20 @@ class BasePage:
         # Aguarda o redirecionamento do callback OAuth completar
         # O login redireciona para extranet.grupoboticario.com.br/auth/callback e depois para a home
         logger.info("Aguardando redirecionamento do login (callback OAuth)...")
-        await self.page.wait_for_url("**/extranet.grupoboticario.com.br/**", timeout=30000)
+        async with self.metricas.medir("aguardar_url", "**/extranet.grupoboticario.com.br/**"):
+            await self.page.wait_for_url("**/extranet.grupoboticario.com.br/**", timeout=30000)
         logger.info(f"Redirecionamento concluído. URL atual: {self.page.url}")
         
         # Aguarda a página pós-login estabilizar (SPA pode não atingir networkidle)
         await self.page.wait_for_load_state("domcontentloaded")
-        await self.page.wait_for_timeout(3000)
+        await self.espera.url_estavel(estavel_ms=1000, substitui_ms=3000)
         logger.info("Página pós-login estabilizada.")
         
         # Navega para a página desejada
-        url_alvo = "https://extranet.grupoboticario.com.br/mfe/gi/iaf-consolidated/summary"
-        logger.info(f"Navegando para a URL alvo: {url_alvo}")
-        await self.page.goto(url_alvo, wait_until="domcontentloaded", timeout=30000)
+        logger.info(f"Navegando para a URL alvo: {URL_ALVO_IAF}")
+        async with self.metricas.medir("navegar", URL_ALVO_IAF):
+            await self.page.goto(URL_ALVO_IAF, wait_until="domcontentloaded", timeout=30000)
         
         # Aguarda a SPA renderizar o conteúdo
-        await self.page.wait_for_timeout(3000)
+        await self.espera.seletor_estavel(SELETOR_IAF_PRONTO, substitui_ms=3000)
         logger.info("Login realizado e navegação para a URL alvo concluída.")
@@ -3,19 +3,144 @@ Page Object para a página IAF Consolidated Summary.
 Extrai dados de Panorama, Pilares e Indicadores do Programa.
 """
 
+import asyncio
 import logging
 import time
 import re
+from datetime import datetime
 from playwright.async_api import Page
 
+from workflow.components.captura_respostas import CapturaRespostas
+from workflow.components.espera import Espera
+from workflow.components.modelo_iaf import SnapshotIAF, classificar, formatar_pontos
+
 logger = logging.getLogger(__name__)
 
+# Chamadas XHR/fetch do MFE iaf-consolidated (summary, pilares, indicadores)
+PADRAO_API_IAF = r"(?i)iaf"
+
+SELETOR_LINHAS_INDICADORES = "#IAFConsolidatedIndicators .ant-table-body .ant-table-row"
+# Colunas da tabela de indicadores, na ordem em que aparecem
+CAMPOS_INDICADOR = ("nome", "habilitador", "realizado", "atingimento", "meta", "falta_meta")
+
+# Texto de todas as células de todas as linhas, numa única ida ao navegador
+JS_TABELA_INDICADORES = """(seletor) => Array.from(document.querySelectorAll(seletor)).map(
+    linha => Array.from(linha.querySelectorAll('td.ant-table-cell')).map(td => td.innerText.trim())
+)"""
+
+# Panorama, rankings, pilares, indicadores e data de atualização num único evaluate.
+# Mesmos seletores dos métodos campo a campo; o que não existir vem como null.
+JS_PAINEL = """(seletorIndicadores) => {
+    const texto = (el) => el ? el.innerText.trim() : null;
+    const textos = (lista) => Array.from(lista).map(texto);
+
+    const tituloPontuacao = Array.from(document.querySelectorAll('span'))
+        .find(s => s.textContent.includes('Pontuação do CP'));
+    const blocoPontuacao = tituloPontuacao && tituloPontuacao.parentElement && tituloPontuacao.parentElement.parentElement;
+
+    return {
+        data_atualizacao: texto(document.querySelector('span.sc-dlWCHZ')),
+        pontuacao_cp: blocoPontuacao ? texto(blocoPontuacao.querySelector('p.flora--c-PJLV-faOdEG-cv')) : null,
+        ranking_rotulos: textos(document.querySelectorAll("[data-flora='card'] .flora--c-PJLV-faOdEG-cv")),
+        ranking_valores: textos(document.querySelectorAll("[data-flora='card'] .flora--c-PJLV-blyrBC-cv")),
+        pilares: Array.from(document.querySelectorAll("div[data-flora='card'].flora--c-jAOGHF-iZiwDu-css")).map(card => ({
+            nome: texto(card.querySelector('p.flora--c-PJLV-iimjeqz-css')),
+            pontos: texto(card.querySelector('p.flora--c-PJLV-faOdEG-cv')),
+            meta: texto(card.querySelector('p.flora--c-PJLV-idVWDIH-css')),
+            tags: textos(card.querySelectorAll("span[data-flora='tag'] p")),
+        })),
+        indicadores: Array.from(document.querySelectorAll(seletorIndicadores)).map(
+            linha => textos(linha.querySelectorAll('td.ant-table-cell'))
+        ),
+    };
+}"""
+
+
+def normalizar_data(valor) -> str:
+    """Converte 'dd/mm/aaaa...' ou 'aaaa-mm-dd...' para 'dd/mm/aaaa' (vazio se não for data)."""
+    texto = str(valor)
+    if re.match(r"\d{2}/\d{2}/\d{4}", texto):
+        return texto[:10]
+    if re.match(r"\d{4}-\d{2}-\d{2}T.*(Z|[+-]\d{2}:?\d{2})$", texto):
+        # Timestamp com fuso (ex.: UTC): a data que importa é a local
+        try:
+            instante = datetime.fromisoformat(texto.replace("Z", "+00:00"))
+            return instante.astimezone().strftime("%d/%m/%Y")
+        except ValueError:
+            pass
+    iso = re.match(r"(\d{4})-(\d{2})-(\d{2})", texto)
+    return f"{iso.group(3)}/{iso.group(2)}/{iso.group(1)}" if iso else ""
+
+
+def normalizar_data_hora(valor) -> str:
+    """
+    Como normalizar_data, mas preserva o horário quando houver:
+    'dd/mm/aaaa, às HH:MM:SS' (formato do rótulo do dashboard).
+    """
+    texto = str(valor).strip()
+    if re.match(r"\d{2}/\d{2}/\d{4}", texto):
+        return texto
+    if re.match(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}", texto):
+        try:
+            instante = datetime.fromisoformat(texto.replace("Z", "+00:00"))
+            if instante.tzinfo:
+                instante = instante.astimezone()
+            return instante.strftime("%d/%m/%Y, às %H:%M:%S")
+        except ValueError:
+            pass
+    return normalizar_data(texto)
+
+
+def data_pela_receita(respostas: list, receita: dict) -> str:
+    """
+    Data de atualização nas respostas capturadas (a mais recente primeiro),
+    pela chamada e caminho da receita confirmada contra o rótulo do DOM.
+    "" se nenhuma resposta for dessa chamada ou tiver o caminho.
+    """
+    chamada = receita["chamadas"][0]
+    endpoint = chamada["url"].split("?")[0]
+    for resposta in reversed(respostas):
+        if resposta.metodo != chamada.get("metodo", "GET") or resposta.url.split("?")[0] != endpoint:
+            continue
+        try:
+            valor = resposta.dados
+            for chave in receita["caminho_data"]:
+                valor = valor[chave]
+        except (KeyError, IndexError, TypeError):
+            continue
+        texto = normalizar_data_hora(valor)
+        if texto:
+            logger.info(f"Data de atualização via payload da API ({resposta.caminho}): '{valor}'")
+            return texto
+    return ""
+
+
+def _converter_pontos(texto: str) -> float:
+    """Converte "1.587,30 pts" em 1587.3."""
+    return float(texto.replace(" pts", "").replace(" pts.", "").replace(".", "").replace(",", "."))
+
+
+def corrigir_panorama_pelos_pilares(snapshot: SnapshotIAF):
+    """Recalcula pontuação e classificação pela soma dos pilares (se houver variação do site)."""
+    soma_pontos = snapshot.soma_pontos
+    if soma_pontos > 0:
+        panorama = snapshot.panorama
+        panorama.pontuacao_cp = f"{soma_pontos:.2f} pts".replace('.', ',')
+        panorama.classificacao, panorama.classificacao_pct = classificar(soma_pontos, "Não classificado")
+
 
 class IAFPage:
-    """Extrai todos os dados da página IAF Consolidated Summary."""
+    """
+    Extrai todos os dados da página IAF Consolidated Summary.
+    Com `receita_data` (receita confirmada da data de atualização), a data
+    sai do payload da API desta aba quando o rótulo ainda não renderizou.
+    """
 
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, receita_data: dict = None):
         self.page = page
+        self.receita_data = receita_data
+        self.espera = Espera.da_pagina(page)
+        self.captura = CapturaRespostas.do_contexto(page.context)
 
     async def fechar_modal_satisfacao(self):
         """Fecha o modal de pesquisa de satisfação do IAF, se aparecer."""
@@ -47,9 +172,16 @@ class IAFPage:
         logger.info("Aguardando carregamento da tabela de indicadores...")
         await self.fechar_modal_satisfacao()
         await self.page.wait_for_selector("#IAFConsolidatedIndicators", timeout=timeout)
-        await self.page.wait_for_timeout(2000)
+        await self.espera.seletor_estavel("#IAFConsolidatedIndicators .ant-table-body", substitui_ms=2000)
         logger.info("Tabela de indicadores carregada.")
 
+    def respostas_api(self) -> dict:
+        """
+        Payloads JSON da API do IAF já recebidos por esta aba (caminho -> dados).
+        Chegam antes da renderização, então após aguardar_carregamento() estão completos.
+        """
+        return {r.caminho: r.dados for r in self.captura.todas(PADRAO_API_IAF, pagina=self.page)}
+
     async def extrair_data_atualizacao(self) -> str:
         """Extrai a data de atualização exibida no dashboard IAF."""
         logger.info("Extraindo data de atualização...")
@@ -83,33 +215,7 @@ class IAFPage:
             panorama["pontuacao_cp"] = "N/D"
 
         # Calcular Classificação e Percentual a partir da pontuação
-        META_CP = 915.0
-        try:
-            if panorama["pontuacao_cp"] != "N/D":
-                # Limpa a string (ex: "587,30 pts" ou "1.587,30")
-                num_str = panorama["pontuacao_cp"].replace(" pts", "").replace(" pts.", "").replace(".", "").replace(",", ".")
-                pontos_float = float(num_str)
-                atingimento_pct = pontos_float / META_CP
-                
-                panorama["classificacao_pct"] = f"{(atingimento_pct * 100):.2f}%".replace(".", ",")
-                
-                if atingimento_pct >= 0.95:
-                    panorama["classificacao"] = "Diamante"
-                elif atingimento_pct >= 0.85:
-                    panorama["classificacao"] = "Ouro"
-                elif atingimento_pct >= 0.75:
-                    panorama["classificacao"] = "Prata"
-                elif atingimento_pct >= 0.65:
-                    panorama["classificacao"] = "Bronze"
-                else:
-                    panorama["classificacao"] = "Sem classificação"
-            else:
-                panorama["classificacao"] = "N/D"
-                panorama["classificacao_pct"] = "N/D"
-        except Exception as e:
-            logger.warning(f"Erro ao calcular classificação: {e}")
-            panorama["classificacao"] = "N/D"
-            panorama["classificacao_pct"] = "N/D"
+        self._classificar_panorama(panorama)
 
         # Rankings (Brasil, Regional, MUSK/Clube)
         panorama["rankings"] = {}
@@ -128,6 +234,75 @@ class IAFPage:
         logger.info(f"Panorama extraído: {panorama}")
         return panorama
 
+    @staticmethod
+    def _classificar_panorama(panorama: dict):
+        """Preenche classificação e percentual a partir de panorama["pontuacao_cp"]."""
+        try:
+            if panorama["pontuacao_cp"] != "N/D":
+                # Limpa a string (ex: "587,30 pts" ou "1.587,30")
+                pontos_float = _converter_pontos(panorama["pontuacao_cp"])
+                panorama["classificacao"], panorama["classificacao_pct"] = classificar(pontos_float)
+            else:
+                panorama["classificacao"] = "N/D"
+                panorama["classificacao_pct"] = "N/D"
+        except Exception as e:
+            logger.warning(f"Erro ao calcular classificação: {e}")
+            panorama["classificacao"] = "N/D"
+            panorama["classificacao_pct"] = "N/D"
+
+    async def extrair_painel(self) -> dict:
+        """
+        Lê panorama, rankings, pilares, indicadores e data de atualização numa
+        única passada pelo DOM (JS_PAINEL). Classificação e demais cálculos
+        rodam em Python sobre o resultado.
+        Se o evaluate falhar, cai nos métodos campo a campo.
+        """
+        logger.info("Extraindo painel IAF numa única passada pelo DOM...")
+        try:
+            bruto = await self.page.evaluate(JS_PAINEL, SELETOR_LINHAS_INDICADORES)
+        except Exception as e:
+            logger.warning(f"Extração em lote do painel falhou, lendo campo a campo: {e}")
+            return {
+                "data_atualizacao": await self.extrair_data_atualizacao(),
+                "panorama": await self.extrair_panorama(),
+                "pilares": await self.extrair_pilares(),
+                "indicadores": await self.extrair_indicadores(),
+            }
+
+        panorama = {"pontuacao_cp": bruto["pontuacao_cp"] or "N/D"}
+        self._classificar_panorama(panorama)
+        rotulos, valores = bruto["ranking_rotulos"], bruto["ranking_valores"]
+        panorama["rankings"] = {rotulos[i]: valores[i] for i in range(min(len(rotulos), len(valores)))}
+        logger.info(f"Panorama extraído: {panorama}")
+
+        pilares = []
+        for card in bruto["pilares"]:
+            tags = card["tags"]
+            pilares.append({
+                "nome": card["nome"] or "N/D",
+                "pontos": card["pontos"] or "N/D",
+                "meta": card["meta"] or "N/D",
+                "atingimento": tags[0] if len(tags) >= 1 else "N/D",
+                "falta_meta": tags[1] if len(tags) >= 2 else "N/D",
+            })
+        logger.info(f"Pilares extraídos: {len(pilares)}")
+
+        data_atualizacao = bruto["data_atualizacao"]
+        if data_atualizacao is None and self.receita_data:
+            # Rótulo ainda não renderizado: a mesma data já veio no payload desta aba
+            respostas = self.captura.todas(PADRAO_API_IAF, pagina=self.page)
+            data_atualizacao = data_pela_receita(respostas, self.receita_data) or None
+        if data_atualizacao is None:
+            # Sem payload da receita: o método dedicado espera pelo rótulo
+            data_atualizacao = await self.extrair_data_atualizacao()
+
+        return {
+            "data_atualizacao": data_atualizacao,
+            "panorama": panorama,
+            "pilares": pilares,
+            "indicadores": await self._montar_indicadores(bruto["indicadores"]),
+        }
+
     async def extrair_pilares(self) -> list:
         """Extrai os dados da seção Pilares."""
         logger.info("Extraindo dados dos Pilares...")
@@ -189,118 +364,115 @@ class IAFPage:
         return pilares
 
     async def extrair_indicadores(self) -> list:
-        """Extrai os dados da tabela de Indicadores do Programa."""
+        """
+        Extrai os dados da tabela de Indicadores do Programa.
+        Lê todas as linhas e colunas num único evaluate; só as linhas que vierem
+        incompletas são relidas célula a célula.
+        """
         logger.info("Extraindo dados dos Indicadores do Programa...")
         indicadores = []
 
         try:
-            linhas = self.page.locator("#IAFConsolidatedIndicators .ant-table-body .ant-table-row")
-            count = await linhas.count()
-            logger.info(f"Encontradas {count} linhas de indicadores.")
-
-            for i in range(count):
-                linha = linhas.nth(i)
-                indicador = {}
-
-                colunas = linha.locator("td.ant-table-cell")
-
-                # Coluna 0 - Nome do indicador (texto do link)
-                try:
-                    indicador["nome"] = (await colunas.nth(0).inner_text()).strip()
-                except Exception:
-                    indicador["nome"] = "N/D"
-
-                # Coluna 1 - Habilitador
-                try:
-                    indicador["habilitador"] = (await colunas.nth(1).inner_text()).strip()
-                except Exception:
-                    indicador["habilitador"] = "N/D"
-
-                # Coluna 2 - Realizado
-                try:
-                    indicador["realizado"] = (await colunas.nth(2).inner_text()).strip()
-                except Exception:
-                    indicador["realizado"] = "N/D"
-
-                # Coluna 3 - Atingimento (pontos + %)
-                try:
-                    indicador["atingimento"] = (await colunas.nth(3).inner_text()).strip()
-                except Exception:
-                    indicador["atingimento"] = "N/D"
-
-                # Coluna 4 - Meta (pontos + valor)
-                try:
-                    indicador["meta"] = (await colunas.nth(4).inner_text()).strip()
-                except Exception:
-                    indicador["meta"] = "N/D"
-
-                # Coluna 5 - Falta p/ Meta (pontos + %)
-                try:
-                    indicador["falta_meta"] = (await colunas.nth(5).inner_text()).strip()
-                except Exception:
-                    indicador["falta_meta"] = "N/D"
-
-                indicadores.append(indicador)
-
+            try:
+                tabela = await self.page.evaluate(JS_TABELA_INDICADORES, SELETOR_LINHAS_INDICADORES)
+            except Exception as e:
+                logger.warning(f"Extração em lote dos indicadores falhou, lendo célula a célula: {e}")
+                tabela = [[] for _ in range(await self.page.locator(SELETOR_LINHAS_INDICADORES).count())]
+            indicadores = await self._montar_indicadores(tabela)
         except Exception as e:
             logger.error(f"Erro ao extrair indicadores: {e}")
 
+        return indicadores
+
+    async def _montar_indicadores(self, tabela: list) -> list:
+        """Converte as linhas lidas em lote em dicts; linhas incompletas são relidas célula a célula."""
+        logger.info(f"Encontradas {len(tabela)} linhas de indicadores.")
+        linhas = self.page.locator(SELETOR_LINHAS_INDICADORES)
+        indicadores = []
+        relidas = 0
+        for i, celulas in enumerate(tabela):
+            if len(celulas) >= len(CAMPOS_INDICADOR):
+                indicadores.append(dict(zip(CAMPOS_INDICADOR, celulas)))
+            else:
+                relidas += 1
+                indicadores.append(await self._extrair_indicador_por_campo(linhas.nth(i)))
+        if relidas:
+            logger.info(f"{relidas} linha(s) incompleta(s) relidas célula a célula.")
+
         logger.info(f"Indicadores extraídos: {len(indicadores)}")
         return indicadores
 
-    async def extrair_tudo(self) -> dict:
-        """Extrai todos os dados da página IAF e retorna um dicionário consolidado."""
+    async def _extrair_indicador_por_campo(self, linha) -> dict:
+        """Fallback: lê cada coluna da linha separadamente ("N/D" no que faltar)."""
+        indicador = {}
+        colunas = linha.locator("td.ant-table-cell")
+        for indice, campo in enumerate(CAMPOS_INDICADOR):
+            try:
+                indicador[campo] = (await colunas.nth(indice).inner_text(timeout=2000)).strip()
+            except Exception:
+                indicador[campo] = "N/D"
+        return indicador
+
+    async def extrair_tudo(self) -> SnapshotIAF:
+        """
+        Extrai todos os dados da página IAF e retorna o snapshot tipado, com os
+        números já convertidos (ver modelo_iaf).
+        """
         await self.aguardar_carregamento()
 
-        panorama = await self.extrair_panorama()
-        pilares = await self.extrair_pilares()
-        
+        dados = await self.extrair_painel()
+        dados["api"] = self.respostas_api()
+        logger.info(f"Payloads da API IAF capturados: {list(dados['api'])}")
+        snapshot = SnapshotIAF.de_dict(dados)
+
         # Corrigir o panorama utilizando a soma dos pilares (se houver variação do site)
         try:
-            soma_pontos = 0.0
-            for p in pilares:
-                pontos_str = p.get("pontos", "0")
-                match_pts = re.search(r'([\d\.,]+)\s*pts?', pontos_str) if pontos_str and pontos_str != "N/D" else None
-                if match_pts:
-                    num_str = match_pts.group(1).replace('.', '').replace(',', '.')
-                    try:
-                        soma_pontos += float(num_str)
-                    except ValueError:
-                        pass
-            
-            if soma_pontos > 0:
-                META_CP = 915.0
-                atingimento_pct = soma_pontos / META_CP
-                
-                panorama["pontuacao_cp"] = f"{soma_pontos:.2f} pts".replace('.', ',')
-                panorama["classificacao_pct"] = f"{(atingimento_pct * 100):.2f}%".replace(".", ",")
-                
-                if atingimento_pct >= 0.95:
-                    panorama["classificacao"] = "Diamante"
-                elif atingimento_pct >= 0.85:
-                    panorama["classificacao"] = "Ouro"
-                elif atingimento_pct >= 0.75:
-                    panorama["classificacao"] = "Prata"
-                elif atingimento_pct >= 0.65:
-                    panorama["classificacao"] = "Bronze"
-                else:
-                    panorama["classificacao"] = "Não classificado"
+            corrigir_panorama_pelos_pilares(snapshot)
         except Exception as e:
             logger.warning(f"Erro ao recalcular panorama pela soma de pilares: {e}")
 
-        dados = {
-            "data_atualizacao": await self.extrair_data_atualizacao(),
-            "panorama": panorama,
-            "pilares": pilares,
-            "indicadores": await self.extrair_indicadores(),
-        }
+        return snapshot
 
-        return dados
+    @staticmethod
+    async def extrair_unidades(context, unidades: dict, url_modelo: str, concorrencia: int = 4,
+                               receita_data: dict = None) -> dict:
+        """
+        Extrai várias unidades (CPs/lojas) em paralelo, cada uma numa aba do
+        mesmo contexto autenticado. `unidades` mapeia nome -> filtro, aplicado
+        em `url_modelo` no lugar de {unidade}. Retorna nome -> SnapshotIAF, na
+        ordem de `unidades`; unidades que falharem ficam de fora (logadas).
+        """
+        semaforo = asyncio.Semaphore(concorrencia)
+
+        async def extrair(nome: str, filtro: str) -> SnapshotIAF:
+            async with semaforo:
+                page = await context.new_page()
+                try:
+                    logger.info(f"[{nome}] Abrindo dashboard IAF da unidade...")
+                    await page.goto(url_modelo.format(unidade=filtro), wait_until="domcontentloaded", timeout=30000)
+                    # Payloads filtrados pela aba: os das abas paralelas não se misturam
+                    return await IAFPage(page, receita_data).extrair_tudo()
+                finally:
+                    await page.close()
+
+        nomes = list(unidades)
+        resultados = await asyncio.gather(
+            *(extrair(nome, unidades[nome]) for nome in nomes), return_exceptions=True
+        )
+
+        snapshots = {}
+        for nome, resultado in zip(nomes, resultados):
+            if isinstance(resultado, Exception):
+                logger.error(f"[{nome}] Falha ao extrair unidade: {type(resultado).__name__}: {resultado}")
+            else:
+                snapshots[nome] = resultado
+        logger.info(f"Unidades extraídas: {len(snapshots)}/{len(nomes)}")
+        return snapshots
 
     @staticmethod
-    def gerar_markdown(dados: dict) -> str:
+    def gerar_markdown(dados: SnapshotIAF) -> str:
         """Gera um arquivo Markdown estruturado a partir dos dados extraídos."""
-        data_atualizacao_raw = dados.get("data_atualizacao", "N/D")
+        data_atualizacao_raw = dados.data_atualizacao
         match_dt = re.search(r'(\d{2}/\d{2}/\d{4})[^\d]*(\d{2}:\d{2})', data_atualizacao_raw)
         if match_dt:
             data_hora = f"{match_dt.group(1)} {match_dt.group(2)}"
@@ -317,32 +489,18 @@ class IAFPage:
         linhas.append("")
 
         # Panorama
-        pan = dados.get("panorama", {})
-        pilares = dados.get("pilares", [])
-        
-        # Calcular pontuação do CP como soma dos pontos dos pilares
-        soma_pontos = 0.0
-        for p in pilares:
-            pontos_str = p.get("pontos", "0")
-            match_pts = re.search(r'([\d\.,]+)\s*pts?', pontos_str) if pontos_str and pontos_str != "N/D" else None
-            if match_pts:
-                num_str = match_pts.group(1).replace('.', '').replace(',', '.')
-                try:
-                    soma_pontos += float(num_str)
-                except ValueError:
-                    pass
+        pan = dados.panorama
+        pilares = dados.pilares
         
-        if soma_pontos == int(soma_pontos):
-            pontuacao_fmt = f"{int(soma_pontos)} pts"
-        else:
-            pontuacao_fmt = f"{soma_pontos:.2f} pts".replace('.', ',')
+        # Pontuação do CP como soma dos pontos dos pilares
+        pontuacao_fmt = formatar_pontos(dados.soma_pontos)
         
         linhas.append("## Panorama")
         linhas.append(f"- **Pontuação do CP:** {pontuacao_fmt}")
-        linhas.append(f"- **Classificação:** {pan.get('classificacao', 'N/D')} ({pan.get('classificacao_pct', 'N/D')})")
+        linhas.append(f"- **Classificação:** {pan.classificacao} ({pan.classificacao_pct})")
         linhas.append("")
 
-        rankings = pan.get("rankings", {})
+        rankings = pan.rankings
         if rankings:
             linhas.append("### Rankings")
             for label, valor in rankings.items():
@@ -355,25 +513,43 @@ class IAFPage:
             linhas.append("| Pilar | Pontos | Meta | Atingimento | Falta p/ Meta |")
             linhas.append("|---|---|---|---|---|")
             for p in pilares:
-                linhas.append(f"| {p['nome']} | {p['pontos']} | {p['meta']} | {p['atingimento']} | {p['falta_meta']} |")
+                linhas.append(f"| {p.nome} | {p.pontos} | {p.meta} | {p.atingimento} | {p.falta_meta} |")
             linhas.append("")
 
         # Indicadores
-        indicadores = dados.get("indicadores", [])
+        indicadores = dados.indicadores
         if indicadores:
             linhas.append("## Indicadores do Programa")
             linhas.append("| Indicador | Habilitador | Realizado | Atingimento | Meta | Falta p/ Meta |")
             linhas.append("|---|---|---|---|---|---|")
             for ind in indicadores:
                 # Substitui as quebras de linha dentro do texto por "<br>" para não quebrar a tabela Markdown
-                atingimento = ind.get('atingimento', '').replace('\n', ' <br> ')
-                meta = ind.get('meta', '').replace('\n', ' <br> ')
-                falta_meta = ind.get('falta_meta', '').replace('\n', ' <br> ')
+                atingimento = ind.atingimento.replace('\n', ' <br> ')
+                meta = ind.meta.replace('\n', ' <br> ')
+                falta_meta = ind.falta_meta.replace('\n', ' <br> ')
                 
                 linhas.append(
-                    f"| {ind.get('nome', 'N/D')} | {ind.get('habilitador', 'N/D')} | {ind.get('realizado', 'N/D')} | "
+                    f"| {ind.nome} | {ind.habilitador} | {ind.realizado} | "
                     f"{atingimento} | {meta} | {falta_meta} |"
                 )
             linhas.append("")
 
         return "\n".join(linhas)
+
+    @staticmethod
+    def gerar_markdown_unidades(snapshots: dict) -> str:
+        """Markdown de várias unidades: quadro comparativo seguido do resumo de cada uma."""
+        linhas = ["# Resumo IAF por Unidade", ""]
+        linhas.append("| Unidade | Pontuação do CP | Classificação | Atingimento |")
+        linhas.append("|---|---|---|---|")
+        for nome, snapshot in snapshots.items():
+            classificacao, atingimento = classificar(snapshot.soma_pontos, "Não classificado")
+            linhas.append(f"| {nome} | {formatar_pontos(snapshot.soma_pontos)} | {classificacao} | {atingimento} |")
+        linhas.append("")
+
+        for nome, snapshot in snapshots.items():
+            secao = IAFPage.gerar_markdown(snapshot)
+            linhas.append(secao.replace("# Resumo IAF Consolidado", f"# Resumo IAF — {nome}", 1))
+            linhas.append("")
+
+        return "\n".join(linhas)
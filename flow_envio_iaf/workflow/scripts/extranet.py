@@ -10,8 +10,13 @@ from dotenv import load_dotenv
 # Adiciona o diretório raiz do projeto ao sys.path para importações da pasta workflow funcionarem perfeitamente
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
+from workflow.components.espera import Espera
+from workflow.components.historico_iaf import HistoricoIAF
+from workflow.components.metricas_acoes import MetricasAcoes
 from workflow.components.navegador import Navegador
+from workflow.components.sessao_extranet import SessaoExtranet
 from workflow.pages.base_page import BasePage
+from workflow.scripts.verificar_atualizacao_iaf import carregar_receita_confirmada
 
 # Reconfigura a saída padrão (stdout) para utf-8, resolvendo problemas de acentuação no Windows/Powershell
 sys.stdout.reconfigure(encoding='utf-8')
@@ -24,6 +29,109 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def carregar_unidades() -> dict:
+    """
+    Unidades para extração multiunidade (IAF_UNIDADES), nome -> filtro:
+    '{"Loja Centro": "1234", ...}' ou "Loja Centro=1234,CP Norte=5678".
+    Vazio = só a unidade em que o usuário cai após o login.
+    """
+    valor = os.environ.get("IAF_UNIDADES", "").strip()
+    if not valor:
+        return {}
+    if valor.startswith("{"):
+        return json.loads(valor)
+    unidades = {}
+    for item in valor.split(","):
+        nome, _, filtro = item.partition("=")
+        unidades[nome.strip()] = (filtro or nome).strip()
+    return unidades
+
+
+async def extrair_e_salvar_unidades(page, unidades: dict, receita_data: dict = None) -> list:
+    """
+    Extrai todas as unidades em abas paralelas da sessão já autenticada e gera
+    um único Markdown/WhatsApp consolidado. Retorna os arquivos gerados.
+
+    IAF_URL_UNIDADE: URL do dashboard com {unidade} no lugar do filtro.
+    """
+    from workflow.pages.iaf_page import IAFPage
+    from workflow.scripts.formatador_whatsapp import FormatadorWhatsapp
+
+    url_modelo = os.environ.get("IAF_URL_UNIDADE", "")
+    if "{unidade}" not in url_modelo:
+        raise ValueError("IAF_URL_UNIDADE deve conter {unidade} para a extração multiunidade.")
+
+    logger.info(f"Iniciando extração multiunidade ({len(unidades)} unidades)...")
+    concorrencia = int(os.environ.get("IAF_UNIDADES_CONCORRENCIA", "4"))
+    snapshots = await IAFPage.extrair_unidades(page.context, unidades, url_modelo, concorrencia, receita_data)
+    if not snapshots:
+        raise RuntimeError("Nenhuma unidade IAF pôde ser extraída.")
+
+    md_filename = "resumo_iaf.md"
+    with open(md_filename, "w", encoding="utf-8") as f:
+        f.write(IAFPage.gerar_markdown_unidades(snapshots))
+
+    zap_filename = "mensagem_whatsapp.txt"
+    with open(zap_filename, "w", encoding="utf-8") as f:
+        f.write(FormatadorWhatsapp.formatar_unidades(snapshots))
+
+    json_filename = "dados_iaf.json"
+    with open(json_filename, "w", encoding="utf-8") as f:
+        json.dump({nome: s.como_dict(incluir_api=False) for nome, s in snapshots.items()}, f, ensure_ascii=False, indent=2)
+
+    return [md_filename, zap_filename, json_filename]
+
+
+async def extrair_e_salvar(page, receita_data: dict = None) -> list:
+    """
+    Extrai o dashboard IAF da página já autenticada, grava o snapshot no
+    histórico e gera o Markdown e a mensagem do WhatsApp. Retorna os arquivos
+    gerados - nenhum quando o snapshot é igual ao último enviado.
+    Com IAF_UNIDADES configurada, delega para a extração multiunidade.
+    """
+    unidades = carregar_unidades()
+    if unidades:
+        return await extrair_e_salvar_unidades(page, unidades, receita_data)
+
+    logger.info("Iniciando extração de dados da página IAF...")
+    
+    from workflow.pages.iaf_page import IAFPage
+    iaf_page = IAFPage(page, receita_data)
+    dados_iaf = await iaf_page.extrair_tudo()
+    
+    zap_filename = "mensagem_whatsapp.txt"
+    deltas = {}
+    try:
+        with HistoricoIAF() as historico:
+            snapshot_id = historico.registrar(dados_iaf)
+            if historico.ja_enviado(snapshot_id):
+                logger.info("Snapshot IAF igual ao último enviado: formatação e envio pulados.")
+                if os.path.exists(zap_filename):
+                    os.remove(zap_filename)
+                return []
+            deltas = historico.deltas(snapshot_id)
+    except Exception as e:
+        logger.warning(f"Histórico IAF indisponível, seguindo sem variações: {e}")
+    
+    md_content = iaf_page.gerar_markdown(dados_iaf)
+    
+    # Salva o arquivo markdown localmente para ser engolido via RAG
+    md_filename = "resumo_iaf.md"
+    with open(md_filename, "w", encoding="utf-8") as f:
+        f.write(md_content)
+        
+    # Formata e salva a mensagem pro Whatsapp
+    from workflow.scripts.formatador_whatsapp import FormatadorWhatsapp
+    msg_whatsapp = FormatadorWhatsapp.formatar(dados_iaf, deltas)
+    with open(zap_filename, "w", encoding="utf-8") as f:
+        f.write(msg_whatsapp)
+    
+    # Textos + números já convertidos, para consumidores que não devem re-parsear
+    json_filename = "dados_iaf.json"
+    dados_iaf.salvar_json(json_filename)
+    
+    return [md_filename, zap_filename, json_filename]
+
 async def main():
     start_time = time.time()
     
@@ -47,7 +155,7 @@ async def main():
         logger.info(f"Wide Event: {json.dumps(wide_event)}")
         return
 
-    navegador = Navegador()
+    navegador = Navegador(perfil_bloqueio="extranet")
     try:
         page = await navegador.setup_browser()
         base_page = BasePage(page)
@@ -55,32 +163,14 @@ async def main():
         login_start = time.time()
         await base_page.realizar_login(usuario, senha)
         wide_event["login_duration_ms"] = int((time.time() - login_start) * 1000)
+        wide_event["sessao_extranet"] = base_page.origem_sessao
 
         # Extrair dados da página IAF
         extracao_start = time.time()
-        logger.info("Iniciando extração de dados da página IAF...")
-        
-        from workflow.pages.iaf_page import IAFPage
-        iaf_page = IAFPage(page)
-        dados_iaf = await iaf_page.extrair_tudo()
-        
-        md_content = iaf_page.gerar_markdown(dados_iaf)
-        
-        # Salva o arquivo markdown localmente para ser engolido via RAG
-        md_filename = "resumo_iaf.md"
-        with open(md_filename, "w", encoding="utf-8") as f:
-            f.write(md_content)
-            
-        # Formata e salva a mensagem pro Whatsapp
-        from workflow.scripts.formatador_whatsapp import FormatadorWhatsapp
-        msg_whatsapp = FormatadorWhatsapp.formatar(dados_iaf)
-        zap_filename = "mensagem_whatsapp.txt"
-        with open(zap_filename, "w", encoding="utf-8") as f:
-            f.write(msg_whatsapp)
-        
+        receita_data = carregar_receita_confirmada(SessaoExtranet(usuario))
+        wide_event["saved_files"] = await extrair_e_salvar(page, receita_data)
         wide_event["extraction_duration_ms"] = int((time.time() - extracao_start) * 1000)
         wide_event["extraction_status"] = "success"
-        wide_event["saved_files"] = [md_filename, zap_filename]
         
         wide_event["status"] = "success"
         
@@ -91,6 +181,13 @@ async def main():
             "message": str(e)
         }
     finally:
+        wide_event["bloqueio_recursos"] = navegador.resumo_bloqueio()
+        wide_event["captura_respostas"] = navegador.resumo_captura()
+        if navegador.page:
+            wide_event["esperas"] = Espera.da_pagina(navegador.page).resumo()
+            metricas = MetricasAcoes.do_contexto(navegador.context)
+            wide_event["acoes"] = metricas.resumo()
+            metricas.salvar()
         await navegador.stop_browser()
         wide_event["duration_ms"] = int((time.time() - start_time) * 1000)
         
@@ -1,65 +1,29 @@
 import time
 import re
 
+from workflow.components.modelo_iaf import SnapshotIAF, classificar, formatar_pontos
+
 class FormatadorWhatsapp:
     """Responsável por converter os dados brutos extraídos do IAF em uma mensagem clean para WhatsApp."""
 
     @staticmethod
-    def _parse_percent(val_str: str) -> float:
-        if not val_str or val_str == "N/D":
-            return 0.0
-        match = re.search(r'([\d\.,]+)%', val_str)
-        if match:
-            num_str = match.group(1).replace('.', '').replace(',', '.')
-            try:
-                return float(num_str)
-            except ValueError:
-                pass
-        return 0.0
-
-    @staticmethod
-    def _parse_currency(val_str: str) -> float:
-        if not val_str or val_str == "N/D":
-            return 0.0
-        match = re.search(r'R\$\s*([\d\.,]+)', val_str)
-        if match:
-            num_str = match.group(1).replace('.', '').replace(',', '.')
-            try:
-                return float(num_str)
-            except ValueError:
-                pass
-        return 0.0
-
-    @staticmethod
-    def _parse_pontos(val_str: str) -> float:
-        """Extrai o valor numérico dos pontos (ex: '290 pts' -> 290.0, '97,30 pts' -> 97.3)"""
-        if not val_str or val_str == "N/D":
-            return 0.0
-        match = re.search(r'([\d\.,]+)\s*pts?', val_str)
-        if match:
-            num_str = match.group(1).replace('.', '').replace(',', '.')
-            try:
-                return float(num_str)
-            except ValueError:
-                pass
-        return 0.0
+    def _fmt_delta(valor, sufixo: str) -> str:
+        """Variação frente ao dia anterior (ex: ' (+2,5 pts)'); vazio se não houver ou for zero."""
+        if valor is None or abs(valor) < 0.05:
+            return ""
+        num = f"{valor:+.1f}".replace('.', ',').replace(',0', '')
+        return f" ({num}{sufixo})"
 
     @staticmethod
-    def _get_last_line(val_str: str) -> str:
-        """Pega apenas a última linha de uma string com quebras (útil pra pegar % que vem junto com pts)"""
-        if not val_str:
-            return "N/D"
-        segs = val_str.replace('<br>', '\n').split('\n')
-        for seg in reversed(segs):
-            s = seg.strip()
-            if s:
-                return s
-        return "N/D"
-
-    @staticmethod
-    def formatar(dados: dict) -> str:
+    def formatar(dados: SnapshotIAF, deltas: dict = None) -> str:
+        """
+        Monta a mensagem a partir dos valores já convertidos do snapshot.
+        `deltas` (HistoricoIAF.deltas) acrescenta a variação frente ao snapshot
+        do dia anterior na pontuação, pilares e radar.
+        """
+        deltas = deltas or {}
         # Data e Hora de Atualização
-        data_atualizacao_raw = dados.get("data_atualizacao", "N/D")
+        data_atualizacao_raw = dados.data_atualizacao
         
         # O formato bruto geralmente é "23/02/2026, às 14:42:06"
         # Queremos o formato "23/02/2026 | 14:42"
@@ -74,36 +38,17 @@ class FormatadorWhatsapp:
                 data_hora = time.strftime("%d/%m/%Y %H:%M", time.localtime())
         
         # --- PANORAMA ---
-        panorama = dados.get("panorama", {})
+        panorama = dados.panorama
         
-        # Calcular pontuação do CP como soma dos pontos dos pilares
-        pilares_brutos = dados.get("pilares", [])
-        soma_pontos = sum(
-            FormatadorWhatsapp._parse_pontos(p.get("pontos", "0"))
-            for p in pilares_brutos
-        )
+        # Pontuação do CP como soma dos pontos dos pilares
+        pilares_brutos = dados.pilares
+        soma_pontos = dados.soma_pontos
         
         # Recalcular atingimento e classificação baseado na soma dos pilares
-        META_CP = 915.0
-        atingimento_pct = soma_pontos / META_CP if META_CP > 0 else 0
-        atingimento = f"{(atingimento_pct * 100):.2f}%".replace(".", ",")
-        
-        if atingimento_pct >= 0.95:
-            classificacao_raw = "Diamante"
-        elif atingimento_pct >= 0.85:
-            classificacao_raw = "Ouro"
-        elif atingimento_pct >= 0.75:
-            classificacao_raw = "Prata"
-        elif atingimento_pct >= 0.65:
-            classificacao_raw = "Bronze"
-        else:
-            classificacao_raw = "Não classificado"
+        classificacao_raw, atingimento = classificar(soma_pontos, "Não classificado")
             
         # Formatar a pontuação (sem decimal se for inteiro)
-        if soma_pontos == int(soma_pontos):
-            pontuacao = f"{int(soma_pontos)} pts"
-        else:
-            pontuacao = f"{soma_pontos:.2f} pts".replace('.', ',')
+        pontuacao = formatar_pontos(soma_pontos)
         
         # Emoji por classificação
         emojis_classificacao = {
@@ -115,24 +60,19 @@ class FormatadorWhatsapp:
         emoji_class = emojis_classificacao.get(classificacao_raw, "")
         classificacao = f"{emoji_class} {classificacao_raw}".strip()
             
-        rankings = panorama.get("rankings", {})
+        rankings = panorama.rankings
         br = rankings.get("Brasil", "N/D")
         reg = rankings.get("Regional", "N/D")
         # Pode vir como MUSK, Clube, etc
         clube = rankings.get("MUSK", rankings.get("Clube", "N/D"))
 
+        pontuacao += FormatadorWhatsapp._fmt_delta(deltas.get("pontuacao"), " pts")
+
         # --- PILARES ---
         pilares_formatados = []
         for p in pilares_brutos:
-            pct_str = FormatadorWhatsapp._get_last_line(p.get("atingimento", "0%"))
-            pct = FormatadorWhatsapp._parse_percent(pct_str)
-            
-            # Extrair pontuação do pilar
-            pontos_pilar = FormatadorWhatsapp._parse_pontos(p.get("pontos", "0"))
-            if pontos_pilar == int(pontos_pilar):
-                pontos_fmt = f"{int(pontos_pilar)} pts"
-            else:
-                pontos_fmt = f"{pontos_pilar:.2f} pts".replace('.', ',')
+            pct = p.atingimento_pct
+            pontos_fmt = formatar_pontos(p.pontos_num)
             
             # Definindo cores (Farol de performance) - Verde somente para 100%
             if pct >= 100:
@@ -142,7 +82,9 @@ class FormatadorWhatsapp:
             else:
                 icone = "🔴"
                 
-            nome = p.get("nome", "Pilar")
+            nome = p.nome
+            delta_pilar = deltas.get("pilares", {}).get(nome, {})
+            pontos_fmt += FormatadorWhatsapp._fmt_delta(delta_pilar.get("pontos"), " pts")
             
             # Formatando a porcentagem (se for redondo tira o decimal, senão 1 casa)
             pct_formated = f"{pct:.1f}%".replace('.', ',').replace(',0%', '%')
@@ -163,37 +105,36 @@ class FormatadorWhatsapp:
             texto_pilares.append(txt)
 
         # --- RADAR DOS INDICADORES FORA DA META ---
-        indicadores = dados.get("indicadores", [])
+        indicadores = dados.indicadores
         
         radar_linhas = []
         for ind in indicadores:
-            nome = ind.get("nome", "").strip()
-            habilitador = ind.get("habilitador", "").strip()
+            nome = ind.nome.strip()
+            habilitador = ind.habilitador.strip()
             
             # Retira indicadores vazios ou que são apenas separadores
             if not nome or nome == "N/D":
                 continue
             
-            # Pega valor de %
-            pct_str = FormatadorWhatsapp._get_last_line(ind.get("atingimento", ""))
-            pct_val = FormatadorWhatsapp._parse_percent(pct_str)
+            pct_val = ind.atingimento_pct
             
             is_nao_habilitado = (habilitador == "Não Habilitado")
             indicador_fora_da_meta = False
             
             # Regra específica para 2.7 (Indicador Invertido: 0 ou menor é bom)
             if "2.7 Auditoria em Lojas" in nome:
-                realizado_number = FormatadorWhatsapp._parse_currency(ind.get("realizado", "0"))
                 # Se for maior que 0 as auditorias, está fora da meta
-                if realizado_number > 0:
+                if ind.realizado_moeda > 0:
                     indicador_fora_da_meta = True
                 
                 # Como a auditoria tem % 0.0, sobre-escrevemos o texto que irá pro output:
-                pct_fmt = str(ind.get("realizado", "0").strip())
+                pct_fmt = ind.realizado.strip()
             else:
                 if pct_val < 100.0:
                     indicador_fora_da_meta = True
                 pct_fmt = f"{pct_val:.1f}%".replace('.', ',').replace(',0%', '%')
+                delta_ind = deltas.get("indicadores", {}).get(nome, {})
+                pct_fmt += FormatadorWhatsapp._fmt_delta(delta_ind.get("atingimento"), " p.p.")
             
             # Adiciona ao Radar os indicadores que falharam nas regras
             if indicador_fora_da_meta or is_nao_habilitado:
@@ -203,9 +144,7 @@ class FormatadorWhatsapp:
                 is_receita = ("1.1 Alcance de Meta de Receita PEF Loja" in nome or 
                               "1.2 Alcance de Meta de Receita PEF VD" in nome)
                 if is_receita:
-                    realizado = FormatadorWhatsapp._parse_currency(ind.get("realizado", ""))
-                    meta = FormatadorWhatsapp._parse_currency(ind.get("meta", ""))
-                    diff = meta - realizado
+                    diff = ind.meta_moeda - ind.realizado_moeda
                     if diff > 0:
                         falta_valor = f"R$ {int(diff/1000)}k"
                     else:
@@ -219,9 +158,14 @@ class FormatadorWhatsapp:
         else:
             radar_text = chr(10).join(radar_linhas)
 
+        linha_referencia = ""
+        if deltas.get("referencia"):
+            match_ref = re.search(r'\d{2}/\d{2}/\d{4}', deltas["referencia"])
+            linha_referencia = f"\nVariação em relação a: {match_ref.group(0) if match_ref else deltas['referencia']}"
+
         # Montagem do Template Final (WhatsApp usa *texto* para negrito)
         msg = f"""*Resumo IAF*
-Dashboard atualizado em: {data_hora}
+Dashboard atualizado em: {data_hora}{linha_referencia}
 
 *STATUS ATUAL:* {pontuacao}
 Atingimento: {atingimento}
@@ -236,5 +180,46 @@ Brasil: {br} | Região: {reg} | Clube: {clube}
 *RADAR DE INDICADORES FORA DA META*
 {radar_text}
 
+IA Report"""
+        return msg
+
+    @staticmethod
+    def formatar_unidades(snapshots: dict) -> str:
+        """Mensagem compacta com várias unidades: pontuação, classificação e pior pilar de cada uma."""
+        emojis_classificacao = {
+            "Bronze": "🥉",
+            "Prata": "🥈",
+            "Ouro": "🥇",
+            "Diamante": "💎"
+        }
+
+        datas = {s.data_atualizacao for s in snapshots.values()}
+        data_atualizacao_raw = datas.pop() if len(datas) == 1 else "N/D"
+        match_dt = re.search(r'(\d{2}/\d{2}/\d{4})[^\d]*(\d{2}:\d{2})', data_atualizacao_raw)
+        if match_dt:
+            data_hora = f"{match_dt.group(1)} {match_dt.group(2)}"
+        else:
+            data_hora = time.strftime("%d/%m/%Y %H:%M", time.localtime())
+
+        # Melhor unidade primeiro
+        ordenadas = sorted(snapshots.items(), key=lambda item: item[1].soma_pontos, reverse=True)
+
+        blocos = []
+        for nome, snapshot in ordenadas:
+            classificacao_raw, atingimento = classificar(snapshot.soma_pontos, "Não classificado")
+            classificacao = f"{emojis_classificacao.get(classificacao_raw, '')} {classificacao_raw}".strip()
+            bloco = f"*{nome}:* {formatar_pontos(snapshot.soma_pontos)} | {atingimento} | {classificacao}"
+
+            if snapshot.pilares:
+                pior = min(snapshot.pilares, key=lambda p: p.atingimento_pct)
+                pct_fmt = f"{pior.atingimento_pct:.1f}%".replace('.', ',').replace(',0%', '%')
+                bloco += f"\nFoco: {pior.nome} ({pct_fmt})"
+            blocos.append(bloco)
+
+        msg = f"""*Resumo IAF - {len(snapshots)} unidades*
+Dashboard atualizado em: {data_hora}
+
+{(chr(10) * 2).join(blocos)}
+
 IA Report"""
         return msg
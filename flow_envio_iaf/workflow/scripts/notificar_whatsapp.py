@@ -1,9 +1,18 @@
 import os
 import sys
+import json
+import time
 import logging
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from workflow.components.historico_iaf import HistoricoIAF, historico_habilitado
+
 # Reconfigura stdout para UTF-8 (Windows/PowerShell)
 sys.stdout.reconfigure(encoding='utf-8')
 
@@ -17,11 +26,49 @@ load_dotenv()
 EVOLUTION_API_URL = os.environ.get("EVOLUTION_API_URL")
 EVOLUTION_API_KEY = os.environ.get("EVOLUTION_API_KEY")
 EVOLUTION_INSTANCE = os.environ.get("EVOLUTION_INSTANCE")
+# Atraso de "digitando..." aplicado pela Evolution antes de cada envio
+EVOLUTION_DELAY_MS = int(os.environ.get("EVOLUTION_DELAY_MS", "2000"))
+# (conexão, leitura) em segundos; a leitura inclui o delay acima
+TIMEOUT_ENVIO = (5, float(os.environ.get("EVOLUTION_TIMEOUT_S", "30")))
+TENTATIVAS_ENVIO = int(os.environ.get("EVOLUTION_TENTATIVAS", "3"))
+
+# Destinatários: WHATSAPP_DESTINATARIOS='{"Nome": "id", ...}' ou "Nome=id,Nome2=id2".
+# Sem ela, vale o trio legado WHATSAPP_ID_EDGAR / _PRISCILA / _OPERACAO.
+WHATSAPP_DESTINATARIOS = os.environ.get("WHATSAPP_DESTINATARIOS", "")
 WHATSAPP_ID_EDGAR = os.environ.get("WHATSAPP_ID_EDGAR")
 WHATSAPP_ID_PRISCILA = os.environ.get("WHATSAPP_ID_PRISCILA")
 WHATSAPP_ID_OPERACAO = os.environ.get("WHATSAPP_ID_OPERACAO")
 
 
+def carregar_destinatarios() -> list:
+    """Lista de (nome, número/id do grupo) configurados."""
+    if WHATSAPP_DESTINATARIOS.strip().startswith("{"):
+        return list(json.loads(WHATSAPP_DESTINATARIOS).items())
+    if WHATSAPP_DESTINATARIOS.strip():
+        destinatarios = []
+        for item in WHATSAPP_DESTINATARIOS.split(","):
+            nome, _, numero = item.partition("=")
+            destinatarios.append((nome.strip(), numero.strip()) if numero else (item.strip(), item.strip()))
+        return destinatarios
+    return [
+        ("Edgar", WHATSAPP_ID_EDGAR),
+        ("Priscila", WHATSAPP_ID_PRISCILA),
+        ("Operação", WHATSAPP_ID_OPERACAO)
+    ]
+
+
+def criar_sessao(conexoes: int) -> requests.Session:
+    """Sessão HTTP com pool do tamanho da lista de destinatários (keep-alive entre tentativas)."""
+    sessao = requests.Session()
+    sessao.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=max(conexoes, 1)))
+    sessao.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max(conexoes, 1)))
+    sessao.headers.update({
+        "Content-Type": "application/json",
+        "apikey": EVOLUTION_API_KEY or "",
+    })
+    return sessao
+
+
 def carregar_mensagem(caminho: str = "mensagem_whatsapp.txt") -> str:
     """Carrega o conteúdo da mensagem já formatada pelo formatador_whatsapp.py."""
     if not os.path.exists(caminho):
@@ -35,8 +82,13 @@ def carregar_mensagem(caminho: str = "mensagem_whatsapp.txt") -> str:
     return conteudo
 
 
-def enviar_para_whatsapp(mensagem: str, destinatario: str):
-    """Envia mensagem de texto via Evolution API."""
+def enviar_para_whatsapp(mensagem: str, destinatario: str, sessao: requests.Session = None):
+    """
+    Envia mensagem de texto via Evolution API.
+    O sendText não é idempotente: só é retentado quando a mensagem com certeza
+    não foi entregue (falha de conexão e 429), com backoff curto. Timeout de
+    leitura e 5xx podem ter enviado, então não são repetidos.
+    """
     if not EVOLUTION_API_URL or not EVOLUTION_API_KEY:
         logger.warning("Credenciais Evolution API não configuradas. Apenas logando mensagem.")
         logger.info(f"\n{mensagem}")
@@ -46,37 +98,76 @@ def enviar_para_whatsapp(mensagem: str, destinatario: str):
         logger.error("Destinatário não configurado.")
         return False
 
-    url = f"{EVOLUTION_API_URL}message/sendText/{EVOLUTION_INSTANCE}"
+    if sessao is None:
+        with criar_sessao(1) as sessao:
+            return enviar_para_whatsapp(mensagem, destinatario, sessao)
 
-    headers = {
-        "Content-Type": "application/json",
-        "apikey": EVOLUTION_API_KEY
-    }
+    url = f"{EVOLUTION_API_URL}message/sendText/{EVOLUTION_INSTANCE}"
 
     payload = {
         "number": destinatario,
         "text": mensagem,
-        "delay": 2000,
+        "delay": EVOLUTION_DELAY_MS,
         "linkPreview": False
     }
 
-    try:
-        logger.info(f"Enviando mensagem para {destinatario}...")
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        logger.info(f"Sucesso! Status: {response.status_code}")
-        return True
-    except requests.exceptions.HTTPError as e:
-        logger.error(f"Erro HTTP ao enviar WhatsApp: {e} | Response: {e.response.text}")
-        return False
-    except Exception as e:
-        logger.error(f"Erro ao enviar WhatsApp: {e}")
-        return False
+    for tentativa in range(1, TENTATIVAS_ENVIO + 1):
+        try:
+            logger.info(f"Enviando mensagem para {destinatario} (tentativa {tentativa}/{TENTATIVAS_ENVIO})...")
+            response = sessao.post(url, json=payload, timeout=TIMEOUT_ENVIO)
+            if response.status_code == 429:
+                raise requests.exceptions.RetryError(f"HTTP {response.status_code}")
+            response.raise_for_status()
+            logger.info(f"Sucesso! Status: {response.status_code}")
+            return True
+        except requests.exceptions.HTTPError as e:
+            logger.error(f"Erro HTTP ao enviar WhatsApp: {e} | Response: {e.response.text}")
+            return False
+        except (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout,
+                requests.exceptions.RetryError) as e:
+            logger.warning(f"Falha transitória ao enviar para {destinatario}: {e}")
+            if tentativa < TENTATIVAS_ENVIO:
+                time.sleep(2 ** (tentativa - 1))
+        except Exception as e:
+            # Inclui ReadTimeout: o servidor pode ter enviado, não repete
+            logger.error(f"Erro ao enviar WhatsApp: {e}")
+            return False
+
+    logger.error(f"Envio para {destinatario} falhou após {TENTATIVAS_ENVIO} tentativas.")
+    return False
+
+
+def enviar_para_destinatarios(mensagem: str) -> int:
+    """
+    Envia a mensagem para todos os destinatários ao mesmo tempo (uma thread
+    por destinatário, mesma sessão). Retorna quantos envios deram certo.
+    """
+    destinatarios = []
+    for nome, numero in carregar_destinatarios():
+        if numero:
+            destinatarios.append((nome, numero))
+        else:
+            logger.warning(f"Número não configurado para {nome}.")
+    if not destinatarios:
+        return 0
+
+    with criar_sessao(len(destinatarios)) as sessao, ThreadPoolExecutor(max_workers=len(destinatarios)) as executor:
+        resultados = list(executor.map(lambda d: enviar_para_whatsapp(mensagem, d[1], sessao), destinatarios))
+
+    for (nome, _), ok in zip(destinatarios, resultados):
+        logger.info(f"{nome}: {'enviado' if ok else 'falhou'}")
+    return sum(resultados)
 
 
 if __name__ == "__main__":
     logger.info("--- Iniciando Notificação IAF via WhatsApp ---")
 
+    if historico_habilitado():
+        with HistoricoIAF() as historico:
+            if historico.ja_enviado():
+                logger.info("Último snapshot IAF já foi enviado (sem mudanças). Nada a enviar.")
+                sys.exit(0)
+
     mensagem = carregar_mensagem()
 
     if not mensagem:
@@ -85,22 +176,12 @@ if __name__ == "__main__":
 
     logger.info(f"Prévia da mensagem:\n{mensagem}")
 
-    destinatarios = [
-        ("Edgar", WHATSAPP_ID_EDGAR),
-        ("Priscila", WHATSAPP_ID_PRISCILA),
-        ("Operação", WHATSAPP_ID_OPERACAO)
-    ]
-
-    sucessos = 0
-    for nome, numero in destinatarios:
-        if numero:
-            logger.info(f"Iniciando envio para {nome}...")
-            if enviar_para_whatsapp(mensagem, numero):
-                sucessos += 1
-        else:
-            logger.warning(f"Número não configurado para {nome}.")
+    sucessos = enviar_para_destinatarios(mensagem)
 
     if sucessos > 0:
+        if historico_habilitado():
+            with HistoricoIAF() as historico:
+                historico.marcar_enviado()
         logger.info("--- Notificações enviadas com sucesso! ---")
     else:
         logger.error("--- Falha no envio das notificações ---")
@@ -0,0 +1,270 @@
+"""
+Poller da atualização do dashboard IAF, com a sessão aberta o tempo todo.
+
+Em vez de rodar verificar_atualizacao_iaf.py a cada tick (navegador novo +
+login OAuth completo), faz um único login e fica consultando só a data:
+1. Re-fetch da chamada de API que traz a data (receita gravada no primeiro
+   carregamento), com os cookies do próprio contexto: custa milissegundos
+2. Sem receita, ou se a API recusar, recarrega a SPA e lê o DOM
+3. Se a recarga cair no login B2C, autentica de novo e segue
+O intervalo entre consultas segue a AgendaIAF (espaçado longe do horário
+habitual de atualização, denso perto dele); sem histórico suficiente,
+cresce em backoff exponencial até o máximo.
+Quando a data do dashboard é a de hoje, recarrega a página, extrai
+(resumo_iaf.md / mensagem_whatsapp.txt) e, com IAF_POLL_ENVIAR=1, envia
+pelo WhatsApp e devolve "iaf_last_sent" para o flow gravar no KV.
+
+Variáveis de ambiente:
+  - IAF_POLL_INTERVALO_S:     primeiro intervalo entre consultas (padrão: 60).
+  - IAF_POLL_INTERVALO_MAX_S: teto do backoff e da espera recomendada (padrão: 900).
+  - IAF_POLL_FATOR:           multiplicador do backoff (padrão: 1.5).
+  - IAF_POLL_JANELA_MIN:      tempo máximo de polling antes de desistir (padrão: 240).
+  - IAF_POLL_ENVIAR:          "1" envia o WhatsApp ao final (padrão: "0", o flow envia).
+"""
+
+import asyncio
+import os
+import sys
+import logging
+import json
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from workflow.components.agenda_iaf import AgendaIAF
+from workflow.components.captura_respostas import CapturaRespostas
+from workflow.components.espera import Espera
+from workflow.components.historico_iaf import HistoricoIAF, historico_habilitado
+from workflow.components.metricas_acoes import MetricasAcoes
+from workflow.components.navegador import Navegador
+from workflow.components.sessao_extranet import LOGIN_HOST, SessaoExtranet
+from workflow.pages.base_page import BasePage
+from workflow.scripts.extranet import extrair_e_salvar
+from workflow.scripts.verificar_atualizacao_iaf import (
+    SELETOR_DATA_ATUALIZACAO, carregar_receita_confirmada, extrair_data_atualizacao, ler_data_atualizacao, normalizar_data_hora,
+    verificar_data_hoje,
+)
+from workflow.scripts.verificar_e_extrair_iaf import emitir_outputs
+
+# Reconfigura stdout para UTF-8 (Windows/PowerShell)
+sys.stdout.reconfigure(encoding='utf-8')
+
+# Configuração de logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    stream=sys.stdout
+)
+logger = logging.getLogger(__name__)
+
+
+class PollerIAF:
+    """Mantém a página IAF autenticada e consulta a data de atualização com backoff."""
+
+    def __init__(self, page, usuario: str, senha: str):
+        self.page = page
+        self.usuario = usuario
+        self.senha = senha
+        self.base_page = BasePage(page)
+        self.sessao = SessaoExtranet(usuario)
+        self.captura = CapturaRespostas.do_contexto(page.context)
+        self.receita = None
+        self.carregada_em = 0.0
+        self.consultas = {"api": 0, "recarga": 0, "login": 0}
+
+    async def entrar(self):
+        """Login (ou sessão em cache) e primeira leitura da data na página."""
+        self.carregada_em = time.time()
+        await self.base_page.realizar_login(self.usuario, self.senha)
+        self.consultas["login"] += 1
+        return await self.ler_data_dom()
+
+    async def ler_data_dom(self) -> str:
+        """Lê a data da página carregada (payload da API ou DOM) e grava a receita que a contém."""
+        if self.receita is None:
+            texto_data = await ler_data_atualizacao(
+                self.page, self.captura, self.sessao, self.base_page.espera, apos=self.carregada_em
+            )
+            self.receita = carregar_receita_confirmada(self.sessao)
+            return texto_data
+        await self.base_page.espera.seletor_estavel(SELETOR_DATA_ATUALIZACAO, substitui_ms=3000)
+        return await extrair_data_atualizacao(self.page)
+
+    async def ler_data_api(self) -> str:
+        """Refaz a chamada da receita com os cookies do contexto. "" se não der."""
+        chamada = self.receita["chamadas"][0]
+        cabecalhos = {"accept": "application/json"}
+        if self.receita.get("autorizacao"):
+            cabecalhos["authorization"] = self.receita["autorizacao"]
+        try:
+            resposta = await self.page.context.request.fetch(
+                chamada["url"], method=chamada.get("metodo", "GET"), data=chamada.get("corpo"),
+                headers=cabecalhos, max_redirects=0,
+            )
+            if not resposta.ok:
+                logger.info(f"API respondeu {resposta.status}; recarregando a página.")
+                return ""
+            dados = await resposta.json()
+            for chave in self.receita["caminho_data"]:
+                dados = dados[chave]
+            return normalizar_data_hora(dados)
+        except Exception as e:
+            logger.info(f"Re-fetch da data falhou ({type(e).__name__}: {e}); recarregando a página.")
+            return ""
+
+    async def recarregar(self) -> str:
+        """Recarrega a SPA; se a sessão caiu no login B2C, autentica de novo."""
+        self.carregada_em = time.time()
+        await self.page.reload(wait_until="domcontentloaded")
+        if LOGIN_HOST in self.page.url:
+            logger.info("Sessão expirada durante o polling; refazendo login.")
+            self.sessao.invalidar()
+            self.receita = None
+            return await self.entrar()
+        return await self.ler_data_dom()
+
+    async def consultar(self) -> str:
+        """Uma consulta da data: API quando possível, senão recarga."""
+        if self.receita:
+            texto_data = await self.ler_data_api()
+            if texto_data:
+                self.consultas["api"] += 1
+                return texto_data
+            self.receita = None
+        self.consultas["recarga"] += 1
+        return await self.recarregar()
+
+
+async def main():
+    start_time = time.time()
+
+    wide_event = {
+        "script": "poller_iaf.py",
+        "action": "poll_update",
+        "status": "started",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+
+    load_dotenv()
+    usuario = os.environ.get("EXTRANET_USER")
+    senha = os.environ.get("EXTRANET_PASS")
+    last_sent = os.environ.get("IAF_LAST_SENT", "")
+
+    intervalo_s = float(os.environ.get("IAF_POLL_INTERVALO_S", "60"))
+    intervalo_max_s = float(os.environ.get("IAF_POLL_INTERVALO_MAX_S", "900"))
+    fator = float(os.environ.get("IAF_POLL_FATOR", "1.5"))
+    limite = time.time() + float(os.environ.get("IAF_POLL_JANELA_MIN", "240")) * 60
+    enviar = os.environ.get("IAF_POLL_ENVIAR", "0") == "1"
+
+    hoje_str = datetime.now().strftime("%Y-%m-%d")
+    if last_sent == hoje_str:
+        logger.info(f"✅ O resumo do IAF já foi enviado hoje ({hoje_str}). O fluxo não prosseguirá.")
+        emitir_outputs(False, False, "ja_enviado")
+        sys.exit(0)
+
+    if not usuario or not senha:
+        wide_event["status"] = "error"
+        wide_event["error"] = "Credenciais não encontradas no arquivo .env"
+        logger.error(json.dumps(wide_event, indent=2, ensure_ascii=False))
+        emitir_outputs(False, False, "erro_credenciais")
+        sys.exit(0)
+
+    navegador = Navegador(perfil_bloqueio="extranet")
+    atualizado = False
+    extraido = False
+    enviado_em = None
+
+    try:
+        page = await navegador.setup_browser()
+        poller = PollerIAF(page, usuario, senha)
+
+        agenda = AgendaIAF()
+
+        login_start = time.time()
+        texto_data = await poller.entrar()
+        wide_event["login_duration_ms"] = int((time.time() - login_start) * 1000)
+        wide_event["sessao_extranet"] = poller.base_page.origem_sessao
+
+        while True:
+            wide_event["data_atualizacao_raw"] = texto_data
+            agenda.registrar(texto_data)
+            if verificar_data_hoje(texto_data):
+                atualizado = True
+                break
+
+            # Com histórico, a espera vem da distribuição dos horários; sem ele, backoff
+            recomendacao = agenda.recomendar()
+            if recomendacao["fase"] == "padrao":
+                espera_s = intervalo_s
+                intervalo_s = min(intervalo_s * fator, intervalo_max_s)
+            else:
+                espera_s = min(recomendacao["esperar_s"], intervalo_max_s)
+            if time.time() + espera_s > limite:
+                logger.info("Janela de polling encerrada sem atualização do dashboard.")
+                break
+
+            logger.info(f"Próxima consulta em {espera_s:.0f}s (fase '{recomendacao['fase']}').")
+            await asyncio.sleep(espera_s)
+
+            consulta_start = time.time()
+            texto_data = await poller.consultar()
+            logger.info(f"Consulta concluída em {int((time.time() - consulta_start) * 1000)} ms.")
+
+        wide_event["atualizado_hoje"] = atualizado
+        wide_event["consultas"] = poller.consultas
+        wide_event["poll_duration_ms"] = int((time.time() - start_time) * 1000)
+
+        if atualizado:
+            # A data pode ter vindo da API: a página precisa refletir os dados novos
+            if poller.consultas["api"]:
+                await page.reload(wait_until="domcontentloaded")
+
+            extracao_start = time.time()
+            wide_event["saved_files"] = await extrair_e_salvar(page)
+            wide_event["extraction_duration_ms"] = int((time.time() - extracao_start) * 1000)
+            extraido = True
+
+            # Sem arquivos: snapshot igual ao último enviado (HistoricoIAF)
+            if enviar and wide_event["saved_files"]:
+                from workflow.scripts.notificar_whatsapp import carregar_mensagem, enviar_para_destinatarios
+                if enviar_para_destinatarios(carregar_mensagem()) > 0:
+                    if historico_habilitado():
+                        with HistoricoIAF() as historico:
+                            historico.marcar_enviado()
+                    enviado_em = hoje_str
+                wide_event["whatsapp_enviado"] = enviado_em is not None
+
+        wide_event["status"] = "success"
+
+    except Exception as e:
+        wide_event["status"] = "error"
+        wide_event["error"] = {
+            "type": type(e).__name__,
+            "message": str(e)
+        }
+    finally:
+        wide_event["bloqueio_recursos"] = navegador.resumo_bloqueio()
+        wide_event["captura_respostas"] = navegador.resumo_captura()
+        if navegador.page:
+            wide_event["esperas"] = Espera.da_pagina(navegador.page).resumo()
+            metricas = MetricasAcoes.do_contexto(navegador.context)
+            wide_event["acoes"] = metricas.resumo()
+            metricas.salvar()
+        await navegador.stop_browser()
+        wide_event["duration_ms"] = int((time.time() - start_time) * 1000)
+
+        logger.info(f"Wide Event Consolidado:\n{json.dumps(wide_event, indent=2, ensure_ascii=False)}")
+
+    if enviado_em:
+        # O flow grava este valor em IAF_LAST_SENT
+        emitir_outputs(atualizado, extraido, iaf_last_sent=enviado_em)
+    else:
+        emitir_outputs(atualizado, extraido)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
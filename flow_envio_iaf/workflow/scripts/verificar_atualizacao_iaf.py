@@ -9,6 +9,17 @@ Responsável por:
 
 Será usado em janela de verificação (polling) antes de disparar
 o fluxo completo de extração + envio.
+
+A data vem, em ordem de preferência:
+1. Da API, por HTTP direto com a sessão em cache (receita gravada antes)
+2. Do payload da API capturado durante o login, pelo mesmo caminho da
+   receita (que só é gravada depois de bater com a data do DOM)
+3. Do DOM (span do rótulo, ou qualquer texto "atualiza..." com data), que
+   também grava a receita na primeira vez
+
+Cada data observada (com o horário) alimenta a AgendaIAF, e os outputs
+trazem "esperar_s" / "proxima_verificacao": quando o Kestra deve verificar
+de novo, a partir dos horários em que o dashboard costuma atualizar.
 """
 
 import asyncio
@@ -23,8 +34,16 @@ from dotenv import load_dotenv
 # Adiciona o diretório raiz do projeto ao sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
+from workflow.components.agenda_iaf import AgendaIAF
+from workflow.components.espera import Espera
+from workflow.components.metricas_acoes import MetricasAcoes
 from workflow.components.navegador import Navegador
+from workflow.components.replay_http import (
+    ClienteApiExtranet, SessaoHttpExpirada, carregar_receita, salvar_receita,
+)
+from workflow.components.sessao_extranet import SessaoExtranet
 from workflow.pages.base_page import BasePage
+from workflow.pages.iaf_page import PADRAO_API_IAF, data_pela_receita, normalizar_data, normalizar_data_hora
 
 # Reconfigura stdout para UTF-8 (Windows/PowerShell)
 sys.stdout.reconfigure(encoding='utf-8')
@@ -38,21 +57,167 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Rótulo da data no dashboard (classe gerada pelo CSS-in-JS: muda a cada deploy do MFE)
+SELETOR_DATA_ATUALIZACAO = "span.sc-dlWCHZ"
+
+# Fallback sem classe: menor elemento com "atualiza..." e uma data dd/mm/aaaa
+JS_TEXTO_ATUALIZACAO = """() => {
+    const comData = /\\d{2}\\/\\d{2}\\/\\d{4}/;
+    const candidatos = Array.from(document.querySelectorAll('span, p, div'))
+        .filter(el => /atualiza/i.test(el.textContent) && comData.test(el.textContent) && el.textContent.length < 120);
+    if (!candidatos.length) return '';
+    candidatos.sort((a, b) => a.textContent.length - b.textContent.length);
+    const texto = candidatos[0].textContent;
+    return texto.slice(texto.search(comData)).trim();
+}"""
+
+
 async def extrair_data_atualizacao(page) -> str:
     """Extrai a data de atualização exibida no dashboard IAF."""
     try:
         # Aguarda o elemento de data de atualização aparecer
-        seletor = "span.sc-dlWCHZ"
-        await page.wait_for_selector(seletor, timeout=15000)
+        await page.wait_for_selector(SELETOR_DATA_ATUALIZACAO, timeout=15000)
         
-        elemento = page.locator(seletor).first
+        elemento = page.locator(SELETOR_DATA_ATUALIZACAO).first
         texto = await elemento.inner_text()
         
         logger.info(f"Texto de atualização encontrado: '{texto}'")
         return texto.strip()
+    except Exception as e:
+        logger.warning(f"Rótulo da data não encontrado ({e}); procurando pelo texto.")
+
+    try:
+        texto = await page.evaluate(JS_TEXTO_ATUALIZACAO)
+        if texto:
+            logger.info(f"Texto de atualização encontrado pelo conteúdo: '{texto}'")
+            return texto
     except Exception as e:
         logger.error(f"Erro ao extrair data de atualização: {e}")
+    return ""
+
+
+def localizar_caminhos_data(dados, data_ddmmaaaa: str, caminho=()) -> list:
+    """Caminhos (chaves/índices) de todos os valores do JSON que representam a data exibida no dashboard."""
+    if isinstance(dados, dict):
+        itens = dados.items()
+    elif isinstance(dados, list):
+        itens = enumerate(dados)
+    else:
+        return [list(caminho)] if isinstance(dados, str) and normalizar_data(dados) == data_ddmmaaaa else []
+
+    caminhos = []
+    for chave, valor in itens:
+        caminhos += localizar_caminhos_data(valor, data_ddmmaaaa, caminho + (chave,))
+    return caminhos
+
+
+def carregar_receita_confirmada(sessao: SessaoExtranet):
+    """
+    Receita da data só se tiver sido confirmada contra o rótulo do DOM com
+    campo único (gravar_receita_data); receitas sem "campo_unico" foram
+    aprendidas sem essa exigência e são ignoradas.
+    """
+    receita = carregar_receita(sessao, "iaf_data_atualizacao")
+    return receita if receita and receita.get("confirmada_dom") and receita.get("campo_unico") else None
+
+
+def data_atualizacao_da_api(captura, sessao: SessaoExtranet, apos: float = 0, pagina=None) -> str:
+    """
+    Lê a data do payload da API capturado durante a navegação (da aba
+    `pagina`, se informada), sem depender do DOM, seguindo a receita gravada
+    por gravar_receita_data: mesma chamada e mesmo caminho que já bateram com
+    o rótulo exibido. "" sem receita ou sem payload dessa chamada (o chamador
+    lê o DOM).
+    """
+    receita = carregar_receita_confirmada(sessao)
+    if not receita:
         return ""
+    return data_pela_receita(captura.todas(PADRAO_API_IAF, apos, pagina), receita)
+
+
+async def ler_data_atualizacao(page, captura, sessao: SessaoExtranet, espera: Espera = None,
+                               apos: float = 0) -> str:
+    """
+    Data de atualização da página IAF já carregada: primeiro pelo payload da
+    API capturado (depois de `apos`) via receita confirmada; sem ela, pelo DOM.
+    """
+    await captura.aguardar(PADRAO_API_IAF, timeout_ms=10000, apos=apos, pagina=page)
+    texto_data = data_atualizacao_da_api(captura, sessao, apos, pagina=page)
+    if texto_data:
+        return texto_data
+
+    logger.info("Sem receita confirmada para a data nos payloads da API; lendo o DOM.")
+    if espera:
+        await espera.seletor_estavel(SELETOR_DATA_ATUALIZACAO, substitui_ms=3000)
+    texto_data = await extrair_data_atualizacao(page)
+    if texto_data:
+        gravar_receita_data(captura, sessao, texto_data, pagina=page)
+    return texto_data
+
+
+def gravar_receita_data(captura, sessao: SessaoExtranet, texto_data: str, pagina=None):
+    """
+    Guarda a chamada de API que contém a data de atualização mostrada no DOM,
+    para as próximas verificações usarem HTTP direto (sem Browserless).
+
+    Só aprende quando a data do DOM não é a de hoje (um campo com o horário
+    da resposta, como generatedAt, também bateria) e quando exatamente um
+    campo dos payloads tem essa data; senão a verificação segue pelo DOM.
+    """
+    data_dom = texto_data.split(",")[0].strip()
+    if data_dom == datetime.now().strftime("%d/%m/%Y"):
+        logger.info("Data do DOM é a de hoje; receita da data não aprendida nesta verificação.")
+        return
+
+    # Mesma chamada repetida conta uma vez; a última resposta dela fica com a receita
+    candidatos = {}
+    for resposta in captura.todas(PADRAO_API_IAF, pagina=pagina):
+        for caminho in localizar_caminhos_data(resposta.dados, data_dom):
+            chave = (resposta.metodo, resposta.url, resposta.corpo_requisicao, tuple(caminho))
+            candidatos[chave] = (resposta, caminho)
+
+    if len(candidatos) != 1:
+        logger.info(
+            f"Data de atualização em {len(candidatos)} campos dos payloads da API (esperado 1); "
+            "próxima verificação usará o navegador."
+        )
+        return
+
+    resposta, caminho = next(iter(candidatos.values()))
+    receita = {
+        "chamadas": [{"metodo": resposta.metodo, "url": resposta.url, "corpo": resposta.corpo_requisicao}],
+        "autorizacao": resposta.autorizacao,
+        "caminho_data": caminho,
+        "confirmada_dom": True,
+        "campo_unico": True,
+    }
+    salvar_receita(sessao, "iaf_data_atualizacao", receita)
+
+
+async def extrair_data_atualizacao_http(usuario: str) -> str:
+    """
+    Lê a data de atualização direto da API com a sessão em cache.
+    Retorna "" quando não há sessão/receita válida (o chamador usa o navegador).
+    """
+    sessao = SessaoExtranet(usuario)
+    state = sessao.carregar()
+    receita = carregar_receita_confirmada(sessao) if state else None
+    if not receita:
+        return ""
+
+    try:
+        async with ClienteApiExtranet(state, receita.get("autorizacao")) as cliente:
+            dados = await cliente.chamar(receita["chamadas"][0])
+        for chave in receita["caminho_data"]:
+            dados = dados[chave]
+        texto = normalizar_data_hora(dados)
+        logger.info(f"Data de atualização via API: '{dados}'")
+        return texto
+    except SessaoHttpExpirada as e:
+        logger.info(f"Sessão recusada pela API ({e}); usando o navegador.")
+    except Exception as e:
+        logger.warning(f"Falha na verificação via HTTP, usando o navegador: {type(e).__name__} {e}")
+    return ""
 
 
 def verificar_data_hoje(texto_data: str) -> bool:
@@ -84,6 +249,34 @@ def verificar_data_hoje(texto_data: str) -> bool:
     return atualizado
 
 
+def agendar_proxima_verificacao(texto_data: str, atualizado: bool) -> dict:
+    """Registra o horário observado e recomenda quando verificar de novo."""
+    try:
+        agenda = AgendaIAF()
+        if texto_data:
+            agenda.registrar(texto_data)
+        recomendacao = agenda.recomendar(atualizado_hoje=atualizado)
+        logger.info(
+            f"Próxima verificação recomendada: {recomendacao['proxima_verificacao']} "
+            f"(fase '{recomendacao['fase']}', {recomendacao['amostras']} amostras)"
+        )
+        return recomendacao
+    except Exception as e:
+        logger.warning(f"Não foi possível calcular a próxima verificação: {e}")
+        return {}
+
+
+def emitir_outputs(atualizado: bool, motivo: str = None, agenda: dict = None):
+    """Informa ao Kestra o status para controle de fluxo (e quando verificar de novo)."""
+    outputs = {"atualizado": atualizado}
+    if motivo:
+        outputs["motivo"] = motivo
+    if agenda:
+        outputs["esperar_s"] = agenda["esperar_s"]
+        outputs["proxima_verificacao"] = agenda["proxima_verificacao"]
+    print(f'::{json.dumps({"outputs": outputs}, ensure_ascii=False)}::')
+
+
 async def main():
     start_time = time.time()
     
@@ -102,18 +295,38 @@ async def main():
     hoje_str = datetime.now().strftime("%Y-%m-%d")
     if last_sent == hoje_str:
         logger.info(f"✅ O resumo do IAF já foi enviado hoje ({hoje_str}). O fluxo não prosseguirá.")
-        print('::{"outputs": {"atualizado": false, "motivo": "ja_enviado"}}::')
+        emitir_outputs(False, "ja_enviado", agendar_proxima_verificacao("", True))
         sys.exit(0)
 
     if not usuario or not senha:
         wide_event["status"] = "error"
         wide_event["error"] = "Credenciais não encontradas no arquivo .env"
         logger.error(json.dumps(wide_event, indent=2, ensure_ascii=False))
-        print('::{"outputs": {"atualizado": false, "motivo": "erro_credenciais"}}::')
+        emitir_outputs(False, "erro_credenciais")
         sys.exit(0)
 
-    navegador = Navegador()
+    # Caminho rápido: sessão em cache + chamada de API gravada numa execução anterior
+    if os.environ.get("IAF_MODO_HTTP", "1") != "0":
+        texto_data = await extrair_data_atualizacao_http(usuario)
+        if texto_data:
+            atualizado = verificar_data_hoje(texto_data)
+            agenda = agendar_proxima_verificacao(texto_data, atualizado)
+            wide_event.update({
+                "modo": "http",
+                "data_atualizacao_raw": texto_data,
+                "atualizado_hoje": atualizado,
+                "agenda": agenda,
+                "status": "success",
+                "duration_ms": int((time.time() - start_time) * 1000),
+            })
+            logger.info(f"Wide Event Consolidado:\n{json.dumps(wide_event, indent=2, ensure_ascii=False)}")
+            emitir_outputs(atualizado, agenda=agenda)
+            sys.exit(0)
+
+    wide_event["modo"] = "navegador"
+    navegador = Navegador(perfil_bloqueio="extranet")
     atualizado = False
+    agenda = {}
     
     try:
         page = await navegador.setup_browser()
@@ -123,17 +336,17 @@ async def main():
         login_start = time.time()
         await base_page.realizar_login(usuario, senha)
         wide_event["login_duration_ms"] = int((time.time() - login_start) * 1000)
+        wide_event["sessao_extranet"] = base_page.origem_sessao
 
-        # Aguarda a página carregar completamente
-        await page.wait_for_timeout(3000)
-        
-        # Extrai a data de atualização
-        texto_data = await extrair_data_atualizacao(page)
+        # Extrai a data de atualização (payload da API; DOM como fallback)
+        texto_data = await ler_data_atualizacao(page, navegador.captura, SessaoExtranet(usuario), base_page.espera)
         wide_event["data_atualizacao_raw"] = texto_data
         
         # Verifica se é de hoje
         atualizado = verificar_data_hoje(texto_data)
         wide_event["atualizado_hoje"] = atualizado
+        agenda = agendar_proxima_verificacao(texto_data, atualizado)
+        wide_event["agenda"] = agenda
         wide_event["status"] = "success"
         
     except Exception as e:
@@ -143,14 +356,20 @@ async def main():
             "message": str(e)
         }
     finally:
+        wide_event["bloqueio_recursos"] = navegador.resumo_bloqueio()
+        wide_event["captura_respostas"] = navegador.resumo_captura()
+        if navegador.page:
+            wide_event["esperas"] = Espera.da_pagina(navegador.page).resumo()
+            metricas = MetricasAcoes.do_contexto(navegador.context)
+            wide_event["acoes"] = metricas.resumo()
+            metricas.salvar()
         await navegador.stop_browser()
         wide_event["duration_ms"] = int((time.time() - start_time) * 1000)
         
         logger.info(f"Wide Event Consolidado:\n{json.dumps(wide_event, indent=2, ensure_ascii=False)}")
 
     # Informa ao Kestra o status para controle de fluxo
-    status_atualizado = "true" if atualizado else "false"
-    print(f'::{{ "outputs": {{ "atualizado": {status_atualizado} }} }}::')
+    emitir_outputs(atualizado, agenda=agenda or agendar_proxima_verificacao("", False))
     sys.exit(0)
 
 
@@ -0,0 +1,170 @@
+"""
+Verificação + extração do IAF numa única sessão de navegador.
+
+Substitui o par verificar_atualizacao_iaf.py -> extranet.py quando o flow
+roda os dois em sequência:
+1. Realiza login na Extranet (sessão em cache quando válida)
+2. Lê a "Data de atualização" do dashboard IAF
+3. Se for de hoje, segue direto para IAFPage.extrair_tudo(), gerando
+   resumo_iaf.md e mensagem_whatsapp.txt na mesma página
+4. Emite o output "atualizado" para o controle de fluxo do Kestra, mais
+   "extraido" indicando se os arquivos foram gerados e "esperar_s" /
+   "proxima_verificacao" (AgendaIAF) para o próximo tick
+
+Quando a verificação via API (sessão em cache) já indica que o dashboard
+não mudou, o navegador nem é aberto.
+"""
+
+import asyncio
+import os
+import sys
+import logging
+import json
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from workflow.components.espera import Espera
+from workflow.components.metricas_acoes import MetricasAcoes
+from workflow.components.navegador import Navegador
+from workflow.components.sessao_extranet import SessaoExtranet
+from workflow.pages.base_page import BasePage
+from workflow.scripts.extranet import extrair_e_salvar
+from workflow.scripts.verificar_atualizacao_iaf import (
+    agendar_proxima_verificacao, carregar_receita_confirmada, extrair_data_atualizacao_http, ler_data_atualizacao,
+    verificar_data_hoje,
+)
+
+# Reconfigura stdout para UTF-8 (Windows/PowerShell)
+sys.stdout.reconfigure(encoding='utf-8')
+
+# Configuração de logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    stream=sys.stdout
+)
+logger = logging.getLogger(__name__)
+
+
+def emitir_outputs(atualizado: bool, extraido: bool, motivo: str = None, agenda: dict = None, **extras):
+    """Informa ao Kestra o status para controle de fluxo (e quando verificar de novo)."""
+    outputs = {"atualizado": atualizado, "extraido": extraido, **extras}
+    if motivo:
+        outputs["motivo"] = motivo
+    if agenda:
+        outputs["esperar_s"] = agenda["esperar_s"]
+        outputs["proxima_verificacao"] = agenda["proxima_verificacao"]
+    print(f'::{json.dumps({"outputs": outputs}, ensure_ascii=False)}::')
+
+
+async def main():
+    start_time = time.time()
+
+    wide_event = {
+        "script": "verificar_e_extrair_iaf.py",
+        "action": "check_and_extract",
+        "status": "started",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+
+    load_dotenv()
+    usuario = os.environ.get("EXTRANET_USER")
+    senha = os.environ.get("EXTRANET_PASS")
+    last_sent = os.environ.get("IAF_LAST_SENT", "")
+
+    hoje_str = datetime.now().strftime("%Y-%m-%d")
+    if last_sent == hoje_str:
+        logger.info(f"✅ O resumo do IAF já foi enviado hoje ({hoje_str}). O fluxo não prosseguirá.")
+        emitir_outputs(False, False, "ja_enviado", agendar_proxima_verificacao("", True))
+        sys.exit(0)
+
+    if not usuario or not senha:
+        wide_event["status"] = "error"
+        wide_event["error"] = "Credenciais não encontradas no arquivo .env"
+        logger.error(json.dumps(wide_event, indent=2, ensure_ascii=False))
+        emitir_outputs(False, False, "erro_credenciais")
+        sys.exit(0)
+
+    # Caminho rápido: se a API já diz que o dashboard não é de hoje, não abre o navegador
+    if os.environ.get("IAF_MODO_HTTP", "1") != "0":
+        texto_data = await extrair_data_atualizacao_http(usuario)
+        if texto_data and not verificar_data_hoje(texto_data):
+            agenda = agendar_proxima_verificacao(texto_data, False)
+            wide_event.update({
+                "modo": "http",
+                "data_atualizacao_raw": texto_data,
+                "atualizado_hoje": False,
+                "agenda": agenda,
+                "status": "success",
+                "duration_ms": int((time.time() - start_time) * 1000),
+            })
+            logger.info(f"Wide Event Consolidado:\n{json.dumps(wide_event, indent=2, ensure_ascii=False)}")
+            emitir_outputs(False, False, agenda=agenda)
+            sys.exit(0)
+
+    wide_event["modo"] = "navegador"
+    navegador = Navegador(perfil_bloqueio="extranet")
+    atualizado = False
+    extraido = False
+    agenda = {}
+
+    try:
+        page = await navegador.setup_browser()
+        base_page = BasePage(page)
+
+        # Login e navegação (termina na página IAF)
+        login_start = time.time()
+        await base_page.realizar_login(usuario, senha)
+        wide_event["login_duration_ms"] = int((time.time() - login_start) * 1000)
+        wide_event["sessao_extranet"] = base_page.origem_sessao
+
+        # Verificação: data de atualização do dashboard
+        sessao = SessaoExtranet(usuario)
+        texto_data = await ler_data_atualizacao(page, navegador.captura, sessao, base_page.espera)
+        wide_event["data_atualizacao_raw"] = texto_data
+
+        atualizado = verificar_data_hoje(texto_data)
+        wide_event["atualizado_hoje"] = atualizado
+        agenda = agendar_proxima_verificacao(texto_data, atualizado)
+        wide_event["agenda"] = agenda
+
+        # Extração na mesma página, sem novo login
+        if atualizado:
+            extracao_start = time.time()
+            wide_event["saved_files"] = await extrair_e_salvar(page, carregar_receita_confirmada(sessao))
+            wide_event["extraction_duration_ms"] = int((time.time() - extracao_start) * 1000)
+            wide_event["extraction_status"] = "success"
+            extraido = True
+
+        wide_event["status"] = "success"
+
+    except Exception as e:
+        wide_event["status"] = "error"
+        wide_event["error"] = {
+            "type": type(e).__name__,
+            "message": str(e)
+        }
+    finally:
+        wide_event["bloqueio_recursos"] = navegador.resumo_bloqueio()
+        wide_event["captura_respostas"] = navegador.resumo_captura()
+        if navegador.page:
+            wide_event["esperas"] = Espera.da_pagina(navegador.page).resumo()
+            metricas = MetricasAcoes.do_contexto(navegador.context)
+            wide_event["acoes"] = metricas.resumo()
+            metricas.salvar()
+        await navegador.stop_browser()
+        wide_event["duration_ms"] = int((time.time() - start_time) * 1000)
+
+        logger.info(f"Wide Event Consolidado:\n{json.dumps(wide_event, indent=2, ensure_ascii=False)}")
+
+    # atualizado=true com extraido=false: o flow pode cair no extranet.py
+    emitir_outputs(atualizado, extraido, agenda=agenda or agendar_proxima_verificacao("", False))
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,157 @@
+"""
+Perfis declarativos de bloqueio de recursos por portal.
+
+Cada perfil define:
+  - tipos:      resource types do Playwright abortados (image, media, font...)
+  - padroes:    regex de URL abortadas (analytics, chat, pixels de rastreio)
+  - permitidos: regex de URL que SEMPRE passam (o que a pagina precisa para renderizar)
+
+O BloqueadorRecursos instala um context.route("**/*") no contexto do Navegador
+e contabiliza requisicoes bloqueadas por tipo, com estimativa de bytes
+economizados para o wide event. No Browserless isso reduz tempo de sessao e banda.
+"""
+
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Rastreadores/analytics comuns a todos os portais
+PADROES_RASTREIO = [
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"doubleclick\.net",
+    r"connect\.facebook\.net",
+    r"hotjar\.(com|io)",
+    r"clarity\.ms",
+    r"bat\.bing\.com",
+    r"c\.bing\.com",
+    r"newrelic\.com|nr-data\.net",
+    r"dynatrace\.com",
+    r"zdassets\.com|zopim\.com|zendesk\.com",
+    r"intercom\.io|intercomcdn\.com",
+    r"onesignal\.com",
+]
+
+PERFIS = {
+    # Extranet Grupo Boticario (MFEs IAF, Calendario CAR, Portal Boletos)
+    "extranet": {
+        "tipos": ["image", "media", "font"],
+        "padroes": PADROES_RASTREIO + [r"cdn\.cookielaw\.org", r"youtube\.com", r"vimeo\.com"],
+        "permitidos": [r"login\.extranet\.grupoboticario\.com\.br"],
+    },
+    # Portal Mooz Cartoes (SPA)
+    "mooz": {
+        "tipos": ["image", "media", "font"],
+        "padroes": PADROES_RASTREIO,
+        "permitidos": [],
+    },
+    # Retaguarda (SPA flora)
+    "retaguarda": {
+        "tipos": ["image", "media", "font"],
+        "padroes": PADROES_RASTREIO,
+        "permitidos": [],
+    },
+    # SGI / VD+ (ASP.NET WebForms). Login Google e Azure B2C passam intactos.
+    "sgi": {
+        "tipos": ["image", "media", "font"],
+        "padroes": PADROES_RASTREIO,
+        "permitidos": [r"accounts\.google\.com", r"gstatic\.com", r"login-vdmais\.grupoboticario\.com\.br"],
+    },
+    # VIDIBR (app Ionic)
+    "vidibr": {
+        "tipos": ["image", "media", "font"],
+        "padroes": PADROES_RASTREIO,
+        "permitidos": [r"\.svg(\?|$)"],  # ionicons sao carregados como SVG
+    },
+}
+
+# Tamanho medio por tipo, usado para estimar bytes economizados
+# (requisicoes abortadas nunca chegam a informar o tamanho real)
+TAMANHO_MEDIO_BYTES = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 60_000,
+    "script": 80_000,
+    "stylesheet": 30_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+TAMANHO_PADRAO_BYTES = 10_000
+
+
+def resolver_perfil(perfil_padrao: str = None):
+    """
+    Retorna o perfil efetivo: NAVEGADOR_PERFIL_BLOQUEIO sobrescreve o padrao do fluxo.
+    Valor 'nenhum' (ou vazio) desativa o bloqueio.
+    """
+    valor = os.environ.get("NAVEGADOR_PERFIL_BLOQUEIO", perfil_padrao or "").strip().lower()
+    return None if valor in ("", "nenhum") else valor
+
+
+class BloqueadorRecursos:
+    """Aplica um perfil de bloqueio a um contexto Playwright e registra a economia."""
+
+    def __init__(self, nome_perfil: str):
+        if nome_perfil not in PERFIS:
+            raise ValueError(f"Perfil de bloqueio desconhecido: '{nome_perfil}'. Opcoes: {list(PERFIS)}")
+
+        perfil = PERFIS[nome_perfil]
+        self.nome_perfil = nome_perfil
+        self.tipos = set(perfil["tipos"])
+        self.padroes = [re.compile(p) for p in perfil["padroes"]]
+        self.permitidos = [re.compile(p) for p in perfil["permitidos"]]
+        self.context = None
+
+        self.requisicoes_total = 0
+        self.requisicoes_bloqueadas = 0
+        self.bloqueadas_por_tipo = {}
+        self.bytes_economizados_estimados = 0
+
+    async def instalar(self, context):
+        """Registra o handler de rota no contexto."""
+        self.context = context
+        await context.route("**/*", self._rotear)
+        logger.info(f"Bloqueio de recursos ativo (perfil: {self.nome_perfil}).")
+
+    async def remover(self):
+        """Remove o handler de rota (necessario quando o contexto e reaproveitado)."""
+        if self.context is None:
+            return
+        try:
+            await self.context.unroute("**/*", self._rotear)
+        except Exception as e:
+            logger.warning(f"Erro ao remover bloqueio de recursos: {e}")
+        self.context = None
+
+    def deve_bloquear(self, url: str, tipo: str) -> bool:
+        if any(p.search(url) for p in self.permitidos):
+            return False
+        if tipo in self.tipos:
+            return True
+        return any(p.search(url) for p in self.padroes)
+
+    async def _rotear(self, route):
+        request = route.request
+        self.requisicoes_total += 1
+
+        if self.deve_bloquear(request.url, request.resource_type):
+            tipo = request.resource_type
+            self.requisicoes_bloqueadas += 1
+            self.bloqueadas_por_tipo[tipo] = self.bloqueadas_por_tipo.get(tipo, 0) + 1
+            self.bytes_economizados_estimados += TAMANHO_MEDIO_BYTES.get(tipo, TAMANHO_PADRAO_BYTES)
+            await route.abort()
+            return
+
+        await route.fallback()
+
+    def resumo(self) -> dict:
+        """Resumo da economia para o wide event."""
+        return {
+            "perfil": self.nome_perfil,
+            "requisicoes_total": self.requisicoes_total,
+            "requisicoes_bloqueadas": self.requisicoes_bloqueadas,
+            "bloqueadas_por_tipo": dict(self.bloqueadas_por_tipo),
+            "bytes_economizados_estimados": self.bytes_economizados_estimados,
+        }
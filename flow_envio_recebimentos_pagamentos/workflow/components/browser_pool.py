@@ -0,0 +1,241 @@
+"""
+Pool of warm Browserless (CDP) connections shared across scrapers.
+
+Each scraper normally pays for `async_playwright().start()`, `connect_over_cdp`
+and the Browserless stealth launch on every run. The pool keeps those
+connections (and their default context/page) alive and leases them to
+`Navegador(pool=...)`, so CAR, Mooz and Boletos can run one after another on
+the same session.
+
+Browserless kills a session `BROWSERLESS_TIMEOUT_MS` after it was opened, no
+matter how it is used. A connection is therefore only leased when the lifetime
+it has left covers the run time the scraper expects (`acquire(expected_run_s)`);
+otherwise it is dropped and a fresh one is opened.
+
+Lease state is scoped to the lease: routes installed on the context are removed
+on release. Playwright cannot remove init scripts, so whoever adds one flags the
+lease with `mark_for_recycle` (Navegador does it for SessaoExtranet.restaurar)
+and the connection is closed on release instead of parked.
+
+Settings (constructor args, with environment fallbacks):
+    BROWSER_POOL_MAX_CONCURRENCY  max simultaneous leases (default 2)
+    BROWSER_POOL_MAX_USES         leases before a connection is recycled (default 10)
+    BROWSER_POOL_MAX_AGE_S        seconds before a connection is recycled (default 240,
+                                  below the 300s Browserless session timeout)
+    BROWSER_POOL_EXPECTED_RUN_S   run time assumed when a lease does not say (default 120)
+    BROWSER_POOL_MARGIN_S         lifetime kept in reserve on top of it (default 15)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+
+from workflow.components.navegador import BROWSERLESS_TIMEOUT_MS, connect_browserless, load_state
+
+logger = logging.getLogger(__name__)
+
+
+class PooledConnection:
+    """A single warm CDP connection with its default context and page."""
+
+    def __init__(self, browser, context, page):
+        self.browser = browser
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.created_at = time.time()
+        # Set during a lease when the context can no longer be reset (e.g. init scripts)
+        self.recycle_reason = None
+
+    @property
+    def age_s(self) -> float:
+        return time.time() - self.created_at
+
+    def mark_for_recycle(self, reason: str):
+        """Close this connection on release instead of returning it to the pool."""
+        self.recycle_reason = self.recycle_reason or reason
+
+    @property
+    def remaining_s(self) -> float:
+        """Seconds left before Browserless closes the session."""
+        return BROWSERLESS_TIMEOUT_MS / 1000 - self.age_s
+
+
+class BrowserPool:
+    """Holds warm Browserless connections and leases them with a concurrency cap."""
+
+    def __init__(self, max_concurrency: int = None, max_uses: int = None,
+                 max_age_s: float = None, expected_run_s: float = None, margin_s: float = None,
+                 health_check_timeout_s: float = 5.0):
+        self.max_concurrency = max_concurrency or int(os.getenv("BROWSER_POOL_MAX_CONCURRENCY", "2"))
+        self.max_uses = max_uses or int(os.getenv("BROWSER_POOL_MAX_USES", "10"))
+        self.max_age_s = max_age_s or float(os.getenv("BROWSER_POOL_MAX_AGE_S", "240"))
+        self.expected_run_s = expected_run_s or float(os.getenv("BROWSER_POOL_EXPECTED_RUN_S", "120"))
+        self.margin_s = margin_s if margin_s is not None else float(os.getenv("BROWSER_POOL_MARGIN_S", "15"))
+        self.health_check_timeout_s = health_check_timeout_s
+
+        self.playwright = None
+        self._idle: list[PooledConnection] = []
+        self._leased: set[PooledConnection] = set()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._lock = asyncio.Lock()
+        self.stats = {"connects": 0, "reuses": 0, "recycled": 0, "unhealthy": 0, "expiring": 0}
+
+    # ── Lifecycle ─────────────────────────────────────────────────────
+
+    async def start(self):
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+            logger.info(
+                f"Browser pool started (max_concurrency={self.max_concurrency}, "
+                f"max_uses={self.max_uses}, max_age_s={self.max_age_s})"
+            )
+        return self
+
+    async def close(self):
+        """Close every pooled connection and stop Playwright."""
+        async with self._lock:
+            connections = self._idle + list(self._leased)
+            self._idle.clear()
+            self._leased.clear()
+        for conn in connections:
+            await self._dispose(conn)
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+        logger.info(f"Browser pool closed. Stats: {self.stats}")
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # ── Leasing ───────────────────────────────────────────────────────
+
+    async def acquire(self, expected_run_s: float = None) -> PooledConnection:
+        """
+        Wait for a free slot and return a healthy connection whose Browserless
+        session outlives `expected_run_s` (defaults to the pool setting).
+        """
+        expected_run_s = expected_run_s or self.expected_run_s
+        await self.start()
+        await self._semaphore.acquire()
+        try:
+            conn = await self._take_idle(expected_run_s)
+            if conn is None:
+                conn = await self._connect()
+                if conn.remaining_s < expected_run_s + self.margin_s:
+                    logger.warning(
+                        f"Expected run time ({expected_run_s:.0f}s) exceeds the Browserless session "
+                        f"timeout ({BROWSERLESS_TIMEOUT_MS / 1000:.0f}s); the session may close mid-run."
+                    )
+            else:
+                self.stats["reuses"] += 1
+                logger.info(
+                    f"Reusing pooled connection (uses={conn.uses}, age={conn.age_s:.0f}s, "
+                    f"remaining={conn.remaining_s:.0f}s, expected_run={expected_run_s:.0f}s)."
+                )
+            async with self._lock:
+                self._leased.add(conn)
+            return conn
+        except Exception:
+            self._semaphore.release()
+            raise
+
+    async def release(self, conn: PooledConnection):
+        """Return a leased connection, recycling it if it is worn out."""
+        try:
+            async with self._lock:
+                self._leased.discard(conn)
+            conn.uses += 1
+
+            if conn.uses >= self.max_uses or conn.age_s >= self.max_age_s or conn.recycle_reason:
+                logger.info(
+                    f"Recycling connection (uses={conn.uses}, age={conn.age_s:.0f}s, "
+                    f"reason={conn.recycle_reason})."
+                )
+                self.stats["recycled"] += 1
+                await self._dispose(conn)
+                return
+
+            # Drop routes left by the lease and park the page on a blank document
+            try:
+                await conn.context.unroute_all(behavior="ignoreErrors")
+                await conn.page.goto("about:blank")
+            except Exception as e:
+                logger.warning(f"Could not reset pooled connection, recycling it: {e}")
+                self.stats["recycled"] += 1
+                await self._dispose(conn)
+                return
+            async with self._lock:
+                self._idle.append(conn)
+        finally:
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def lease(self, expected_run_s: float = None):
+        """Context manager form: `async with pool.lease() as conn: ...`."""
+        conn = await self.acquire(expected_run_s)
+        try:
+            yield conn
+        finally:
+            await self.release(conn)
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    async def _take_idle(self, expected_run_s: float):
+        while True:
+            async with self._lock:
+                if not self._idle:
+                    return None
+                conn = self._idle.pop()
+            if conn.remaining_s < expected_run_s + self.margin_s:
+                logger.info(
+                    f"Pooled connection would expire mid-run (remaining={conn.remaining_s:.0f}s, "
+                    f"expected_run={expected_run_s:.0f}s); opening a new one."
+                )
+                self.stats["expiring"] += 1
+            elif await self._is_healthy(conn):
+                return conn
+            else:
+                self.stats["unhealthy"] += 1
+            await self._dispose(conn)
+
+    async def _is_healthy(self, conn: PooledConnection) -> bool:
+        """Cheap health check: connection alive, not too old, page responsive."""
+        if conn.age_s >= self.max_age_s or not conn.browser.is_connected():
+            return False
+        try:
+            if conn.page.is_closed():
+                conn.page = await conn.context.new_page()
+                conn.page.set_default_timeout(60000)
+            await asyncio.wait_for(conn.page.evaluate("1"), timeout=self.health_check_timeout_s)
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled connection failed health check: {e}")
+            return False
+
+    async def _connect(self) -> PooledConnection:
+        logger.info("Opening new Browserless connection for the pool (stealth=ON, headless=OFF)...")
+        # Browserless starts its session timer on connect, before the state is loaded
+        connected_at = time.time()
+        browser, context = await connect_browserless(self.playwright)
+        await load_state(context)
+
+        page = context.pages[0] if context.pages else await context.new_page()
+        page.set_default_timeout(60000)
+        self.stats["connects"] += 1
+        conn = PooledConnection(browser, context, page)
+        conn.created_at = connected_at
+        return conn
+
+    async def _dispose(self, conn: PooledConnection):
+        try:
+            await conn.browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled connection: {e}")
@@ -0,0 +1,179 @@
+"""
+Captura de respostas XHR/fetch JSON do contexto do navegador.
+
+As paginas da Extranet sao SPAs que buscam JSON em APIs de backend e so
+depois renderizam o DOM (com classes CSS-in-JS que mudam a cada deploy).
+A captura escuta `response` no contexto e guarda, num buffer limitado, toda
+resposta JSON de xhr/fetch. Page objects consultam esse buffer por regex
+de URL - inclusive respostas que chegaram antes de o page object existir
+(ex.: a chamada do summary do IAF disparada pela navegacao do login).
+
+    captura = CapturaRespostas.do_contexto(page.context)
+    resposta = await captura.aguardar(r"/iaf", timeout_ms=10000)
+    if resposta:
+        resposta.dados  # JSON ja decodificado
+
+A captura e do contexto: com varias abas abertas, passe `pagina=page` nas
+consultas para ficar so com as respostas pedidas por aquela aba.
+
+receita() devolve as chamadas que geraram essas respostas, para o replay HTTP.
+O resumo() lista os endpoints JSON vistos na execucao, para o wide event.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import weakref
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+TIPOS_CAPTURADOS = ("xhr", "fetch")
+LIMITE_BUFFER = 200
+
+
+class RespostaCapturada:
+    """Resposta JSON capturada de uma chamada xhr/fetch."""
+
+    __slots__ = ("url", "metodo", "status", "dados", "recebida_em", "corpo_requisicao", "autorizacao", "pagina")
+
+    def __init__(self, url: str, metodo: str, status: int, dados, recebida_em: float,
+                 corpo_requisicao: str = None, autorizacao: str = None, pagina=None):
+        self.url = url
+        self.metodo = metodo
+        self.status = status
+        self.dados = dados
+        self.recebida_em = recebida_em
+        self.corpo_requisicao = corpo_requisicao
+        self.autorizacao = autorizacao
+        self.pagina = pagina
+
+    @property
+    def caminho(self) -> str:
+        return urlsplit(self.url).path
+
+
+class CapturaRespostas:
+    """Buffer das respostas JSON de um contexto, consultavel por padrao de URL."""
+
+    _por_contexto = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def do_contexto(cls, context) -> "CapturaRespostas":
+        """Instancia unica por contexto (instalada pelo Navegador)."""
+        if context not in cls._por_contexto:
+            cls._por_contexto[context] = cls(context)
+        return cls._por_contexto[context]
+
+    def __init__(self, context):
+        self.context = context
+        self.respostas = []
+        self._nova_resposta = asyncio.Event()
+        context.on("response", self._ao_receber)
+
+    def remover(self):
+        """Para de escutar o contexto (necessario quando o contexto e reaproveitado)."""
+        try:
+            self.context.remove_listener("response", self._ao_receber)
+        except Exception as e:
+            logger.warning(f"Erro ao remover captura de respostas: {e}")
+        CapturaRespostas._por_contexto.pop(self.context, None)
+
+    async def _ao_receber(self, response):
+        request = response.request
+        if request.resource_type not in TIPOS_CAPTURADOS:
+            return
+        if "json" not in response.headers.get("content-type", ""):
+            return
+
+        try:
+            dados = await response.json()
+        except Exception as e:
+            # Corpo indisponivel (redirect, pagina navegou, body vazio)
+            logger.debug(f"Resposta JSON ignorada ({response.url}): {e}")
+            return
+
+        try:
+            autorizacao = (await request.all_headers()).get("authorization")
+        except Exception:
+            autorizacao = None
+
+        try:
+            pagina = request.frame.page
+        except Exception:
+            # Service worker ou frame ja destacado: sem aba de origem
+            pagina = None
+
+        self.respostas.append(RespostaCapturada(
+            response.url, request.method, response.status, dados, time.time(),
+            corpo_requisicao=request.post_data, autorizacao=autorizacao, pagina=pagina,
+        ))
+        if len(self.respostas) > LIMITE_BUFFER:
+            del self.respostas[0]
+        self._nova_resposta.set()
+
+    # ── Consulta ──────────────────────────────────────────────────────
+
+    def todas(self, padrao: str, apos: float = 0, pagina=None) -> list:
+        """
+        Respostas cuja URL casa com o regex `padrao`, recebidas depois de `apos`
+        (e, com `pagina`, pedidas por aquela aba).
+        """
+        regex = re.compile(padrao)
+        return [
+            r for r in self.respostas
+            if r.recebida_em > apos and regex.search(r.url) and (pagina is None or r.pagina is pagina)
+        ]
+
+    def ultima(self, padrao: str, apos: float = 0, pagina=None):
+        encontradas = self.todas(padrao, apos, pagina)
+        return encontradas[-1] if encontradas else None
+
+    async def aguardar(self, padrao: str, timeout_ms: int = 15000, apos: float = 0, pagina=None):
+        """
+        Retorna a resposta mais recente que casa com `padrao` (recebida depois de
+        `apos`, da aba `pagina` se informada), aguardando ate `timeout_ms` se
+        ainda nao chegou. None no timeout.
+        """
+        limite = time.monotonic() + timeout_ms / 1000
+        while True:
+            resposta = self.ultima(padrao, apos, pagina)
+            if resposta is not None:
+                return resposta
+
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                logger.info(f"Nenhuma resposta JSON para '{padrao}' em {timeout_ms} ms.")
+                return None
+
+            self._nova_resposta.clear()
+            try:
+                await asyncio.wait_for(self._nova_resposta.wait(), timeout=restante)
+            except asyncio.TimeoutError:
+                pass
+
+    def receita(self, padrao: str) -> dict:
+        """
+        Chamadas (metodo, url, corpo) que produziram as respostas de `padrao`, sem
+        repeticao, mais o ultimo header Authorization visto - o suficiente para
+        refaze-las fora do navegador (ver replay_http).
+        """
+        chamadas, vistas, autorizacao = [], set(), None
+        for r in self.todas(padrao):
+            if r.status >= 400:
+                continue
+            chave = (r.metodo, r.url, r.corpo_requisicao)
+            if chave not in vistas:
+                vistas.add(chave)
+                chamadas.append({"metodo": r.metodo, "url": r.url, "corpo": r.corpo_requisicao})
+            autorizacao = r.autorizacao or autorizacao
+        return {"chamadas": chamadas, "autorizacao": autorizacao}
+
+    def resumo(self) -> dict:
+        """Endpoints JSON vistos na execucao (metodo + caminho -> quantidade)."""
+        endpoints = {}
+        for r in self.respostas:
+            chave = f"{r.metodo} {r.caminho}"
+            endpoints[chave] = endpoints.get(chave, 0) + 1
+        return {"respostas_json": len(self.respostas), "endpoints": endpoints}
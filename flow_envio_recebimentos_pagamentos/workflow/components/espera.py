@@ -0,0 +1,198 @@
+"""
+Motor de esperas por condicao de prontidao (substitui sleeps fixos).
+
+Em vez de `wait_for_timeout(3000)` / `asyncio.sleep(5)`, os page objects pedem
+uma condicao nomeada e seguem assim que ela e satisfeita:
+  - rede_ociosa:     nenhuma requisicao em voo por X ms
+  - seletor_estavel: elemento visivel e sem mudar de posicao/texto por X ms
+  - spinner_sumiu:   indicador de carregamento oculto (ou ausente)
+  - url_estavel:     URL satisfaz o predicado e parou de mudar por X ms
+  - dom_quieto:      nenhuma mutacao no DOM por X ms (MutationObserver)
+
+Use Espera.da_pagina(page) para compartilhar a instancia entre page objects.
+Cada chamada informa `substitui_ms`, o sleep fixo que ela substitui, e o
+resumo() contabiliza o tempo economizado na execucao para o wide event.
+Nenhuma condicao levanta excecao no timeout: loga aviso e retorna False,
+como os fallbacks "continuando..." ja existentes nos page objects.
+
+dom_quieto observa o documento atual: chame-o depois de esperar a URL ou o
+seletor de destino de um redirect/login. Se ainda assim uma navegacao
+destruir o contexto no meio da observacao, ele espera o novo documento e
+observa de novo (dentro do mesmo timeout).
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_AMOSTRA_S = 0.1
+
+# Erros do evaluate quando uma navegacao troca o documento no meio da espera
+ERROS_NAVEGACAO = ("Execution context was destroyed", "Cannot find context with specified id")
+
+JS_DOM_QUIETO = """([quietoMs, timeoutMs]) => new Promise(resolve => {
+    let timer = null, limite = null;
+    const fim = (ok) => { obs.disconnect(); clearTimeout(timer); clearTimeout(limite); resolve(ok); };
+    const obs = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(() => fim(true), quietoMs);
+    });
+    obs.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    timer = setTimeout(() => fim(true), quietoMs);
+    limite = setTimeout(() => fim(false), timeoutMs);
+})"""
+
+
+class Espera:
+    """Esperas por condicao para uma pagina, com contabilidade do tempo economizado."""
+
+    _por_pagina = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def da_pagina(cls, page) -> "Espera":
+        """Instancia unica por pagina: page objects diferentes somam no mesmo resumo."""
+        if page not in cls._por_pagina:
+            cls._por_pagina[page] = cls(page)
+        return cls._por_pagina[page]
+
+    @classmethod
+    def descartar(cls, page):
+        """Esquece as esperas da pagina (necessario quando a pagina e reaproveitada)."""
+        espera = cls._por_pagina.pop(page, None)
+        if espera is not None:
+            page.remove_listener("request", espera._requisicao_iniciada)
+            page.remove_listener("requestfinished", espera._requisicao_encerrada)
+            page.remove_listener("requestfailed", espera._requisicao_encerrada)
+
+    def __init__(self, page):
+        self.page = page
+        self.registros = []
+        self._em_voo = set()
+        self._ultima_atividade = time.monotonic()
+
+        page.on("request", self._requisicao_iniciada)
+        page.on("requestfinished", self._requisicao_encerrada)
+        page.on("requestfailed", self._requisicao_encerrada)
+
+    # ── Rastreamento de rede ──────────────────────────────────────────
+
+    def _requisicao_iniciada(self, request):
+        self._em_voo.add(request)
+        self._ultima_atividade = time.monotonic()
+
+    def _requisicao_encerrada(self, request):
+        self._em_voo.discard(request)
+        self._ultima_atividade = time.monotonic()
+
+    # ── Condicoes ─────────────────────────────────────────────────────
+
+    async def rede_ociosa(self, ociosa_ms: int = 500, timeout_ms: int = 15000, substitui_ms: int = 0) -> bool:
+        """Aguarda nenhuma requisicao em voo por `ociosa_ms`."""
+        async def condicao():
+            while True:
+                ociosa_s = time.monotonic() - self._ultima_atividade
+                if not self._em_voo and ociosa_s * 1000 >= ociosa_ms:
+                    return
+                await asyncio.sleep(INTERVALO_AMOSTRA_S)
+
+        return await self._medir("rede_ociosa", substitui_ms, timeout_ms, condicao())
+
+    async def seletor_estavel(self, seletor: str, estavel_ms: int = 300, timeout_ms: int = 15000,
+                              substitui_ms: int = 0) -> bool:
+        """Aguarda o elemento ficar visivel e sem mudar de caixa/texto por `estavel_ms`."""
+        async def condicao():
+            elemento = self.page.locator(seletor).first
+            await elemento.wait_for(state="visible", timeout=timeout_ms)
+            anterior, desde = None, time.monotonic()
+            while True:
+                atual = (await elemento.bounding_box(), await elemento.inner_text())
+                if atual != anterior:
+                    anterior, desde = atual, time.monotonic()
+                elif (time.monotonic() - desde) * 1000 >= estavel_ms:
+                    return
+                await asyncio.sleep(INTERVALO_AMOSTRA_S)
+
+        return await self._medir(f"seletor_estavel({seletor})", substitui_ms, timeout_ms, condicao())
+
+    async def spinner_sumiu(self, seletor: str, aparecer_ms: int = 1000, timeout_ms: int = 30000,
+                            substitui_ms: int = 0) -> bool:
+        """Da `aparecer_ms` para o spinner surgir e aguarda ele sumir (se nunca surgir, segue)."""
+        async def condicao():
+            spinner = self.page.locator(seletor).first
+            try:
+                await spinner.wait_for(state="visible", timeout=aparecer_ms)
+            except Exception:
+                return
+            await spinner.wait_for(state="hidden", timeout=timeout_ms)
+
+        return await self._medir(f"spinner_sumiu({seletor})", substitui_ms, timeout_ms + aparecer_ms, condicao())
+
+    async def url_estavel(self, predicado=None, estavel_ms: int = 500, timeout_ms: int = 30000,
+                          substitui_ms: int = 0) -> bool:
+        """Aguarda a URL satisfazer `predicado` (opcional) e parar de mudar por `estavel_ms`."""
+        async def condicao():
+            if predicado is not None:
+                await self.page.wait_for_url(predicado, timeout=timeout_ms)
+            anterior, desde = self.page.url, time.monotonic()
+            while (time.monotonic() - desde) * 1000 < estavel_ms:
+                await asyncio.sleep(INTERVALO_AMOSTRA_S)
+                if self.page.url != anterior:
+                    anterior, desde = self.page.url, time.monotonic()
+
+        return await self._medir("url_estavel", substitui_ms, timeout_ms, condicao())
+
+    async def dom_quieto(self, quieto_ms: int = 500, timeout_ms: int = 15000, substitui_ms: int = 0) -> bool:
+        """Aguarda nenhuma mutacao no DOM por `quieto_ms`; recomeca se uma navegacao trocar o documento."""
+        async def condicao():
+            while True:
+                try:
+                    quieto = await self.page.evaluate(JS_DOM_QUIETO, [quieto_ms, timeout_ms])
+                    break
+                except Exception as e:
+                    if not any(erro in str(e) for erro in ERROS_NAVEGACAO):
+                        raise
+                    logger.info("Navegacao durante dom_quieto; aguardando o novo documento...")
+                    await self.page.wait_for_load_state("domcontentloaded", timeout=timeout_ms)
+            if not quieto:
+                raise asyncio.TimeoutError()
+
+        return await self._medir("dom_quieto", substitui_ms, timeout_ms, condicao())
+
+    # ── Contabilidade ─────────────────────────────────────────────────
+
+    async def _medir(self, nome: str, substitui_ms: int, timeout_ms: int, condicao) -> bool:
+        inicio = time.monotonic()
+        try:
+            # Margem sobre o timeout interno para a propria condicao reportar o erro
+            await asyncio.wait_for(condicao, timeout=timeout_ms / 1000 + 1)
+            ok = True
+        except Exception as e:
+            logger.warning(f"Espera '{nome}' nao satisfeita, continuando: {type(e).__name__} {e}")
+            ok = False
+
+        decorrido_ms = int((time.monotonic() - inicio) * 1000)
+        self.registros.append({
+            "condicao": nome,
+            "ok": ok,
+            "decorrido_ms": decorrido_ms,
+            "substitui_ms": substitui_ms,
+        })
+        return ok
+
+    def resumo(self) -> dict:
+        """Tempo gasto vs. sleeps fixos antigos, para o wide event."""
+        # Economia so faz sentido para esperas que substituem um sleep fixo
+        substitutas = [r for r in self.registros if r["substitui_ms"]]
+        esperado_ms = sum(r["decorrido_ms"] for r in substitutas)
+        fixo_ms = sum(r["substitui_ms"] for r in substitutas)
+        return {
+            "esperas": len(self.registros),
+            "nao_satisfeitas": sum(1 for r in self.registros if not r["ok"]),
+            "tempo_esperado_ms": esperado_ms,
+            "tempo_sleeps_fixos_ms": fixo_ms,
+            "economia_ms": fixo_ms - esperado_ms,
+            "detalhes": self.registros,
+        }
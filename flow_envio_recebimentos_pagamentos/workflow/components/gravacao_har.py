@@ -0,0 +1,88 @@
+"""
+Gravacao e reproducao de HAR para execucoes offline e deterministicas.
+
+Variaveis de ambiente:
+  - NAVEGADOR_HAR=gravar:     execucao normal (Browserless/local) gravando todo o
+                              trafego em <fluxo>/har/<nome>.har, mais o storage_state
+                              em <nome>.state.json ao final.
+  - NAVEGADOR_HAR=reproduzir: sobe um Chromium local headless e serve tudo do HAR
+                              via route_from_har (sem rede e sem Browserless);
+                              requisicao fora do HAR e abortada.
+  - NAVEGADOR_HAR_NOME:       nome da gravacao (padrao: nome do script em execucao).
+
+A rota do HAR e instalada ANTES do bloqueio de recursos: como o Playwright
+avalia as rotas da mais recente para a mais antiga, o bloqueio decide primeiro
+e o que ele deixa passar (route.fallback) segue para o HAR.
+"""
+
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_HAR = os.path.join(os.path.dirname(__file__), "..", "..", "har")
+MODOS = ("gravar", "reproduzir")
+
+
+def modo_har():
+    """Modo configurado em NAVEGADOR_HAR, ou None (desativado)."""
+    modo = os.environ.get("NAVEGADOR_HAR", "").strip().lower()
+    return modo if modo in MODOS else None
+
+
+class GravacaoHar:
+    """Grava ou reproduz o trafego de um contexto Playwright em um arquivo HAR."""
+
+    def __init__(self, modo: str, nome: str = None):
+        if modo not in MODOS:
+            raise ValueError(f"Modo HAR desconhecido: '{modo}'. Opcoes: {list(MODOS)}")
+
+        self.modo = modo
+        nome_script = os.path.splitext(os.path.basename(sys.argv[0] or ""))[0]
+        self.nome = nome or os.environ.get("NAVEGADOR_HAR_NOME") or nome_script or "execucao"
+        self.caminho_har = os.path.abspath(os.path.join(DIRETORIO_HAR, f"{self.nome}.har"))
+        self.caminho_state = os.path.abspath(os.path.join(DIRETORIO_HAR, f"{self.nome}.state.json"))
+
+    @property
+    def reproduzindo(self) -> bool:
+        return self.modo == "reproduzir"
+
+    async def abrir_navegador_reproducao(self, playwright):
+        """Chromium local headless + contexto com o storage_state gravado. Retorna (browser, context)."""
+        if not os.path.exists(self.caminho_har):
+            raise FileNotFoundError(f"HAR nao encontrado para reproducao: {self.caminho_har}")
+
+        logger.info(f"Modo reproducao HAR: {self.caminho_har} (sem rede, sem Browserless).")
+        browser = await playwright.chromium.launch(headless=True)
+        context = await browser.new_context(
+            viewport={"width": 1366, "height": 768},
+            locale="pt-BR",
+            accept_downloads=True,
+            storage_state=self.caminho_state if os.path.exists(self.caminho_state) else None,
+        )
+        return browser, context
+
+    async def instalar(self, context):
+        """Registra a rota do HAR no contexto (gravando ou servindo)."""
+        if self.reproduzindo:
+            await context.route_from_har(self.caminho_har, not_found="abort")
+            return
+
+        os.makedirs(os.path.dirname(self.caminho_har), exist_ok=True)
+        await context.route_from_har(self.caminho_har, update=True, update_content="embed")
+        logger.info(f"Gravando HAR em: {self.caminho_har}")
+
+    async def finalizar(self, context):
+        """Na gravacao, salva o storage_state e fecha o contexto para o HAR ser escrito."""
+        if self.reproduzindo or context is None:
+            return
+        try:
+            await context.storage_state(path=self.caminho_state)
+            await context.close()
+            logger.info(f"HAR gravado: {self.caminho_har}")
+        except Exception as e:
+            logger.warning(f"Erro ao finalizar gravacao do HAR: {e}")
+
+    def resumo(self) -> dict:
+        return {"modo": self.modo, "har": self.caminho_har}
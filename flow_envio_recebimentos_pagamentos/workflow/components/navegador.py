@@ -9,6 +9,12 @@ Configuracoes criticas:
 IMPORTANTE: Sempre usar o contexto default do Browserless (browser.contexts[0])
 para manter as flags anti-deteccao. Criar um new_context() perde o stealth.
 Cookies do state.json sao injetados manualmente no contexto default.
+
+Respostas JSON de xhr/fetch sao capturadas no contexto (CapturaRespostas)
+para que os page objects leiam os dados da API em vez do DOM renderizado.
+
+Quando um BrowserPool e informado, a conexao CDP e emprestada do pool em vez
+de ser aberta do zero, e stop_browser() devolve a conexao ao pool.
 """
 
 from playwright.async_api import async_playwright
@@ -17,117 +23,210 @@ import logging
 import os
 from urllib.parse import quote
 
+from workflow.components.bloqueio_recursos import BloqueadorRecursos, resolver_perfil
+from workflow.components.captura_respostas import CapturaRespostas
+from workflow.components.espera import Espera
+from workflow.components.gravacao_har import GravacaoHar, modo_har
+from workflow.components.metricas_acoes import MetricasAcoes
+from workflow.components.sessao_extranet import SessaoExtranet
+
 logger = logging.getLogger(__name__)
 
+STATE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "state.json")
+
+# Browserless encerra a sessao CDP depois disso (parametro timeout da URL)
+BROWSERLESS_TIMEOUT_MS = 300000
+
+
+def build_cdp_url() -> str:
+    """Monta a URL de conexao CDP com stealth e headless=false."""
+    SERVICE_URL_BROWSERLESS = os.environ.get("SERVICE_URL_BROWSERLESS", "")
+    SERVICE_PASSWORD_BROWSERLESS = os.environ.get("SERVICE_PASSWORD_BROWSERLESS", "")
+
+    if not SERVICE_URL_BROWSERLESS or not SERVICE_PASSWORD_BROWSERLESS:
+        raise ValueError(
+            "Variaveis SERVICE_URL_BROWSERLESS e SERVICE_PASSWORD_BROWSERLESS sao obrigatorias!"
+        )
+
+    launch_config = quote(json.dumps({
+        "headless": False,
+        "stealth": True,
+        "args": [
+            "--disable-blink-features=AutomationControlled",
+            "--window-size=1366,768",
+        ]
+    }))
+
+    host = SERVICE_URL_BROWSERLESS.replace("https://", "").replace("http://", "")
+    return f"wss://{host}?token={SERVICE_PASSWORD_BROWSERLESS}&timeout={BROWSERLESS_TIMEOUT_MS}&launch={launch_config}"
+
+
+async def connect_browserless(playwright):
+    """
+    Conecta ao Browserless e retorna (browser, context).
+    Usa o contexto default do Browserless (para manter stealth).
+    """
+    browser = await playwright.chromium.connect_over_cdp(build_cdp_url())
+
+    # IMPORTANTE: Usar o contexto default do Browserless para manter stealth!
+    # Criar new_context() perde as flags anti-deteccao e o Google bloqueia.
+    if browser.contexts:
+        context = browser.contexts[0]
+        logger.info("Usando contexto default do Browserless (stealth preservado).")
+    else:
+        context = await browser.new_context(
+            viewport={"width": 1366, "height": 768},
+            locale="pt-BR",
+        )
+        logger.info("Novo contexto criado (Browserless sem contexto default).")
+
+    return browser, context
+
+
+async def load_state(context, state_path: str = STATE_PATH):
+    """Carrega cookies do state.json manualmente no contexto, se existir."""
+    if not os.path.exists(state_path):
+        logger.info("Nenhum state.json encontrado. Sessao limpa.")
+        return
+
+    logger.info(f"Carregando cookies de: {state_path}")
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state_data = json.load(f)
+
+        # Injeta cookies
+        cookies = state_data.get("cookies", [])
+        if cookies:
+            await context.add_cookies(cookies)
+            logger.info(f"{len(cookies)} cookies carregados no contexto.")
+
+        # Injeta localStorage via script (para cada origin)
+        origins = state_data.get("origins", [])
+        for origin_data in origins:
+            origin = origin_data.get("origin", "")
+            local_storage = origin_data.get("localStorage", [])
+            if local_storage and origin:
+                logger.info(f"Carregando {len(local_storage)} itens de localStorage para {origin}")
+                # localStorage sera aplicado quando navegarmos para a pagina
+    except Exception as e:
+        logger.warning(f"Erro ao carregar state.json: {e}")
+
+
 class Navegador:
-    def __init__(self):
+    def __init__(self, pool=None, perfil_bloqueio: str = None, duracao_estimada_s: float = None):
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
+        self.pool = pool
+        self._lease = None
+        # Com pool: so aceita conexao cuja sessao Browserless dure a execucao inteira
+        self.duracao_estimada_s = duracao_estimada_s
+        self.perfil_bloqueio = resolver_perfil(perfil_bloqueio)
+        self.bloqueador = None
+        self.captura = None
+        # HAR exige um contexto exclusivo da execucao: nao se aplica a conexoes do pool
+        self.har = GravacaoHar(modo_har()) if modo_har() and pool is None else None
 
     async def setup_browser(self):
         """
         Conecta ao Browserless via CDP com stealth e headless=false.
         Usa o contexto default do Browserless (para manter stealth).
         Carrega cookies do state.json manualmente se existir.
+        Com pool configurado, empresta uma conexao ja aquecida.
+        Com NAVEGADOR_HAR=reproduzir, usa Chromium local headless servindo o HAR (offline).
         """
-        logger.info("Iniciando browser via Browserless (stealth=ON, headless=OFF)...")
-        self.playwright = await async_playwright().start()
-
-        # Monta URL CDP do Browserless
-        cdp_url = self._build_cdp_url()
-
-        # Conecta ao Browserless
-        self.browser = await self.playwright.chromium.connect_over_cdp(cdp_url)
+        if self.pool is not None:
+            self._lease = await self.pool.acquire(self.duracao_estimada_s)
+            self.playwright = self.pool.playwright
+            self.browser = self._lease.browser
+            self.context = self._lease.context
+            self.page = self._lease.page
+            await self._instalar_bloqueio()
+            return self.page
 
-        # IMPORTANTE: Usar o contexto default do Browserless para manter stealth!
-        # Criar new_context() perde as flags anti-deteccao e o Google bloqueia.
-        if self.browser.contexts:
-            self.context = self.browser.contexts[0]
-            logger.info("Usando contexto default do Browserless (stealth preservado).")
-        else:
-            self.context = await self.browser.new_context(
-                viewport={"width": 1366, "height": 768},
-                locale="pt-BR",
-            )
-            logger.info("Novo contexto criado (Browserless sem contexto default).")
-
-        # Carrega cookies do state.json manualmente no contexto default
-        script_dir = os.path.dirname(__file__)
-        state_path = os.path.join(script_dir, "..", "..", "state.json")
-
-        if os.path.exists(state_path):
-            logger.info(f"Carregando cookies de: {state_path}")
-            try:
-                with open(state_path, "r", encoding="utf-8") as f:
-                    state_data = json.load(f)
-
-                # Injeta cookies
-                cookies = state_data.get("cookies", [])
-                if cookies:
-                    await self.context.add_cookies(cookies)
-                    logger.info(f"{len(cookies)} cookies carregados no contexto.")
-
-                # Injeta localStorage via script (para cada origin)
-                origins = state_data.get("origins", [])
-                for origin_data in origins:
-                    origin = origin_data.get("origin", "")
-                    local_storage = origin_data.get("localStorage", [])
-                    if local_storage and origin:
-                        logger.info(f"Carregando {len(local_storage)} itens de localStorage para {origin}")
-                        # localStorage sera aplicado quando navegarmos para a pagina
-            except Exception as e:
-                logger.warning(f"Erro ao carregar state.json: {e}")
+        self.playwright = await async_playwright().start()
+        if self.har and self.har.reproduzindo:
+            self.browser, self.context = await self.har.abrir_navegador_reproducao(self.playwright)
         else:
-            logger.info("Nenhum state.json encontrado. Sessao limpa.")
+            logger.info("Iniciando browser via Browserless (stealth=ON, headless=OFF)...")
+            self.browser, self.context = await connect_browserless(self.playwright)
+
+        # Gravacao/reproducao de HAR (antes do bloqueio, para o bloqueio decidir primeiro)
+        if self.har:
+            await self.har.instalar(self.context)
+        await self._instalar_bloqueio()
+        if not (self.har and self.har.reproduzindo):
+            await load_state(self.context)
 
         # Usa pagina existente ou cria nova
         self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
         self.page.set_default_timeout(60000)
         return self.page
 
+    async def _instalar_bloqueio(self):
+        """Bloqueio de recursos pesados (imagens, fontes, analytics) conforme o perfil do portal."""
+        if self.perfil_bloqueio:
+            self.bloqueador = BloqueadorRecursos(self.perfil_bloqueio)
+            await self.bloqueador.instalar(self.context)
+
+        # Respostas JSON (xhr/fetch) ficam disponiveis para os page objects
+        self.captura = CapturaRespostas.do_contexto(self.context)
+
+    def resumo_bloqueio(self) -> dict:
+        """Economia do bloqueio de recursos para o wide event (vazio se desativado)."""
+        return self.bloqueador.resumo() if self.bloqueador else {}
+
+    def resumo_captura(self) -> dict:
+        """Endpoints JSON capturados na execucao, para o wide event."""
+        return self.captura.resumo() if self.captura else {}
+
     def _build_cdp_url(self) -> str:
         """Monta a URL de conexao CDP com stealth e headless=false."""
-        SERVICE_URL_BROWSERLESS = os.environ.get("SERVICE_URL_BROWSERLESS", "")
-        SERVICE_PASSWORD_BROWSERLESS = os.environ.get("SERVICE_PASSWORD_BROWSERLESS", "")
-
-        if not SERVICE_URL_BROWSERLESS or not SERVICE_PASSWORD_BROWSERLESS:
-            raise ValueError(
-                "Variaveis SERVICE_URL_BROWSERLESS e SERVICE_PASSWORD_BROWSERLESS sao obrigatorias!"
-            )
-
-        launch_config = quote(json.dumps({
-            "headless": False,
-            "stealth": True,
-            "args": [
-                "--disable-blink-features=AutomationControlled",
-                "--window-size=1366,768",
-            ]
-        }))
-
-        host = SERVICE_URL_BROWSERLESS.replace("https://", "").replace("http://", "")
-        return f"wss://{host}?token={SERVICE_PASSWORD_BROWSERLESS}&timeout=300000&launch={launch_config}"
+        return build_cdp_url()
 
     def update_page(self, new_page):
         """Atualiza a referencia da pagina quando uma nova aba e aberta."""
         self.page = new_page
+        if self._lease is not None:
+            self._lease.page = new_page
         logger.info("Referencia da pagina atualizada no navegador.")
 
     async def save_state(self):
         """Salva o estado da sessao (cookies, localStorage) no arquivo state.json."""
         try:
             if self.context:
-                script_dir = os.path.dirname(__file__)
-                state_path = os.path.join(script_dir, "..", "..", "state.json")
-                await self.context.storage_state(path=state_path)
-                logger.info(f"Estado da sessao salvo em: {state_path}")
+                await self.context.storage_state(path=STATE_PATH)
+                logger.info(f"Estado da sessao salvo em: {STATE_PATH}")
         except Exception as e:
             logger.error(f"Erro ao salvar estado da sessao: {e}")
 
     async def stop_browser(self):
-        """Fecha o browser e limpa os recursos."""
+        """Fecha o browser e limpa os recursos (ou devolve a conexao ao pool)."""
+        if self._lease is not None:
+            lease, self._lease = self._lease, None
+            try:
+                # Init script nao sai do contexto: a conexao nao volta para o pool
+                if SessaoExtranet.alterou_contexto(self.context):
+                    lease.mark_for_recycle("init_script")
+                # O contexto volta para o pool: remove o que este fluxo instalou antes de devolver
+                if self.bloqueador:
+                    await self.bloqueador.remover()
+                if self.captura:
+                    self.captura.remover()
+                MetricasAcoes.descartar(self.context)
+                Espera.descartar(lease.page)
+            except Exception as e:
+                logger.warning(f"Erro ao limpar a conexao do pool: {e}")
+                lease.mark_for_recycle("cleanup_failed")
+            finally:
+                await self.pool.release(lease)
+                self.browser = self.context = self.page = None
+            return
+
         try:
+            if self.har:
+                await self.har.finalizar(self.context)
             if self.browser:
                 await self.browser.close()
             if self.playwright:
@@ -0,0 +1,135 @@
+"""
+Bounded multi-page executor on top of a single authenticated context.
+
+Scrapers normally drive one `page` serially even when the work items are
+independent (e.g. CAR: every CS code x month). The executor opens up to N
+tabs in the SAME context the Navegador already logged in (the Browserless
+default context, so stealth and cookies are shared), runs a page-object
+coroutine for each item from a queue and collects results and errors per item.
+
+    executor = PageExecutor(navegador.context, setup=open_calendar, first_page=page)
+    results = await executor.run(items, handler)
+
+  - setup(page)          -> builds the page object for a tab (navigate, dismiss popups...)
+  - handler(target, item) -> extracts one item with that page object
+
+A failed attempt re-runs setup on that tab before retrying, since the page may
+be left in a bad state. A closed browser aborts the remaining items.
+
+Settings (constructor args, with environment fallbacks):
+    PAGE_EXECUTOR_MAX_PAGES       tabs working at the same time (default 1 = serial)
+    PAGE_EXECUTOR_ITEM_TIMEOUT_S  timeout per attempt, setup included (default 120)
+    PAGE_EXECUTOR_MAX_RETRIES     retries per item after the first attempt (default 1)
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED_BROWSER_ERROR = "Target page, context or browser has been closed"
+
+
+class ItemResult:
+    """Outcome of a single work item."""
+
+    def __init__(self, item):
+        self.item = item
+        self.value = None
+        self.error = None
+        self.attempts = 0
+        self.duration_s = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.attempts > 0
+
+
+class PageExecutor:
+    """Runs page-object coroutines over a work queue using up to N tabs of one context."""
+
+    def __init__(self, context, setup, first_page=None, max_pages: int = None,
+                 item_timeout_s: float = None, max_retries: int = None):
+        self.context = context
+        self.setup = setup
+        self.first_page = first_page
+        self.max_pages = max(1, max_pages or int(os.getenv("PAGE_EXECUTOR_MAX_PAGES", "1")))
+        self.item_timeout_s = item_timeout_s or float(os.getenv("PAGE_EXECUTOR_ITEM_TIMEOUT_S", "120"))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("PAGE_EXECUTOR_MAX_RETRIES", "1"))
+
+        self._aborted = False
+        self.stats = {"pages": 0, "items_ok": 0, "items_failed": 0, "retries": 0, "duration_s": 0.0}
+
+    async def run(self, items: list, handler) -> list[ItemResult]:
+        """Process every item and return one ItemResult per item, in input order."""
+        start = time.time()
+        self._aborted = False
+
+        queue = asyncio.Queue()
+        for index, item in enumerate(items):
+            queue.put_nowait((index, item))
+        results = [ItemResult(item) for item in items]
+
+        n_pages = min(self.max_pages, len(items))
+        logger.info(f"Page executor: {len(items)} items on {n_pages} page(s).")
+        await asyncio.gather(*(self._worker(w, queue, results, handler) for w in range(n_pages)))
+
+        for result in results:
+            if result.attempts == 0:
+                result.error = "aborted: browser closed before this item ran"
+            self.stats["items_ok" if result.ok else "items_failed"] += 1
+        self.stats["duration_s"] = round(time.time() - start, 2)
+        logger.info(f"Page executor finished: {self.stats}")
+        return results
+
+    async def _worker(self, worker_id: int, queue: asyncio.Queue, results: list, handler):
+        if worker_id == 0 and self.first_page is not None:
+            page, owned = self.first_page, False
+        else:
+            page, owned = await self.context.new_page(), True
+            page.set_default_timeout(60000)
+        self.stats["pages"] += 1
+
+        target = None
+        try:
+            while not self._aborted:
+                try:
+                    index, item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                result = results[index]
+                item_start = time.time()
+                for attempt in range(1, self.max_retries + 2):
+                    result.attempts = attempt
+                    if attempt > 1:
+                        self.stats["retries"] += 1
+                    try:
+                        target, result.value = await asyncio.wait_for(
+                            self._attempt(page, target, handler, item), timeout=self.item_timeout_s
+                        )
+                        result.error = None
+                        break
+                    except Exception as e:
+                        result.error = f"{type(e).__name__}: {e}"
+                        logger.warning(f"[page {worker_id}] {item} failed (attempt {attempt}): {result.error}")
+                        # Page may be in a bad state: rebuild it before the next attempt
+                        target = None
+                        if CLOSED_BROWSER_ERROR in str(e):
+                            self._aborted = True
+                            break
+                result.duration_s = round(time.time() - item_start, 2)
+        finally:
+            if owned:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+
+    async def _attempt(self, page, target, handler, item):
+        """One attempt: (re)build the page object if needed, then run the handler."""
+        if target is None:
+            target = await self.setup(page)
+        return target, await handler(target, item)
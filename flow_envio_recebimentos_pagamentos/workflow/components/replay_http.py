@@ -0,0 +1,184 @@
+"""
+Replay HTTP das APIs da Extranet, sem Browserless.
+
+Depois que uma execucao com navegador autentica e captura as chamadas de API
+(CapturaRespostas.receita), a receita e salva ao lado da sessao em cache
+(SessaoExtranet). Nas execucoes seguintes, enquanto a sessao for valida, as
+mesmas chamadas sao refeitas direto por HTTP com os cookies da sessao e o
+bearer capturado - sem abrir navegador nem subir o driver do Playwright:
+uma requests.Session com pool de conexoes, chamada em threads com
+concorrencia limitada.
+
+Se a sessao expirou ou a API recusar (401/403/redirect para o login), o
+chamador recebe SessaoHttpExpirada e volta para o caminho com navegador.
+
+Chamadas parametrizadas (ex.: calendario CAR por CS/mes/ano) viram molde:
+molde_chamada troca os valores dos parametros por {nome} e confirmar_molde
+so aceita o molde se ele reproduzir, byte a byte, as chamadas capturadas
+com outros parametros - so entao ele vai para a receita. Parametro que nao
+variou nas capturas fica literal no molde (em "fixos"), e molde_cobre recusa
+chamadas com outro valor dele.
+
+Usado pelo calendario CAR (scrapeCar). O Mooz Cartoes fica no navegador:
+o portal nao tem sessao em cache (cada execucao faz login pelo formulario),
+o estabelecimento e trocado por um clique na UI cujo efeito no servidor nao
+e capturado, e as chamadas de pagamentos nunca foram vistas - nao ha
+cookie/bearer nem chamada para refazer.
+"""
+
+import asyncio
+import json
+import logging
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from workflow.components.sessao_extranet import LOGIN_HOST, SessaoExtranet
+
+logger = logging.getLogger(__name__)
+
+
+class SessaoHttpExpirada(Exception):
+    """A API recusou a sessao em cache: e preciso autenticar pelo navegador."""
+
+
+def caminho_receita(sessao: SessaoExtranet, nome: str) -> str:
+    """Receitas ficam junto do arquivo de sessao do mesmo usuario."""
+    return sessao.caminho.replace(".json", f".receita_{nome}.json")
+
+
+def salvar_receita(sessao: SessaoExtranet, nome: str, receita: dict):
+    if not receita.get("chamadas"):
+        logger.info(f"Nenhuma chamada de API capturada para a receita '{nome}'.")
+        return
+    caminho = caminho_receita(sessao, nome)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(receita, f)
+    logger.info(f"Receita '{nome}' salva com {len(receita['chamadas'])} chamada(s).")
+
+
+def carregar_receita(sessao: SessaoExtranet, nome: str):
+    caminho = caminho_receita(sessao, nome)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def molde_chamada(chamada: dict, parametros: dict) -> dict:
+    """Chamada com os valores de `parametros` (nome -> texto) trocados por {nome} na url e no corpo."""
+    def moldar(texto):
+        if not texto:
+            return texto
+        # Valores mais longos primeiro: "2026" antes de "02", sem um comer o outro
+        for nome, valor in sorted(parametros.items(), key=lambda item: -len(item[1])):
+            texto = texto.replace(valor, "{" + nome + "}")
+        return texto
+
+    return {"metodo": chamada["metodo"], "url": moldar(chamada["url"]), "corpo": moldar(chamada.get("corpo"))}
+
+
+def renderizar_chamada(molde: dict, parametros: dict) -> dict:
+    """Chamada concreta a partir do molde (inverso de molde_chamada)."""
+    def renderizar(texto):
+        if not texto:
+            return texto
+        for nome, valor in parametros.items():
+            texto = texto.replace("{" + nome + "}", valor)
+        return texto
+
+    return {"metodo": molde["metodo"], "url": renderizar(molde["url"]), "corpo": renderizar(molde.get("corpo"))}
+
+
+def molde_cobre(molde: dict, parametros: dict) -> bool:
+    """O molde confirmado serve para estes parametros? (os fixos precisam ter o valor capturado)"""
+    if "fixos" not in molde:
+        return False
+    return all(parametros.get(nome) == valor for nome, valor in molde["fixos"].items())
+
+
+def confirmar_molde(capturadas: list):
+    """
+    Molde a partir de [(parametros, chamada), ...] capturados no navegador, ou
+    None. So vira {nome} o parametro que assumiu ao menos dois valores nas
+    capturas (com um valor so, um "02" qualquer da url seria confundido com
+    ele); os demais ficam literais em "fixos". Exige ao menos um parametro
+    variavel, presente no molde, e o molde reproduzindo exatamente cada captura.
+    """
+    valores = {}
+    for parametros, _ in capturadas:
+        for nome, valor in parametros.items():
+            valores.setdefault(nome, set()).add(valor)
+    variaveis = {nome for nome, vistos in valores.items() if len(vistos) >= 2}
+    if not variaveis:
+        return None
+
+    parametros, chamada = capturadas[0]
+    molde = molde_chamada(chamada, {nome: parametros[nome] for nome in variaveis})
+    texto = f"{molde['url']} {molde.get('corpo') or ''}"
+    if any("{" + nome + "}" not in texto for nome in variaveis):
+        return None
+    for parametros, chamada in capturadas:
+        original = {"metodo": chamada["metodo"], "url": chamada["url"], "corpo": chamada.get("corpo")}
+        if renderizar_chamada(molde, {nome: parametros[nome] for nome in variaveis}) != original:
+            return None
+    molde["fixos"] = {nome: next(iter(vistos)) for nome, vistos in valores.items() if nome not in variaveis}
+    return molde
+
+
+class ClienteApiExtranet:
+    """Cliente HTTP (requests com pool de conexoes) com os cookies/bearer de uma sessao da Extranet."""
+
+    def __init__(self, storage_state: dict, autorizacao: str = None, max_concorrencia: int = 4,
+                 timeout_s: float = 30):
+        self.storage_state = storage_state
+        self.autorizacao = autorizacao
+        self.max_concorrencia = max_concorrencia
+        self.timeout_s = timeout_s
+        self._semaforo = asyncio.Semaphore(max_concorrencia)
+        self.http = None
+
+    async def __aenter__(self):
+        self.http = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=self.max_concorrencia, pool_maxsize=self.max_concorrencia)
+        self.http.mount("https://", adaptador)
+        self.http.headers["accept"] = "application/json"
+        if self.autorizacao:
+            self.http.headers["authorization"] = self.autorizacao
+        for cookie in self.storage_state.get("cookies", []):
+            self.http.cookies.set(
+                cookie["name"], cookie["value"],
+                domain=cookie.get("domain", ""), path=cookie.get("path", "/"), secure=cookie.get("secure", False),
+            )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self.http:
+            self.http.close()
+
+    def _requisitar(self, chamada: dict):
+        corpo = chamada.get("corpo")
+        cabecalhos = {}
+        if corpo and corpo.lstrip()[:1] in ("{", "["):
+            cabecalhos["content-type"] = "application/json"
+        return self.http.request(
+            chamada.get("metodo", "GET"), chamada["url"], data=corpo, headers=cabecalhos,
+            allow_redirects=False, timeout=self.timeout_s,
+        )
+
+    async def chamar(self, chamada: dict):
+        """Refaz uma chamada da receita e devolve o JSON."""
+        async with self._semaforo:
+            resposta = await asyncio.to_thread(self._requisitar, chamada)
+
+        if resposta.status_code in (401, 403) or LOGIN_HOST in resposta.headers.get("location", ""):
+            raise SessaoHttpExpirada(f"{resposta.status_code} em {chamada['url']}")
+        if resposta.is_redirect or not resposta.ok:
+            raise RuntimeError(f"HTTP {resposta.status_code} em {chamada['url']}")
+        return resposta.json()
+
+    async def chamar_todas(self, chamadas: list) -> list:
+        """Refaz as chamadas em paralelo (limitado pelo semaforo), na mesma ordem."""
+        return await asyncio.gather(*(self.chamar(c) for c in chamadas))
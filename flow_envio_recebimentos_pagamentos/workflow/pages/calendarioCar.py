@@ -1,6 +1,13 @@
 import asyncio
 import re
+import time
+import weakref
 from datetime import datetime
+from workflow.components.captura_respostas import CapturaRespostas
+from workflow.components.data_cleaners import parse_brl, parse_titulos
+from workflow.components.espera import Espera
+from workflow.components.metricas_acoes import MetricasAcoes
+from workflow.components.sessao_extranet import LOGIN_HOST, SessaoExtranet, url_para_log
 from workflow.components.wide_logger import WideLogger
 
 MESES = {
@@ -11,10 +18,139 @@ MESES = {
 
 CS_CODES = ["13406", "13408", "14056", "23107"]
 
+# XHR/fetch behind the calendar MFE (installments by CS code / month): a path
+# segment, not any URL that merely mentions the words
+CALENDAR_API_PATTERN = r"(?i)/(calendar|calendario|installments?)(/|\?|$)"
+
+_PAYLOAD_DATE = re.compile(r"^(?:(\d{4})-(\d{2})-(\d{2})|(\d{2})[/-](\d{2})[/-](\d{4}))")
+
+
+def _day_id(value) -> str | None:
+    """'2026-02-23...' or '23/02/2026' -> '23-02-2026' (the calendar cell testid)."""
+    match = _PAYLOAD_DATE.match(str(value)) if isinstance(value, str) else None
+    if not match:
+        return None
+    if match.group(1):
+        return f"{match.group(3)}-{match.group(2)}-{match.group(1)}"
+    return f"{match.group(4)}-{match.group(5)}-{match.group(6)}"
+
+
+def _number(value) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _brl(value: float) -> str:
+    return "R$ " + f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _walk(node, path=()):
+    """Yield (path, node) for every node of a JSON document."""
+    yield path, node
+    if isinstance(node, dict):
+        for key, child in node.items():
+            yield from _walk(child, path + (key,))
+    elif isinstance(node, list):
+        for index, child in enumerate(node):
+            yield from _walk(child, path + (index,))
+
+
+def _at(node, path):
+    for key in path:
+        node = node[key]
+    return node
+
+
+def learn_payload_mapping(payload, dom_data: dict) -> dict | None:
+    """
+    Find where the calendar payload holds what the DOM shows: the list of
+    installment days (date, value, status, titulos keys) and the two totals.
+    Returns the mapping only if every field matches the DOM at exactly one
+    place; None when it doesn't or is ambiguous (the DOM stays the source).
+    """
+    dom_days = {d["date"]: d for d in dom_data.get("days", [])}
+    totals = {k: dom_data.get(k) for k in ("total_recebimentos", "total_agendamentos")}
+    if not dom_days or None in totals.values():
+        return None
+    if any(parse_titulos(d["titulos"]) is None for d in dom_days.values()):
+        return None  # e.g. "Feriado": no payload field can reproduce it
+
+    def unique(candidates):
+        candidates = list(candidates)
+        return candidates[0] if len(candidates) == 1 else None
+
+    days_map = None
+    for path, node in _walk(payload):
+        if not (isinstance(node, list) and node and all(isinstance(item, dict) for item in node)):
+            continue
+        keys = sorted(set.intersection(*(set(item) for item in node)), key=str)
+        date_key = unique(k for k in keys if all(_day_id(item[k]) for item in node))
+        if not date_key:
+            continue
+        items = {_day_id(item[date_key]): item for item in node}
+        if len(items) != len(node) or set(items) != set(dom_days):
+            continue
+
+        def key_matching(check):
+            return unique(k for k in keys if all(check(items[day][k], dom) for day, dom in dom_days.items()))
+
+        days_map = {
+            "path": list(path),
+            "date": date_key,
+            "value": key_matching(lambda v, dom: _number(v) is not None and abs(v - parse_brl(dom["value"])) < 0.005),
+            "status": key_matching(lambda v, dom: v == dom["status"]),
+            "titulos": key_matching(lambda v, dom: _number(v) is not None and int(v) == parse_titulos(dom["titulos"])),
+        }
+        break
+    if not days_map or None in days_map.values():
+        return None
+
+    mapping = {"days": days_map}
+    prefix = tuple(days_map["path"])
+    for name, text in totals.items():
+        target = parse_brl(text)
+        mapping[name] = unique(
+            list(path) for path, node in _walk(payload)
+            if path[:len(prefix)] != prefix and _number(node) is not None and abs(node - target) < 0.005
+        )
+        if mapping[name] is None:
+            return None
+    if mapping["total_recebimentos"] == mapping["total_agendamentos"]:
+        return None
+    return mapping
+
+
+def read_payload(payload, mapping: dict) -> dict | None:
+    """Calendar data from the payload through a learned mapping, in the DOM's shape; None if it no longer fits."""
+    try:
+        days_map = mapping["days"]
+        days = []
+        for item in _at(payload, days_map["path"]):
+            titulos = int(item[days_map["titulos"]])
+            days.append({
+                "date": _day_id(item[days_map["date"]]),
+                "value": _brl(float(item[days_map["value"]])),
+                "status": item[days_map["status"]],
+                "titulos": f"{titulos:,} título{'s' if titulos != 1 else ''}".replace(",", "."),
+            })
+        if not days or not all(d["date"] for d in days):
+            return None
+        return {
+            "total_recebimentos": _brl(float(_at(payload, mapping["total_recebimentos"]))),
+            "total_agendamentos": _brl(float(_at(payload, mapping["total_agendamentos"]))),
+            "days": sorted(days, key=lambda d: datetime.strptime(d["date"], "%d-%m-%Y")),
+        }
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
 
 class CalendarioCarPage:
     """Page Object for Calendario CAR on Extranet Grupo Boticario."""
 
+    # Payload mapping learned per context: tabs of the same run share it
+    _payload_mappings = weakref.WeakKeyDictionary()
+
     LOGIN_URL = (
         "https://login.extranet.grupoboticario.com.br/1e6392bd-5377-48f0-9a8e-467f5b381b18"
         "/oauth2/v2.0/authorize?p=B2C_1A_JIT_SIGNUPORSIGNIN_FEDCORP_APIGEE_PRD"
@@ -31,13 +167,32 @@ class CalendarioCarPage:
     def __init__(self, page, logger: WideLogger):
         self.page = page
         self.logger = logger
+        self.espera = Espera.da_pagina(page)
+        self.captura = CapturaRespostas.do_contexto(page.context)
+        self.metrics = MetricasAcoes.do_contexto(page.context)
+        self.search_started_at = 0.0
+        self.last_api_response = None
+
+    @classmethod
+    def payload_mapping(cls, context) -> dict | None:
+        """Payload mapping confirmed by the DOM in this context, if any (for the HTTP replay recipe)."""
+        return cls._payload_mappings.get(context)
 
     # ── Auth & Navigation ─────────────────────────────────────────────
 
     async def login(self, username, password):
+        session = SessaoExtranet(username)
+        if await session.restaurar(self.page.context):
+            ready = self.page.get_by_text("Código da CS")
+            if await session.validar(self.page, self.CALENDAR_URL, ready):
+                self.logger.info("Cached Extranet session is valid. Skipping login form.")
+                self.logger.add_context("extranet_session", "cached")
+                return
+
         self.logger.info("Navigating to Login URL...")
-        await self.page.goto(self.LOGIN_URL, wait_until="networkidle")
-        await asyncio.sleep(2)
+        async with self.metrics.medir("goto", "login"):
+            await self.page.goto(self.LOGIN_URL, wait_until="networkidle")
+        await self.espera.dom_quieto(substitui_ms=2000)
 
         if await self.page.locator("#signInName").is_visible():
             self.logger.info("Login page detected. Performing login...")
@@ -50,26 +205,33 @@ class CalendarioCarPage:
             await self.page.fill("#password", password)
 
             self.logger.info("Clicking ENTRAR...")
-            await self.page.click("#next")
+            async with self.metrics.medir("click", "#next"):
+                await self.page.click("#next")
 
             await self.page.wait_for_load_state("domcontentloaded")
-            await asyncio.sleep(5)
+            await self.espera.url_estavel(lambda url: LOGIN_HOST not in url, estavel_ms=1000, substitui_ms=5000)
 
-            self.logger.info(f"Post-login URL: {self.page.url}")
-            self.logger.add_context("post_login_url", self.page.url)
+            self.logger.info(f"Post-login URL: {url_para_log(self.page.url)}")
+            self.logger.add_context("post_login_url", url_para_log(self.page.url))
         else:
             self.logger.info("Already logged in. Proceeding...")
 
+        await session.salvar(self.page.context)
+        self.logger.add_context("extranet_session", "login")
+
     async def navigate_to_calendar(self):
         self.logger.info("Navigating to Calendar CAR...")
         try:
-            await self.page.goto(self.CALENDAR_URL, wait_until="domcontentloaded")
+            # A cached session is validated on the calendar itself; no need to reload it
+            if not self.page.url.startswith(self.CALENDAR_URL):
+                await self.page.goto(self.CALENDAR_URL, wait_until="domcontentloaded")
         except Exception as e:
             self.logger.warning(f"Navigation warning: {e}")
 
         # Wait for MFE to fully render (SPA loads microfrontend content async)
         self.logger.info("Waiting for MFE content to render...")
-        await self.page.get_by_text("Código da CS").wait_for(state="visible", timeout=30000)
+        async with self.metrics.medir("wait", "text=Código da CS"):
+            await self.page.get_by_text("Código da CS").wait_for(state="visible", timeout=30000)
         self.logger.info(f"Calendar page loaded. URL: {self.page.url}")
 
     # ── Dismiss popups ────────────────────────────────────────────────
@@ -96,13 +258,15 @@ class CalendarioCarPage:
         self.logger.info(f"Selecting '{option_text}' in #{button_id}")
 
         btn = self.page.locator(f"#{button_id}")
-        await btn.click()
+        async with self.metrics.medir("click", f"#{button_id}"):
+            await btn.click()
         await asyncio.sleep(0.5)
 
         # The listbox appears; select the matching option
         option = self.page.get_by_role("option", name=option_text, exact=True)
-        await option.wait_for(state="visible", timeout=5000)
-        await option.click()
+        async with self.metrics.medir("select_option", f"#{button_id} option"):
+            await option.wait_for(state="visible", timeout=5000)
+            await option.click()
         await asyncio.sleep(0.5)
 
     async def select_filters(self, cs_code: str, month: int, year: int):
@@ -117,13 +281,18 @@ class CalendarioCarPage:
         """Click Buscar, wait for loading, retry on error."""
         for attempt in range(1, max_retries + 1):
             self.logger.info(f"Clicking Buscar (attempt {attempt}/{max_retries})...")
-            await self.page.locator("button:has-text('Buscar')").click()
+            if attempt > 1:
+                self.metrics.retentativa("click", "button:has-text('Buscar')")
+            self.search_started_at = time.time()
+            async with self.metrics.medir("click", "button:has-text('Buscar')"):
+                await self.page.locator("button:has-text('Buscar')").click()
 
             # Wait for the loading spinner to appear then disappear
             try:
                 loading = self.page.locator("[data-testid='loading-icon']")
-                await loading.wait_for(state="visible", timeout=5000)
-                await loading.wait_for(state="hidden", timeout=30000)
+                async with self.metrics.medir("wait_spinner", "[data-testid='loading-icon']"):
+                    await loading.wait_for(state="visible", timeout=5000)
+                    await loading.wait_for(state="hidden", timeout=30000)
             except Exception:
                 # Spinner may have appeared and gone too fast, or not at all
                 await asyncio.sleep(3)
@@ -149,6 +318,38 @@ class CalendarioCarPage:
     # ── Data extraction ───────────────────────────────────────────────
 
     async def extract_calendar_data(self) -> dict:
+        """
+        Totals and day-by-day data of the calendar just searched. Read from
+        this tab's API payload once a mapping learned against the DOM exists
+        (see learn_payload_mapping); otherwise, or if the payload no longer
+        fits, from the DOM - which also learns the mapping the first time.
+        """
+        context = self.page.context
+        mapping = self._payload_mappings.get(context)
+        if mapping:
+            self.last_api_response = await self.captura.aguardar(
+                CALENDAR_API_PATTERN, timeout_ms=2000, apos=self.search_started_at, pagina=self.page
+            )
+            data = read_payload(self.last_api_response.dados, mapping) if self.last_api_response else None
+            if data:
+                self.logger.info(
+                    f"Extracted {len(data['days'])} days from API payload ({self.last_api_response.caminho}) | "
+                    f"Receb={data['total_recebimentos']} | Agend={data['total_agendamentos']}"
+                )
+                return data
+            self.logger.warning("Calendar API payload missing or changed shape; reading the DOM.")
+
+        data = await self._extract_calendar_dom()
+
+        self.last_api_response = self.captura.ultima(CALENDAR_API_PATTERN, apos=self.search_started_at, pagina=self.page)
+        if self.last_api_response and context not in self._payload_mappings:
+            mapping = learn_payload_mapping(self.last_api_response.dados, data)
+            if mapping:
+                self._payload_mappings[context] = mapping
+                self.logger.info(f"Calendar API payload matches the DOM; next searches read it: {self.last_api_response.caminho}")
+        return data
+
+    async def _extract_calendar_dom(self) -> dict:
         """Extract totals and day-by-day data from the visible calendar."""
         data = await self.page.evaluate("""() => {
             const cal = document.querySelector('[data-testid="calendar"]');
@@ -1,4 +1,6 @@
 import asyncio
+from workflow.components.espera import Espera
+from workflow.components.metricas_acoes import MetricasAcoes
 from workflow.components.wide_logger import WideLogger
 
 class MoozCartoesPage:
@@ -10,11 +12,14 @@ class MoozCartoesPage:
     def __init__(self, page, logger: WideLogger):
         self.page = page
         self.logger = logger
+        self.espera = Espera.da_pagina(page)
+        self.metrics = MetricasAcoes.do_contexto(page.context)
 
     async def login(self, username, password):
         """Perform login to Mooz Cartões."""
         self.logger.info("Navigating to Login URL...")
-        await self.page.goto(self.LOGIN_URL, wait_until="networkidle")
+        async with self.metrics.medir("goto", "login"):
+            await self.page.goto(self.LOGIN_URL, wait_until="networkidle")
         
         
         # Fill credentials
@@ -25,11 +30,13 @@ class MoozCartoesPage:
 
         # Click Entrar
         self.logger.info("Clicking Entrar...")
-        await self.page.get_by_role("button", name="Entrar", exact=True).click()
+        async with self.metrics.medir("click", "button:Entrar"):
+            await self.page.get_by_role("button", name="Entrar", exact=True).click()
         
-        # Wait for login to complete
+        # Wait for login to complete: leave the auth route first, then let the SPA settle
+        await self.espera.url_estavel(lambda url: "/autenticacao" not in url, estavel_ms=500)
         await self.page.wait_for_load_state("networkidle")
-        await asyncio.sleep(5) # Wait for SPA transition
+        await self.espera.dom_quieto(quieto_ms=1000, substitui_ms=5000)
         self.logger.info(f"Post-login URL: {self.page.url}")
 
     async def open_merchant_list(self):
@@ -95,13 +102,15 @@ class MoozCartoesPage:
         """Navigate to the payments URL."""
         payments_url = "https://portal.portalmoozcartoes.com.br/payments"
         self.logger.info(f"Navigating to {payments_url}")
-        await self.page.goto(payments_url, wait_until="networkidle")
+        async with self.metrics.medir("goto", "payments"):
+            await self.page.goto(payments_url, wait_until="networkidle")
 
     async def navigate_to_select_merchant(self):
         """Navigate back to the merchant selection page."""
         url = "https://portal.portalmoozcartoes.com.br/selecionar-estabelecimento"
         self.logger.info(f"Navigating back to {url}")
-        await self.page.goto(url, wait_until="networkidle")
+        async with self.metrics.medir("goto", "selecionar-estabelecimento"):
+            await self.page.goto(url, wait_until="networkidle")
         # Ensure page is loaded by waiting for the main button
         await self.page.locator("button").filter(has_text="Estabelecimentos").first.wait_for(state="visible", timeout=10000)
 
@@ -4,6 +4,9 @@ import glob
 import os
 import shutil
 from datetime import datetime
+from workflow.components.espera import Espera
+from workflow.components.metricas_acoes import MetricasAcoes
+from workflow.components.sessao_extranet import LOGIN_HOST, SessaoExtranet, url_para_log
 from workflow.components.wide_logger import WideLogger
 
 
@@ -26,17 +29,28 @@ class PortalBoletosPage:
     )
     PORTAL_URL = "https://extranet.grupoboticario.com.br/mfe/portal-boletos-franqueado"
     CNS_URL = "https://jpmorgan.guastitecnologia.com.br/OBoticario/CNS/CNS001_BRW.aspx"
+    GUASTI_HOST = "jpmorgan.guastitecnologia.com.br"
 
     def __init__(self, page, logger: WideLogger):
         self.page = page
         self.logger = logger
+        self.espera = Espera.da_pagina(page)
+        self.metrics = MetricasAcoes.do_contexto(page.context)
 
     # ── Auth & Navigation ─────────────────────────────────────────────
 
     async def login(self, username, password):
+        session = SessaoExtranet(username)
+        if await session.restaurar(self.page.context):
+            if await session.validar(self.page, self.PORTAL_URL, lambda url: self.GUASTI_HOST in url):
+                self.logger.info("Cached Extranet session is valid. Skipping login form.")
+                self.logger.add_context("extranet_session", "cached")
+                return
+
         self.logger.info("Navigating to Login URL...")
-        await self.page.goto(self.LOGIN_URL, wait_until="networkidle")
-        await asyncio.sleep(2)
+        async with self.metrics.medir("goto", "login"):
+            await self.page.goto(self.LOGIN_URL, wait_until="networkidle")
+        await self.espera.dom_quieto(substitui_ms=2000)
 
         if await self.page.locator("#signInName").is_visible():
             self.logger.info("Login page detected. Performing login...")
@@ -49,21 +63,28 @@ class PortalBoletosPage:
             await self.page.fill("#password", password)
 
             self.logger.info("Clicking ENTRAR...")
-            await self.page.click("#next")
+            async with self.metrics.medir("click", "#next"):
+                await self.page.click("#next")
 
             await self.page.wait_for_load_state("domcontentloaded")
-            await asyncio.sleep(5)
+            await self.espera.url_estavel(lambda url: LOGIN_HOST not in url, estavel_ms=1000, substitui_ms=5000)
 
-            self.logger.info(f"Post-login URL: {self.page.url}")
-            self.logger.add_context("post_login_url", self.page.url)
+            self.logger.info(f"Post-login URL: {url_para_log(self.page.url)}")
+            self.logger.add_context("post_login_url", url_para_log(self.page.url))
         else:
             self.logger.info("Already logged in. Proceeding...")
 
+        await session.salvar(self.page.context)
+        self.logger.add_context("extranet_session", "login")
+
     async def navigate_to_portal(self):
         """Navigate to Portal Boletos and wait for redirect to JP Morgan/Guasti."""
         self.logger.info("Navigating to Portal Boletos...")
         try:
-            await self.page.goto(self.PORTAL_URL, wait_until="domcontentloaded")
+            # A cached session is validated by this same redirect; no need to repeat it
+            if self.GUASTI_HOST not in self.page.url:
+                async with self.metrics.medir("goto", "portal"):
+                    await self.page.goto(self.PORTAL_URL, wait_until="domcontentloaded")
         except Exception as e:
             self.logger.warning(f"Navigation warning: {e}")
 
@@ -71,17 +92,20 @@ class PortalBoletosPage:
         self.logger.info("Waiting for redirect to JP Morgan/Guasti...")
         try:
             await self.page.wait_for_url("**/jpmorgan.guastitecnologia.com.br/**", timeout=30000)
-        except Exception:
-            pass
+        except Exception as e:
+            self.logger.warning(f"Redirect to JP Morgan/Guasti not observed: {e}")
 
+        # Only check for a quiet DOM once the redirect chain has landed
+        await self.espera.url_estavel(lambda url: self.GUASTI_HOST in url, estavel_ms=500, timeout_ms=5000)
         await self.page.wait_for_load_state("domcontentloaded")
-        await asyncio.sleep(3)
+        await self.espera.dom_quieto(substitui_ms=3000)
         self.logger.info(f"Portal Boletos loaded. URL: {self.page.url}")
 
     async def navigate_to_cns(self):
         """Navigate to the CNS consultation page."""
         self.logger.info("Navigating to CNS page...")
-        await self.page.goto(self.CNS_URL, wait_until="networkidle")
+        async with self.metrics.medir("goto", "cns"):
+            await self.page.goto(self.CNS_URL, wait_until="networkidle")
 
         # Wait for the filter form to be ready (handles ASP.NET cookie redirects)
         await self.page.locator("#ctl00_ContentBody_txtVenctoInicial").wait_for(
@@ -131,9 +155,10 @@ class PortalBoletosPage:
     async def click_filtrar(self):
         """Click the 'Filtrar' button and wait for results."""
         self.logger.info("Clicking Filtrar...")
-        await self.page.click("#ctl00_ContentBody_btnPesquisar")
+        async with self.metrics.medir("click", "#ctl00_ContentBody_btnPesquisar"):
+            await self.page.click("#ctl00_ContentBody_btnPesquisar")
         await self.page.wait_for_load_state("networkidle")
-        await asyncio.sleep(3)
+        await self.espera.dom_quieto(substitui_ms=3000)
 
         # Verify results appeared
         row_count = await self.page.evaluate("""() => {
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from dotenv import load_dotenv
+from workflow.components.browser_pool import BrowserPool
+from workflow.components.navegador import Navegador
+from workflow.components.wide_logger import WideLogger
+from workflow.components.log_setup import setup_file_logging
+from workflow.scripts import scrapeCar, scrapeMooz, scrapeBoletos
+
+load_dotenv()
+
+# CAR and Boletos run back to back so Boletos finds the Extranet session cached by CAR.
+# The last field is the expected run time (s), with headroom over the logged durations:
+# a pooled connection is only reused if its Browserless session outlives it.
+SCRAPERS = [
+    ("car", scrapeCar.main, "extranet", 270),
+    ("boletos", scrapeBoletos.main, "extranet", 90),
+    ("mooz", scrapeMooz.main, "mooz", 210),
+]
+
+
+async def main():
+    logger = WideLogger("ScrapeAllService")
+    logger.info("Starting CAR, Mooz and Boletos on a shared browser pool...")
+
+    results = {}
+    async with BrowserPool(max_concurrency=1) as pool:
+        for name, scraper, blocking_profile, expected_run_s in SCRAPERS:
+            logger.info(f"─── Running {name} ───")
+            try:
+                await scraper(Navegador(
+                    pool=pool, perfil_bloqueio=blocking_profile, duracao_estimada_s=expected_run_s
+                ))
+                results[name] = "success"
+            except Exception as e:
+                logger.error(f"{name} failed: {e}", error=e)
+                results[name] = "failure"
+
+        logger.add_context("browser_pool", dict(pool.stats))
+
+    logger.add_context("results", results)
+    logger.finish(success=all(r == "success" for r in results.values()))
+
+
+if __name__ == "__main__":
+    setup_file_logging("scrapeAll")
+    asyncio.run(main())
@@ -6,6 +6,8 @@ from datetime import datetime
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 from dotenv import load_dotenv
+from workflow.components.espera import Espera
+from workflow.components.metricas_acoes import MetricasAcoes
 from workflow.components.navegador import Navegador
 from workflow.components.wide_logger import WideLogger
 from workflow.components.log_setup import setup_file_logging
@@ -16,11 +18,11 @@ load_dotenv()
 EXTRACOES_DIR = os.path.join(os.path.dirname(__file__), '../../extracoes')
 
 
-async def main():
+async def main(navegador: Navegador | None = None):
     logger = WideLogger("ScrapeBoletosService")
     logger.info("Starting Boletos extraction...")
 
-    navegador = Navegador()
+    navegador = navegador or Navegador(perfil_bloqueio="extranet")
     browser_active = False
     success = False
 
@@ -79,6 +81,13 @@ async def main():
 
     finally:
         if browser_active:
+            logger.add_context("resource_blocking", navegador.resumo_bloqueio())
+            logger.add_context("captured_responses", navegador.resumo_captura())
+            if navegador.page:
+                logger.add_context("waits", Espera.da_pagina(navegador.page).resumo())
+                metrics = MetricasAcoes.do_contexto(navegador.context)
+                logger.add_context("actions", metrics.resumo())
+                metrics.salvar()
             logger.info("Closing browser...")
             await navegador.stop_browser()
         logger.finish(success=success)
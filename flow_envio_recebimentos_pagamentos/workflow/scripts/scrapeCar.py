@@ -7,16 +7,96 @@ from datetime import datetime, date
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 from dotenv import load_dotenv
+from workflow.components.espera import Espera
+from workflow.components.metricas_acoes import MetricasAcoes
 from workflow.components.navegador import Navegador
+from workflow.components.page_executor import PageExecutor
+from workflow.components.replay_http import (
+    ClienteApiExtranet, SessaoHttpExpirada, carregar_receita, confirmar_molde, molde_cobre, renderizar_chamada,
+    salvar_receita,
+)
+from workflow.components.sessao_extranet import SessaoExtranet
 from workflow.components.wide_logger import WideLogger
 from workflow.components.data_cleaners import parse_brl, parse_titulos
 from workflow.components.log_setup import setup_file_logging
-from workflow.pages.calendarioCar import CalendarioCarPage, CS_CODES, MESES
+from workflow.pages.calendarioCar import CalendarioCarPage, CS_CODES, MESES, read_payload
 
 load_dotenv()
 
 EXTRACOES_DIR = os.path.join(os.path.dirname(__file__), '../../extracoes')
 
+# Calendar API call template + payload mapping, saved next to the cached Extranet session
+CALENDAR_RECIPE = "car_calendario"
+HTTP_CONCURRENCY = int(os.getenv("CAR_HTTP_CONCURRENCY", "4"))
+
+
+def call_params(cs_code: str, month: int, year: int) -> dict:
+    """Values of one search as they appear in the calendar API call (see replay_http.molde_chamada)."""
+    return {"cs": cs_code, "mes": f"{month:02d}", "ano": str(year)}
+
+
+def tag_entry(data: dict, cs_code: str, month: int, year: int) -> dict:
+    data["cs_code"] = cs_code
+    data["month"] = MESES[month]
+    data["month_number"] = month
+    data["year"] = year
+    data["extraction_date"] = datetime.now().isoformat()
+    return data
+
+
+async def extract_via_http(session: SessaoExtranet, items: list, logger: WideLogger) -> list | None:
+    """
+    Replay the calendar API for every (cs_code, month, year) with the cached
+    Extranet session - no browser. None when there is no valid session or
+    confirmed recipe, when the template does not cover every item (a value
+    that never varied in the captures, e.g. the year), or when any call or
+    payload fails (the caller falls back to the browser for the whole run).
+    """
+    state = session.carregar()
+    recipe = carregar_receita(session, CALENDAR_RECIPE) if state else None
+    if not recipe:
+        return None
+    if not all(molde_cobre(recipe["chamadas"][0], call_params(*item)) for item in items):
+        logger.info("Calendar API template does not cover every period of this run; using the browser.")
+        return None
+
+    calls = [renderizar_chamada(recipe["chamadas"][0], call_params(*item)) for item in items]
+    try:
+        async with ClienteApiExtranet(state, recipe.get("autorizacao"), max_concorrencia=HTTP_CONCURRENCY) as client:
+            payloads = await client.chamar_todas(calls)
+    except SessaoHttpExpirada as e:
+        logger.info(f"Calendar API refused the cached session ({e}); using the browser.")
+        return None
+    except Exception as e:
+        logger.warning(f"Calendar API replay failed, using the browser: {type(e).__name__} {e}")
+        return None
+
+    results = []
+    for (cs_code, month, year), payload in zip(items, payloads):
+        data = read_payload(payload, recipe["mapeamento"])
+        if data is None:
+            logger.warning(f"Calendar payload for CS={cs_code} {month}/{year} no longer fits the recipe; using the browser.")
+            return None
+        results.append(tag_entry(data, cs_code, month, year))
+    logger.info(f"Extracted {len(results)} calendars over HTTP.")
+    return results
+
+
+def save_calendar_recipe(session: SessaoExtranet, captured: list, context, logger: WideLogger):
+    """
+    Save the calendar call template for the HTTP replay, once it reproduces
+    every captured search and the payload mapping was confirmed by the DOM.
+    """
+    template = confirmar_molde([(params, call) for params, call, _ in captured])
+    mapping = CalendarioCarPage.payload_mapping(context)
+    if not template or not mapping:
+        logger.info("Calendar API call/payload not confirmed; next run uses the browser again.")
+        return
+    authorization = next((auth for _, _, auth in reversed(captured) if auth), None)
+    salvar_receita(session, CALENDAR_RECIPE, {
+        "chamadas": [template], "autorizacao": authorization, "mapeamento": mapping,
+    })
+
 
 def fix_scheduled_status(entries: list[dict], logger: WideLogger) -> int:
     """
@@ -64,11 +144,11 @@ def fix_scheduled_status(entries: list[dict], logger: WideLogger) -> int:
     return corrections
 
 
-async def main():
+async def main(navegador: Navegador | None = None):
     logger = WideLogger("ScrapeCarService")
     logger.info("Starting CAR extraction...")
 
-    navegador = Navegador()
+    navegador = navegador or Navegador(perfil_bloqueio="extranet")
     browser_active = False
     success = False
 
@@ -78,60 +158,65 @@ async def main():
         if not user_login or not user_pass:
             raise ValueError("Credentials not found in .env")
 
-        # Setup
-        logger.info("Setting up browser...")
-        page = await navegador.setup_browser()
-        browser_active = True
-
-        calendario = CalendarioCarPage(page, logger)
-
-        # Login & navigate
-        await calendario.login(user_login, user_pass)
-        await calendario.navigate_to_calendar()
-        await calendario.dismiss_popups()
-
         # Determine periods
         periods = CalendarioCarPage.get_extraction_periods()
         logger.info(f"Periods to extract: {periods}")
         logger.add_context("periods", [f"{MESES[m]}/{y}" for m, y in periods])
 
         os.makedirs(EXTRACOES_DIR, exist_ok=True)
-        all_results = []
-
-        for cs_code in CS_CODES:
-            for month, year in periods:
-                label = f"CS={cs_code} | {MESES[month]}/{year}"
-                logger.info(f"─── Extracting {label} ───")
-
-                try:
-                    await calendario.select_filters(cs_code, month, year)
-
-                    loaded = await calendario.click_buscar()
-                    if not loaded:
-                        logger.error(f"Calendar did not load for {label}")
-                        continue
-
-                    data = await calendario.extract_calendar_data()
-                    data["cs_code"] = cs_code
-                    data["month"] = MESES[month]
-                    data["month_number"] = month
-                    data["year"] = year
-                    data["extraction_date"] = datetime.now().isoformat()
-
-                    all_results.append(data)
-
-                except Exception as e:
-                    logger.error(f"Failed to extract {label}: {e}")
-                    # If browser/page is closed, break out of the entire loop
-                    if "Target page, context or browser has been closed" in str(e):
-                        logger.error("Browser closed unexpectedly. Saving data collected so far.")
-                        break
-                    continue
-            else:
-                # Only executed if inner loop did NOT break
-                continue
-            # Inner loop broke — break outer loop too
-            break
+
+        # Independent CS x period items; PAGE_EXECUTOR_MAX_PAGES > 1 spreads them over tabs
+        items = [(cs_code, month, year) for cs_code in CS_CODES for month, year in periods]
+
+        # Cached session + confirmed recipe: plain HTTP, no Browserless session
+        session = SessaoExtranet(user_login)
+        all_results = await extract_via_http(session, items, logger)
+        logger.add_context("extraction_mode", "http" if all_results is not None else "browser")
+
+        if all_results is None:
+            # Setup
+            logger.info("Setting up browser...")
+            page = await navegador.setup_browser()
+            browser_active = True
+
+            calendario = CalendarioCarPage(page, logger)
+
+            # Login (navigation happens per tab in open_calendar)
+            await calendario.login(user_login, user_pass)
+
+            captured = []
+
+            async def open_calendar(tab):
+                car = CalendarioCarPage(tab, logger)
+                await car.navigate_to_calendar()
+                await car.dismiss_popups()
+                return car
+
+            async def extract(car: CalendarioCarPage, item: tuple) -> dict:
+                cs_code, month, year = item
+                logger.info(f"─── Extracting CS={cs_code} | {MESES[month]}/{year} ───")
+                await car.select_filters(cs_code, month, year)
+
+                if not await car.click_buscar():
+                    raise RuntimeError("Calendar did not load")
+
+                data = await car.extract_calendar_data()
+                response = car.last_api_response
+                if response:
+                    call = {"metodo": response.metodo, "url": response.url, "corpo": response.corpo_requisicao}
+                    captured.append((call_params(cs_code, month, year), call, response.autorizacao))
+                return tag_entry(data, cs_code, month, year)
+
+            executor = PageExecutor(navegador.context, setup=open_calendar, first_page=page)
+            results = await executor.run(items, extract)
+
+            all_results = [r.value for r in results if r.ok]
+            for r in results:
+                if not r.ok:
+                    cs_code, month, year = r.item
+                    logger.error(f"Failed to extract CS={cs_code} | {MESES[month]}/{year}: {r.error}")
+            logger.add_context("page_executor", executor.stats)
+            save_calendar_recipe(session, captured, navegador.context, logger)
 
         # Clean financial data: add numeric fields
         for entry in all_results:
@@ -168,6 +253,13 @@ async def main():
 
     finally:
         if browser_active:
+            logger.add_context("resource_blocking", navegador.resumo_bloqueio())
+            logger.add_context("captured_responses", navegador.resumo_captura())
+            if navegador.page:
+                logger.add_context("waits", Espera.da_pagina(navegador.page).resumo())
+                metrics = MetricasAcoes.do_contexto(navegador.context)
+                logger.add_context("actions", metrics.resumo())
+                metrics.salvar()
             logger.info("Closing browser...")
             await navegador.stop_browser()
         logger.finish(success=success)
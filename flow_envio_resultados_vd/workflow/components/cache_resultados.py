@@ -0,0 +1,111 @@
+"""
+Cache dos resultados do Ranking Vendas para ciclos encerrados.
+
+Depois que um ciclo fecha, a consulta (tipo, ciclo, estrutura, periodo)
+nao muda mais: o resultado guardado e servido sem abrir o SGI. O periodo
+da chave e exatamente o filtro de datas enviado ao SGI ("hoje-hoje"), entao
+cada dia tem a sua entrada e uma reexecucao no mesmo dia sai do cache.
+Ciclos abertos sempre sao extraidos do SGI e nao sao guardados.
+
+    cache = CacheResultados()
+    linhas = cache.obter("VD", "202602", None, "17/10/2026-17/10/2026")
+    if linhas is None:
+        linhas = await ranking_page.extrair_tabela()
+        cache.gravar("VD", "202602", None, "17/10/2026-17/10/2026", linhas,
+                     vazio_confirmado=ranking_page.motivo_vazio == "popup_nenhum_registro")
+
+Resultado vazio so e guardado quando o SGI confirmou "nenhum registro"
+(vazio por falha de extracao e extraido de novo). O fim de cada ciclo vem
+de VD_CICLOS_FIM; ciclo sem data de fim conta como aberto.
+
+Variaveis de ambiente:
+  - VD_CICLOS_FIM:  JSON ciclo -> ultimo dia do ciclo, ex: {"202602": "2026-02-20"}.
+  - VD_CACHE_DIR:   diretorio do cache (padrao: <fluxo>/cache).
+                    No Kestra, apontar para um volume persistente.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(__file__), "..", "..", "cache")
+ARQUIVO_CACHE = "resultados_vd.json"
+
+# Entradas mais antigas que isso sao descartadas ao salvar
+DIAS_RETENCAO = 35
+
+
+def carregar_fim_ciclos() -> dict:
+    """Ciclo -> date do ultimo dia, a partir de VD_CICLOS_FIM (vazio se ausente/invalido)."""
+    try:
+        bruto = json.loads(os.environ.get("VD_CICLOS_FIM", "{}"))
+        return {str(ciclo): date.fromisoformat(fim) for ciclo, fim in bruto.items()}
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"Erro ao parsear VD_CICLOS_FIM: {e}. Todos os ciclos contam como abertos.")
+        return {}
+
+
+class CacheResultados:
+    """Resultados por (tipo, ciclo, estrutura, filtro de datas), servidos so para ciclos encerrados."""
+
+    def __init__(self, diretorio: str = None, fim_ciclos: dict = None):
+        diretorio = diretorio or os.environ.get("VD_CACHE_DIR", DIRETORIO_PADRAO)
+        self.caminho = os.path.join(diretorio, ARQUIVO_CACHE)
+        self.fim_ciclos = carregar_fim_ciclos() if fim_ciclos is None else fim_ciclos
+        self.entradas = {}
+        if os.path.exists(self.caminho):
+            try:
+                with open(self.caminho, "r", encoding="utf-8") as f:
+                    self.entradas = json.load(f)
+            except Exception as e:
+                logger.warning(f"Cache de resultados ilegivel, ignorando: {e}")
+
+    @staticmethod
+    def chave(tipo: str, ciclo: str, estrutura: str, filtro_datas: str) -> str:
+        """Chave com o periodo "dd/mm/aaaa-dd/mm/aaaa" tal como foi enviado ao SGI."""
+        return f"{tipo}|{ciclo}|{estrutura or ''}|{filtro_datas}"
+
+    def encerrado(self, ciclo: str, hoje: date = None) -> bool:
+        """O ciclo ja passou do ultimo dia?"""
+        fim = self.fim_ciclos.get(str(ciclo))
+        return bool(fim and (hoje or date.today()) > fim)
+
+    def obter(self, tipo: str, ciclo: str, estrutura: str, filtro_datas: str):
+        """Linhas guardadas se o ciclo estiver encerrado; None para extrair do SGI."""
+        if not self.encerrado(ciclo):
+            return None
+        entrada = self.entradas.get(self.chave(tipo, ciclo, estrutura, filtro_datas))
+        if entrada is None:
+            return None
+        logger.info(f"[{tipo} {ciclo}] Ciclo encerrado: resultado servido do cache ({entrada['extraido_em']}).")
+        return entrada["linhas"]
+
+    def gravar(self, tipo: str, ciclo: str, estrutura: str, filtro_datas: str, linhas: list,
+               vazio_confirmado: bool = False):
+        """
+        Guarda o resultado de um ciclo encerrado. Vazio so com vazio_confirmado
+        (popup "nenhum registro"); sem isso pode ter sido falha de extracao.
+        """
+        if not self.encerrado(ciclo) or (not linhas and not vazio_confirmado):
+            return
+        self.entradas[self.chave(tipo, ciclo, estrutura, filtro_datas)] = {
+            "linhas": linhas,
+            "extraido_em": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+
+    def salvar(self):
+        """Grava o cache (escrita atomica), descartando entradas antigas."""
+        limite = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - DIAS_RETENCAO * 86400))
+        self.entradas = {k: v for k, v in self.entradas.items() if v["extraido_em"] >= limite}
+        try:
+            os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+            temporario = f"{self.caminho}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(self.entradas, f, ensure_ascii=False, indent=2)
+            os.replace(temporario, self.caminho)
+        except Exception as e:
+            logger.warning(f"Nao foi possivel salvar o cache de resultados: {e}")
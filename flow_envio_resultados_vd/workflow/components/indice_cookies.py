@@ -0,0 +1,145 @@
+"""
+Indice de validade dos cookies criticos de autenticacao do state.json.
+
+O state.json tem dezenas de cookies, mas a sessao depende de poucos: o
+ticket do SGI (sgi.b1.ASPXAUTH), a sessao ASP.NET, o SSO do Azure B2C e os
+cookies de sessao do Google. O indice guarda o vencimento de cada um (e o
+menor deles), para decidir em milissegundos se a sessao ainda tem vida:
+
+    indice = IndiceCookies()
+    if not indice.precisa_renovar():
+        ...                       # renovar_auth.py encerra sem abrir navegador
+    indice.sessao_valida()        # loja.py: vale tentar a sessao restaurada?
+    indice.registrar_autenticacao()   # so depois de um login/renovacao confirmado
+
+Cookies de sessao (expires = -1) nao trazem vencimento: contam como
+vencendo VD_SESSAO_TTL_H horas depois da ultima autenticacao registrada.
+Sem autenticacao registrada, contam como vencidos. O mtime do state.json
+nao serve de referencia: ele tambem muda quando um run salva uma sessao morta.
+
+Variaveis de ambiente:
+  - VD_SESSAO_TTL_H:        vida estimada dos cookies de sessao (padrao: 8).
+  - VD_RENOVAR_MARGEM_H:    renova quando faltar menos que isso (padrao: 2).
+  - VD_RENOVAR_FORCAR:      "1" faz o renovar_auth.py renovar mesmo com vida sobrando.
+"""
+
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+CAMINHO_STATE = os.path.join(os.path.dirname(__file__), "..", "..", "state.json")
+ARQUIVO_INDICE = "state_indice.json"
+
+# (dominio terminado em, nome ou prefixo terminado em "*")
+COOKIES_CRITICOS = [
+    ("sgi.e-boticario.com.br", "sgi.b1.ASPXAUTH"),
+    ("sgi.e-boticario.com.br", "ASP.NET_SessionId"),
+    ("login-vdmais.grupoboticario.com.br", "x-ms-cpim-sso:*"),
+    (".google.com", "SID"),
+    (".google.com", "__Secure-1PSID"),
+    (".google.com", "__Secure-1PSIDTS"),
+]
+
+
+def _critico(cookie: dict):
+    """Rotulo "dominio nome" se o cookie for critico, senao None."""
+    dominio = cookie.get("domain", "")
+    nome = cookie.get("name", "")
+    for sufixo, padrao in COOKIES_CRITICOS:
+        if not dominio.endswith(sufixo):
+            continue
+        if nome == padrao or (padrao.endswith("*") and nome.startswith(padrao[:-1])):
+            return f"{sufixo} {padrao}"
+    return None
+
+
+class IndiceCookies:
+    """Vencimento dos cookies criticos do state.json, reconstruido so quando o state muda."""
+
+    def __init__(self, caminho_state: str = CAMINHO_STATE):
+        self.caminho_state = caminho_state
+        self.caminho = os.path.join(os.path.dirname(caminho_state), ARQUIVO_INDICE)
+        self.ttl_sessao_s = float(os.environ.get("VD_SESSAO_TTL_H", "8")) * 3600
+        self.margem_s = float(os.environ.get("VD_RENOVAR_MARGEM_H", "2")) * 3600
+        self.dados = self._carregar()
+
+    def _carregar(self) -> dict:
+        """Indice gravado, se ainda corresponder ao state.json atual; senao reconstroi."""
+        if not os.path.exists(self.caminho_state):
+            return {"cookies": {}, "expira_em": 0}
+        salvo_em = os.path.getmtime(self.caminho_state)
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            if dados.get("salvo_em") == salvo_em:
+                return dados
+            autenticado_em = dados.get("autenticado_em")
+        except (OSError, ValueError):
+            autenticado_em = None
+        return self.atualizar(autenticado_em)
+
+    def registrar_autenticacao(self) -> dict:
+        """Marca agora como o momento da ultima autenticacao confirmada (chamar apos salvar o state)."""
+        return self.atualizar(time.time())
+
+    def atualizar(self, autenticado_em: float = None) -> dict:
+        """Reconstroi o indice a partir do state.json, com a autenticacao registrada (ou nenhuma)."""
+        try:
+            salvo_em = os.path.getmtime(self.caminho_state)
+            with open(self.caminho_state, "r", encoding="utf-8") as f:
+                cookies = json.load(f).get("cookies", [])
+        except (OSError, ValueError) as e:
+            logger.warning(f"Nao foi possivel ler o state.json para o indice de cookies: {e}")
+            self.dados = {"cookies": {}, "expira_em": 0}
+            return self.dados
+
+        # Cookies de sessao vivem a partir da autenticacao; sem ela, ja vencidos
+        vida_sessao = autenticado_em + self.ttl_sessao_s if autenticado_em else 0
+
+        vencimentos = {}
+        for cookie in cookies:
+            rotulo = _critico(cookie)
+            if not rotulo:
+                continue
+            expires = cookie.get("expires", -1)
+            expira_em = expires if expires and expires > 0 else vida_sessao
+            # Mais de um cookie por rotulo (ex.: dois SSO do B2C): vale o que dura mais
+            vencimentos[rotulo] = max(vencimentos.get(rotulo, 0), expira_em)
+
+        faltando = [f"{s} {p}" for s, p in COOKIES_CRITICOS if f"{s} {p}" not in vencimentos]
+        self.dados = {
+            "salvo_em": salvo_em,
+            "autenticado_em": autenticado_em,
+            "cookies": vencimentos,
+            "faltando": faltando,
+            # Cookie critico ausente: sessao sem vida
+            "expira_em": 0 if faltando else min(vencimentos.values()),
+        }
+        try:
+            temporario = f"{self.caminho}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(self.dados, f, ensure_ascii=False, indent=2)
+            os.replace(temporario, self.caminho)
+        except OSError as e:
+            logger.warning(f"Nao foi possivel gravar o indice de cookies: {e}")
+        return self.dados
+
+    def vida_restante_s(self) -> float:
+        """Segundos ate o primeiro cookie critico vencer (negativo se ja venceu)."""
+        return self.dados.get("expira_em", 0) - time.time()
+
+    def sessao_valida(self) -> bool:
+        return self.vida_restante_s() > 0
+
+    def precisa_renovar(self) -> bool:
+        return self.vida_restante_s() < self.margem_s
+
+    def resumo(self) -> dict:
+        return {
+            "vida_restante_h": round(self.vida_restante_s() / 3600, 2),
+            "margem_h": round(self.margem_s / 3600, 2),
+            "faltando": self.dados.get("faltando", []),
+        }
@@ -0,0 +1,165 @@
+"""
+Latencia por acao do Playwright e por seletor, com histogramas.
+
+Page objects envolvem cada acao (clicar, preencher, aguardar, navegar...) em
+um bloco medido; o par (acao, seletor) acumula contagem, tempo total/maximo,
+timeouts, erros, retentativas e um histograma em faixas fixas de ms:
+
+    metricas = MetricasAcoes.do_contexto(page.context)
+    async with metricas.medir("clicar", "#next"):
+        await page.click("#next")
+
+A excecao da acao e contabilizada e relancada sem alteracao. resumo() vai
+para o wide event, ordenado pelo tempo total (o que mais custa primeiro), e
+salvar() soma a execucao ao acumulado do fluxo para comparar entre execucoes.
+
+Variaveis de ambiente:
+  - METRICAS_ACOES_DIR: diretorio do acumulado (padrao: <fluxo>/metricas).
+                        No Kestra, apontar para um volume persistente.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import weakref
+from contextlib import asynccontextmanager
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(__file__), "..", "..", "metricas")
+ARQUIVO_ACUMULADO = "acoes.json"
+
+# Limites superiores das faixas do histograma (ms); a ultima faixa e "acima de"
+FAIXAS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+ROTULOS_FAIXAS = [f"<={f}" for f in FAIXAS_MS] + [f">{FAIXAS_MS[-1]}"]
+
+# Acoes mais caras listadas no wide event
+LIMITE_RESUMO = 25
+
+
+def _nova_estatistica() -> dict:
+    return {
+        "n": 0, "total_ms": 0, "max_ms": 0, "timeouts": 0, "erros": 0, "retentativas": 0,
+        "histograma": dict.fromkeys(ROTULOS_FAIXAS, 0),
+    }
+
+
+def _faixa(ms: int) -> str:
+    for limite, rotulo in zip(FAIXAS_MS, ROTULOS_FAIXAS):
+        if ms <= limite:
+            return rotulo
+    return ROTULOS_FAIXAS[-1]
+
+
+class MetricasAcoes:
+    """Latencias das acoes de um contexto (todas as abas somam no mesmo resumo)."""
+
+    _por_contexto = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def do_contexto(cls, context) -> "MetricasAcoes":
+        if context not in cls._por_contexto:
+            cls._por_contexto[context] = cls()
+        return cls._por_contexto[context]
+
+    @classmethod
+    def descartar(cls, context):
+        """Esquece as metricas do contexto (necessario quando o contexto e reaproveitado)."""
+        cls._por_contexto.pop(context, None)
+
+    def __init__(self):
+        self.estatisticas = {}
+        self._amostras = {}
+
+    def _estatistica(self, acao: str, seletor: str) -> tuple:
+        chave = f"{acao} {seletor}" if seletor else acao
+        if chave not in self.estatisticas:
+            self.estatisticas[chave] = _nova_estatistica()
+            self._amostras[chave] = []
+        return chave, self.estatisticas[chave]
+
+    @asynccontextmanager
+    async def medir(self, acao: str, seletor: str = ""):
+        """Mede o bloco; timeouts e erros sao contados e a excecao segue adiante."""
+        chave, estatistica = self._estatistica(acao, seletor)
+        inicio = time.monotonic()
+        try:
+            yield
+        except (PlaywrightTimeoutError, asyncio.TimeoutError):
+            estatistica["timeouts"] += 1
+            raise
+        except Exception:
+            estatistica["erros"] += 1
+            raise
+        finally:
+            decorrido_ms = int((time.monotonic() - inicio) * 1000)
+            estatistica["n"] += 1
+            estatistica["total_ms"] += decorrido_ms
+            estatistica["max_ms"] = max(estatistica["max_ms"], decorrido_ms)
+            estatistica["histograma"][_faixa(decorrido_ms)] += 1
+            self._amostras[chave].append(decorrido_ms)
+
+    def retentativa(self, acao: str, seletor: str = ""):
+        """Conta uma nova tentativa da acao (loops de retry dos page objects)."""
+        self._estatistica(acao, seletor)[1]["retentativas"] += 1
+
+    # ── Saida ─────────────────────────────────────────────────────────
+
+    def resumo(self, limite: int = LIMITE_RESUMO) -> dict:
+        """Acoes desta execucao, da mais cara para a mais barata, para o wide event."""
+        acoes = {}
+        ordenadas = sorted(self.estatisticas.items(), key=lambda kv: -kv[1]["total_ms"])
+        for chave, e in ordenadas[:limite]:
+            amostras = sorted(self._amostras[chave])
+            acoes[chave] = {
+                "n": e["n"],
+                "total_ms": e["total_ms"],
+                "medio_ms": e["total_ms"] // e["n"] if e["n"] else 0,
+                "p95_ms": amostras[int(0.95 * (len(amostras) - 1))] if amostras else 0,
+                "max_ms": e["max_ms"],
+                "timeouts": e["timeouts"],
+                "erros": e["erros"],
+                "retentativas": e["retentativas"],
+                "histograma": {k: v for k, v in e["histograma"].items() if v},
+            }
+        return {
+            "acoes_medidas": sum(e["n"] for e in self.estatisticas.values()),
+            "tempo_total_ms": sum(e["total_ms"] for e in self.estatisticas.values()),
+            "timeouts": sum(e["timeouts"] for e in self.estatisticas.values()),
+            "acoes": acoes,
+        }
+
+    def salvar(self, diretorio: str = None):
+        """Soma esta execucao ao acumulado do fluxo (histogramas entre execucoes)."""
+        if not self.estatisticas:
+            return
+        diretorio = diretorio or os.environ.get("METRICAS_ACOES_DIR", DIRETORIO_PADRAO)
+        caminho = os.path.join(diretorio, ARQUIVO_ACUMULADO)
+        try:
+            acumulado = {"execucoes": 0, "acoes": {}}
+            if os.path.exists(caminho):
+                with open(caminho, "r", encoding="utf-8") as f:
+                    acumulado = json.load(f)
+
+            for chave, e in self.estatisticas.items():
+                destino = acumulado["acoes"].setdefault(chave, _nova_estatistica())
+                for campo in ("n", "total_ms", "timeouts", "erros", "retentativas"):
+                    destino[campo] += e[campo]
+                destino["max_ms"] = max(destino["max_ms"], e["max_ms"])
+                for rotulo, quantidade in e["histograma"].items():
+                    destino["histograma"][rotulo] = destino["histograma"].get(rotulo, 0) + quantidade
+
+            acumulado["execucoes"] += 1
+            acumulado["atualizado_em"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+            os.makedirs(diretorio, exist_ok=True)
+            temporario = f"{caminho}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(acumulado, f, ensure_ascii=False, indent=2)
+            os.replace(temporario, caminho)
+        except Exception as e:
+            logger.warning(f"Nao foi possivel salvar as metricas de acoes: {e}")
@@ -18,42 +18,58 @@ import logging
 import os
 from urllib.parse import quote
 
+from workflow.components.bloqueio_recursos import BloqueadorRecursos, resolver_perfil
+from workflow.components.gravacao_har import GravacaoHar, modo_har
+
 logger = logging.getLogger(__name__)
 
 
 class Navegador:
-    def __init__(self):
+    def __init__(self, perfil_bloqueio: str = None):
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
+        self.perfil_bloqueio = resolver_perfil(perfil_bloqueio)
+        self.bloqueador = None
+        self.har = GravacaoHar(modo_har()) if modo_har() else None
 
     async def setup_browser(self):
         """
         Conecta ao Browserless via CDP com stealth e headless=false.
         Usa o contexto default do Browserless (para manter stealth).
         Carrega cookies do state.json manualmente se existir.
+        Com NAVEGADOR_HAR=reproduzir, usa Chromium local headless servindo o HAR (offline).
         """
-        logger.info("Iniciando browser via Browserless (stealth=ON, headless=OFF)...")
         self.playwright = await async_playwright().start()
 
-        # Monta URL CDP do Browserless
-        cdp_url = self._build_cdp_url()
-
-        # Conecta ao Browserless
-        self.browser = await self.playwright.chromium.connect_over_cdp(cdp_url)
-
-        # IMPORTANTE: Usar o contexto default do Browserless para manter stealth!
-        # Criar new_context() perde as flags anti-deteccao e o Google bloqueia.
-        if self.browser.contexts:
-            self.context = self.browser.contexts[0]
-            logger.info("Usando contexto default do Browserless (stealth preservado).")
+        if self.har and self.har.reproduzindo:
+            self.browser, self.context = await self.har.abrir_navegador_reproducao(self.playwright)
         else:
-            self.context = await self.browser.new_context(
-                viewport={"width": 1366, "height": 768},
-                locale="pt-BR",
-            )
-            logger.info("Novo contexto criado (Browserless sem contexto default).")
+            logger.info("Iniciando browser via Browserless (stealth=ON, headless=OFF)...")
+            # Conecta ao Browserless
+            self.browser = await self.playwright.chromium.connect_over_cdp(self._build_cdp_url())
+
+            # IMPORTANTE: Usar o contexto default do Browserless para manter stealth!
+            # Criar new_context() perde as flags anti-deteccao e o Google bloqueia.
+            if self.browser.contexts:
+                self.context = self.browser.contexts[0]
+                logger.info("Usando contexto default do Browserless (stealth preservado).")
+            else:
+                self.context = await self.browser.new_context(
+                    viewport={"width": 1366, "height": 768},
+                    locale="pt-BR",
+                )
+                logger.info("Novo contexto criado (Browserless sem contexto default).")
+
+        # Gravacao/reproducao de HAR (antes do bloqueio, para o bloqueio decidir primeiro)
+        if self.har:
+            await self.har.instalar(self.context)
+
+        # Bloqueio de recursos pesados (imagens, fontes, analytics) conforme o perfil do portal
+        if self.perfil_bloqueio:
+            self.bloqueador = BloqueadorRecursos(self.perfil_bloqueio)
+            await self.bloqueador.instalar(self.context)
 
         # Carrega cookies do state.json manualmente no contexto default
         script_dir = os.path.dirname(__file__)
@@ -127,9 +143,15 @@ class Navegador:
         except Exception as e:
             logger.error(f"Erro ao salvar estado da sessao: {e}")
 
+    def resumo_bloqueio(self) -> dict:
+        """Economia do bloqueio de recursos para o wide event (vazio se desativado)."""
+        return self.bloqueador.resumo() if self.bloqueador else {}
+
     async def stop_browser(self):
         """Fecha o browser e limpa os recursos."""
         try:
+            if self.har:
+                await self.har.finalizar(self.context)
             if self.browser:
                 await self.browser.close()
             if self.playwright:
@@ -2,6 +2,8 @@
 import logging
 from playwright.async_api import Page, Response
 
+from workflow.components.metricas_acoes import MetricasAcoes
+
 logger = logging.getLogger(__name__)
 
 class BasePage:
@@ -12,19 +14,22 @@ class BasePage:
 
     def __init__(self, page: Page):
         self.page = page
+        self.metricas = MetricasAcoes.do_contexto(page.context)
 
     async def navegar(self, url: str):
         """Navega para uma URL específica."""
         logger.info(f"Navegando para: {url}")
-        response = await self.page.goto(url, wait_until="domcontentloaded")
+        async with self.metricas.medir("navegar", url.split("?")[0]):
+            response = await self.page.goto(url, wait_until="domcontentloaded")
         return response
 
     async def extrair_texto(self, seletor: str, timeout: int = 5000) -> str:
         """Espera um elemento e retorna seu texto."""
         try:
-            elemento = self.page.locator(seletor).first
-            await elemento.wait_for(state="visible", timeout=timeout)
-            return await elemento.inner_text()
+            async with self.metricas.medir("extrair_texto", seletor):
+                elemento = self.page.locator(seletor).first
+                await elemento.wait_for(state="visible", timeout=timeout)
+                return await elemento.inner_text()
         except Exception as e:
             logger.warning(f"Erro ao extrair texto de {seletor}: {e}")
             return ""
@@ -32,9 +37,10 @@ class BasePage:
     async def clicar(self, seletor: str, timeout: int = 5000):
         """Clica em um elemento."""
         try:
-            elemento = self.page.locator(seletor).first
-            await elemento.wait_for(state="visible", timeout=timeout)
-            await elemento.click()
+            async with self.metricas.medir("clicar", seletor):
+                elemento = self.page.locator(seletor).first
+                await elemento.wait_for(state="visible", timeout=timeout)
+                await elemento.click()
         except Exception as e:
             logger.error(f"Erro ao clicar em {seletor}: {e}")
             raise e
@@ -42,9 +48,10 @@ class BasePage:
     async def preencher(self, seletor: str, valor: str, timeout: int = 5000):
         """Preenche um campo de input."""
         try:
-            elemento = self.page.locator(seletor).first
-            await elemento.wait_for(state="visible", timeout=timeout)
-            await elemento.fill(valor)
+            async with self.metricas.medir("preencher", seletor):
+                elemento = self.page.locator(seletor).first
+                await elemento.wait_for(state="visible", timeout=timeout)
+                await elemento.fill(valor)
         except Exception as e:
             logger.error(f"Erro ao preencher {seletor}: {e}")
             raise e
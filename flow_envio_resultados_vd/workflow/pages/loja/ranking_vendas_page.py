@@ -1,14 +1,101 @@
+import asyncio
 import logging
 import datetime
+import os
+import weakref
 from workflow.pages.base_page import BasePage
 
 logger = logging.getLogger(__name__)
 
+# Colunas da grade de resultados (na ordem exibida)
+COLUNAS_RANKING = ["Gerencia", "Qtd Itens", "Qtd Revendedor", "Faturamento", "Valor Praticado", "Valor Venda"]
+
+# Linhas da grade como [gerência, 5 números] (pt-BR -> float; null se não converter).
+# Células td.grid_celula em grupos de 6; sem elas, as linhas com >= 5 td.
+JS_LINHAS_RANKING = """(tabela) => {
+    const numero = (texto) => {
+        const limpo = texto.replace(/[^\\d,.-]/g, '').replace(/\\./g, '').replace(',', '.');
+        const valor = parseFloat(limpo);
+        return Number.isNaN(valor) ? null : valor;
+    };
+    let linhas = [];
+    const celulas = Array.from(tabela.querySelectorAll('[class="grid_celula"]'));
+    if (celulas.length) {
+        for (let i = 0; i + 6 <= celulas.length; i += 6) {
+            linhas.push(celulas.slice(i, i + 6).map(c => c.innerText.trim()));
+        }
+    } else {
+        linhas = Array.from(tabela.querySelectorAll('tr'))
+            .map(tr => Array.from(tr.querySelectorAll('td')).map(td => td.innerText.trim()))
+            .filter(tds => tds.length >= 5);
+    }
+    return linhas.map(tds => [tds[0], ...[1, 2, 3, 4, 5].map(i => numero(tds[i] || ''))]);
+}"""
+
+# Campo que só existe no formulário do Ranking Vendas (confirma a rota direta)
+SELETOR_FORMULARIO = "#ContentPlaceHolder1_ddlCicloFaturamentoInicial_d1"
+
+
+class _RotaRanking:
+    """URL da página de Ranking Vendas aprendida no contexto (uma caminhada pelos menus por sessão)."""
+
+    def __init__(self):
+        self.url = os.environ.get("VD_URL_RANKING_VENDAS") or None
+        self.trava = asyncio.Lock()
+
+
 class RankingVendasPage(BasePage):
+
+    # Rota por contexto: abas paralelas do mesmo contexto compartilham a URL aprendida
+    _rotas = weakref.WeakKeyDictionary()
     
     # Método obter_ano_ciclo removido pois não estava sendo utilizado.
 
     async def navegar_para_ranking_vendas(self):
+        """
+        Abre o formulário de Ranking Vendas limpo. Pelos menus só na primeira
+        vez do contexto; depois, GET direto no .aspx aprendido (que também
+        zera os filtros da consulta anterior). Se a rota direta falhar, volta
+        para os menus.
+        """
+        rota = self._rotas.setdefault(self.page.context, _RotaRanking())
+
+        if not rota.url:
+            async with rota.trava:
+                # Outra aba pode ter aprendido a URL enquanto esta esperava
+                if not rota.url:
+                    url_antes = self.page.url
+                    await self._navegar_pelos_menus()
+                    if self.page.url != url_antes:
+                        rota.url = self.page.url
+                        logger.info(f"Rota direta do Ranking Vendas aprendida: {rota.url}")
+                    return
+
+        if await self._navegar_direto(rota.url):
+            return
+        logger.warning("Rota direta do Ranking Vendas falhou; navegando pelos menus.")
+        await self._navegar_pelos_menus()
+
+    @classmethod
+    def rota_aprendida(cls, context):
+        """URL direta do Ranking Vendas já conhecida no contexto (ou None)."""
+        rota = cls._rotas.get(context)
+        return rota.url if rota else os.environ.get("VD_URL_RANKING_VENDAS") or None
+
+    async def _navegar_direto(self, url: str) -> bool:
+        """GET na página de Ranking Vendas; True se o formulário carregou."""
+        logger.info("Abrindo Ranking Vendas pela rota direta...")
+        try:
+            await self.navegar(url)
+            await self.aguardar_loader_flexivel()
+            async with self.metricas.medir("aguardar", SELETOR_FORMULARIO):
+                await self.page.locator(SELETOR_FORMULARIO).wait_for(state="visible", timeout=10000)
+            return True
+        except Exception as e:
+            logger.info(f"Formulário não carregou pela rota direta: {e}")
+            return False
+
+    async def _navegar_pelos_menus(self):
         """Navega pelo menu até a página de Ranking de Vendas."""
         logger.info("Navegando para Ranking Vendas...")
         
@@ -27,6 +114,12 @@ class RankingVendasPage(BasePage):
         # Aguarda carregamento inicial da pagina (pode haver loader)
         await self.aguardar_loader_flexivel()
 
+    @staticmethod
+    def filtro_datas_faturamento() -> str:
+        """Período que selecionar_datas_faturamento aplica (início-fim), para chavear resultados."""
+        hoje = datetime.date.today().strftime("%d/%m/%Y")
+        return f"{hoje}-{hoje}"
+
     async def selecionar_datas_faturamento(self):
         """Seleciona data inicial e final como 'Hoje'."""
         logger.info("Selecionando datas de faturamento...")
@@ -90,26 +183,33 @@ class RankingVendasPage(BasePage):
             
             # Aguarda até que o loader tenha display:none ou aria-hidden=true
             # Usamos uma função de espera customizada
-            await self.page.wait_for_function(
-                """() => {
-                    const loader = document.querySelector('#UpdateProgress1');
-                    if (!loader) return true; // Se não existe, prossegue
-                    const style = window.getComputedStyle(loader);
-                    return style.display === 'none' || loader.getAttribute('aria-hidden') === 'true';
-                }""",
-                timeout=timeout
-            )
+            async with self.metricas.medir("aguardar_loader", "#UpdateProgress1"):
+                await self.page.wait_for_function(
+                    """() => {
+                        const loader = document.querySelector('#UpdateProgress1');
+                        if (!loader) return true; // Se não existe, prossegue
+                        const style = window.getComputedStyle(loader);
+                        return style.display === 'none' || loader.getAttribute('aria-hidden') === 'true';
+                    }""",
+                    timeout=timeout
+                )
             logger.info("Carregamento concluído!")
             
         except Exception as e:
             logger.warning(f"Timeout ou erro ao aguardar loader: {e}. Prosseguindo...")
 
-    async def extrair_tabela(self):
-        """Extrai dados da tabela de Ranking de Vendas."""
+    async def extrair_tabela(self, identificacao: str = None):
+        """
+        Extrai dados da tabela de Ranking de Vendas: uma linha por gerência,
+        com as colunas de COLUNAS_RANKING (valores numéricos já em float).
+        `identificacao` (ex.: "VD_202602") entra no nome dos arquivos de debug,
+        para abas paralelas não sobrescreverem umas às outras.
+        """
         logger.info("Iniciando extração da tabela...")
         
         resultados = []
         motivo_vazio = None  # Para rastrear por que retornou vazio
+        self.motivo_vazio = None
         
         try:
             # Aguarda um momento para garantir estabilidade da página após busca
@@ -154,130 +254,51 @@ class RankingVendasPage(BasePage):
             logger.info("Aguardando tabela de resultados...")
             tabela = self.page.locator("#ContentPlaceHolder1_grdRankingVendas")
             try:
-                await tabela.wait_for(state="visible", timeout=10000)
+                async with self.metricas.medir("aguardar", "#ContentPlaceHolder1_grdRankingVendas"):
+                    await tabela.wait_for(state="visible", timeout=10000)
                 logger.info("[DEBUG] Tabela encontrada e visível!")
             except Exception as e_tabela:
                 logger.warning(f"Tabela não apareceu no timeout: {e_tabela}")
                 motivo_vazio = "tabela_nao_apareceu"
                 # Salva debug
-                await self._salvar_debug_extracao("tabela_timeout")
+                await self._salvar_debug_extracao("tabela_timeout", identificacao)
                 return []
             
-            # DEBUG: Pega o HTML da tabela para análise
-            try:
-                tabela_html = await tabela.inner_html()
-                logger.info(f"[DEBUG] HTML da tabela (primeiros 1000 chars): {tabela_html[:1000]}...")
-            except Exception as e_html:
-                logger.warning(f"[DEBUG] Não foi possível obter HTML da tabela: {e_html}")
-            
-            # NOVA ABORDAGEM: Busca diretamente as células com classe grid_celula
-            # e agrupa por linhas (cada linha de dados tem 6 células)
-            logger.info("[DEBUG] Usando abordagem direta: buscando todas as células td.grid_celula...")
-            
-            todas_celulas = await tabela.locator('[class="grid_celula"]').all()
-            logger.info(f"[DEBUG] Total de células grid_celula encontradas: {len(todas_celulas)}")
-            
-            # Se encontrou células, processa em grupos de 6 (uma linha tem 6 colunas)
-            if todas_celulas:
-                colunas_por_linha = 6  # Gerência, Qtd Itens, Qtd Revendedor, Faturamento, Valor Praticado, Valor Venda
-                
-                for i in range(0, len(todas_celulas), colunas_por_linha):
-                    if i + colunas_por_linha <= len(todas_celulas):
-                        # Pega as 6 células desta linha
-                        celulas_linha = todas_celulas[i:i + colunas_por_linha]
-                        
-                        gerencia = await celulas_linha[0].inner_text()
-                        valor_praticado = await celulas_linha[4].inner_text()  # Índice 4 = Valor Praticado
-                        
-                        gerencia = gerencia.strip()
-                        valor_praticado = valor_praticado.strip()
-                        
-                        logger.info(f"[DEBUG] Linha {i // colunas_por_linha}: Gerencia='{gerencia}', ValorPraticado='{valor_praticado}'")
-                        
-                        # Tratamento numérico (pt-BR para float)
-                        # Ex: 1.234,56 -> 1234.56
-                        valor_limpo = valor_praticado.replace('.', '').replace(',', '.')
-                        
-                        try:
-                            valor_float = float(valor_limpo)
-                        except ValueError:
-                            valor_float = 0.0
-                            logger.warning(f"Falha ao converter valor: {valor_praticado} (Gerencia: {gerencia})")
-                        
-                        resultados.append([gerencia, valor_float])
-            else:
-                # FALLBACK: Tenta a abordagem antiga iterando sobre tr
-                logger.info("[DEBUG] Nenhuma célula td.grid_celula encontrada. Tentando abordagem por linhas (tr)...")
-                
-                linhas = await tabela.locator("tbody > tr").all()
-                logger.info(f"[DEBUG] Total de linhas (tbody > tr): {len(linhas)}")
-                
-                # Se não encontrou com tbody, tenta sem
-                if not linhas:
-                    linhas = await tabela.locator("tr").all()
-                    logger.info(f"[DEBUG] Total de linhas (tr direto): {len(linhas)}")
-                
-                for i, linha in enumerate(linhas):
-                    # DEBUG: Log do HTML de cada linha
-                    try:
-                        linha_html = await linha.inner_html()
-                        logger.info(f"[DEBUG] Linha {i} HTML (primeiros 300 chars): {linha_html[:300]}...")
-                    except:
-                        pass
-                    
-                    # Tenta pegar células genéricas (td)
-                    tds = await linha.locator("td").all()
-                    
-                    if not tds:
-                        # Provavelmente é header (th)
-                        ths = await linha.locator("th").all()
-                        if ths:
-                            logger.info(f"[DEBUG] Linha {i}: Cabeçalho detectado ({len(ths)} ths).")
-                        continue
+            # Uma única chamada: todas as linhas com as 6 colunas já convertidas
+            async with self.metricas.medir("extrair_tabela", "#ContentPlaceHolder1_grdRankingVendas"):
+                linhas = await tabela.evaluate(JS_LINHAS_RANKING)
+            logger.info(f"[DEBUG] Linhas lidas da tabela: {len(linhas)}")
 
-                    if len(tds) >= 5:
-                        gerencia = await tds[0].inner_text()
-                        valor_praticado = await tds[4].inner_text()
-                        
-                        gerencia = gerencia.strip()
-                        valor_praticado = valor_praticado.strip()
-                        
-                        logger.info(f"[DEBUG] Linha {i}: Gerencia='{gerencia}', ValorPraticado='{valor_praticado}'")
-                        
-                        valor_limpo = valor_praticado.replace('.', '').replace(',', '.')
-                        
-                        try:
-                            valor_float = float(valor_limpo)
-                        except ValueError:
-                            valor_float = 0.0
-                            logger.warning(f"Falha ao converter valor: {valor_praticado} (Gerencia: {gerencia})")
-                        
-                        resultados.append([gerencia, valor_float])
-                    else:
-                        logger.warning(f"Linha {i} ignorada: Apenas {len(tds)} colunas encontradas (esperado >= 5).")
+            for gerencia, *valores in linhas:
+                if any(v is None for v in valores):
+                    logger.warning(f"Falha ao converter valores da linha: Gerencia='{gerencia}' {valores}")
+                resultados.append([gerencia] + [v if v is not None else 0.0 for v in valores])
                     
             logger.info(f"Extraídos {len(resultados)} registros.")
             
             # Se extraiu 0 registros mas a tabela existia, salva debug
             if len(resultados) == 0:
                 motivo_vazio = "tabela_sem_dados"
-                await self._salvar_debug_extracao("tabela_vazia")
+                await self._salvar_debug_extracao("tabela_vazia", identificacao)
             
             return resultados
             
         except Exception as e:
             logger.error(f"Erro na extração da tabela: {e}")
-            await self._salvar_debug_extracao("erro_extracao")
+            await self._salvar_debug_extracao("erro_extracao", identificacao)
             return []
         finally:
+            self.motivo_vazio = motivo_vazio
             if motivo_vazio:
                 logger.warning(f"[DEBUG] Extração retornou vazio. Motivo: {motivo_vazio}")
     
-    async def _salvar_debug_extracao(self, prefixo: str):
+    async def _salvar_debug_extracao(self, prefixo: str, identificacao: str = None):
         """Salva screenshot e HTML para debug quando extração falha."""
         try:
             import os
             os.makedirs("extracoes/debug", exist_ok=True)
+            if identificacao:
+                prefixo = f"{prefixo}_{identificacao}"
             
             # Screenshot
             screenshot_path = f"extracoes/debug/{prefixo}_screenshot.png"
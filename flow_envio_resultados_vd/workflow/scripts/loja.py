@@ -12,10 +12,14 @@ load_dotenv()
 # Adiciona o diretório raiz ao path para garantir importações corretas
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
+from workflow.components.cache_resultados import CacheResultados
+from workflow.components.indice_cookies import IndiceCookies
+from workflow.components.metricas_acoes import MetricasAcoes
 from workflow.components.navegador import Navegador
+from workflow.components.page_executor import PageExecutor
 from workflow.pages.base_page import BasePage
 from workflow.pages.loja.login_page import LoginPage
-from workflow.pages.loja.ranking_vendas_page import RankingVendasPage
+from workflow.pages.loja.ranking_vendas_page import COLUNAS_RANKING, RankingVendasPage
 
 # Configuração de Logs
 logging.basicConfig(
@@ -25,66 +29,173 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+async def fechar_modais(page, timeout: int = 5000):
+    """Fecha o modal de onboarding e o painel de aviso importante, se aparecerem."""
+    # --- TRATAMENTO MODAL ONBOARDING ---
+    # Após o login, pode aparecer um modal de "Novidades na VD+" que precisa ser fechado
+    logger.info("Verificando se há modal de onboarding/novidades...")
+    try:
+        botao_fechar_modal = page.locator("#conteudoSemPainel_onboardingModal_BotaoFecharStep1")
+        if await botao_fechar_modal.is_visible(timeout=timeout):
+            logger.info("Modal de onboarding detectado! Fechando...")
+            await botao_fechar_modal.click()
+            await page.wait_for_timeout(1000)  # Aguarda animação de fechamento
+            logger.info("Modal de onboarding fechado com sucesso.")
+    except Exception as e:
+        logger.info(f"Nenhum modal de onboarding detectado (ok, seguindo): {e}")
+
+    # --- TRATAMENTO MODAL AVISO IMPORTANTE (Painel Superior) ---
+    # Após o login, pode aparecer um painel de "Aviso Importante" de segurança que precisa ser fechado
+    logger.info("Verificando se há painel de aviso importante...")
+    try:
+        botao_fechar_aviso = page.locator("#painelSuperior a.btn-close")
+        if await botao_fechar_aviso.is_visible(timeout=timeout):
+            logger.info("Painel de aviso importante detectado! Fechando...")
+            await botao_fechar_aviso.click()
+            await page.wait_for_timeout(1000)  # Aguarda animação de fechamento
+            logger.info("Painel de aviso importante fechado com sucesso.")
+    except Exception as e:
+        logger.info(f"Nenhum painel de aviso importante detectado (ok, seguindo): {e}")
+
+
+def salvar_csv(caminho_csv: str, dados: list):
+    """Grava as linhas extraídas (todas as colunas da grade) no CSV."""
+    os.makedirs(os.path.dirname(caminho_csv), exist_ok=True)
+
+    with open(caminho_csv, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUNAS_RANKING)
+        writer.writerows(dados)
+
+    logger.info(f"Dados salvos em: {caminho_csv}")
+
+
+async def abrir_aba_ranking(page, url_inicial: str) -> RankingVendasPage:
+    """
+    Setup de cada aba do PageExecutor no contexto já autenticado. A aba abre
+    direto na rota aprendida do Ranking Vendas; a home (e a varredura de
+    modais) só entra quando a rota ainda não é conhecida.
+    """
+    ranking_page = RankingVendasPage(page)
+    if not RankingVendasPage.rota_aprendida(page.context):
+        await ranking_page.navegar(url_inicial)
+        await fechar_modais(page, timeout=2000)
+    return ranking_page
+
+
+async def extrair_combinacao(ranking_page: RankingVendasPage, combinacao: tuple, cache: CacheResultados,
+                             filtro_datas: str) -> str:
+    """
+    Extrai uma combinação (ciclo, config VD/EUD) na aba do `ranking_page`,
+    grava o CSV próprio dela e guarda o resultado no cache sob `filtro_datas`,
+    o mesmo período consultado no cache antes da extração. Retorna o caminho
+    do CSV.
+    """
+    ciclo, config = combinacao
+    tipo = config["tipo"]
+    estrutura = config["estrutura"]
+
+    logger.info(f"--- Iniciando extração: {tipo} (Ciclo: {ciclo}) ---")
+    try:
+        # 1. Navegar (GET direto na rota aprendida; garante filtros limpos)
+        await ranking_page.navegar_para_ranking_vendas()
+
+        # 2. Selecionar Datas (Faturamento)
+        await ranking_page.selecionar_datas_faturamento()
+
+        # Preencher estrutura se houver (EUD)
+        if estrutura:
+            await ranking_page.preencher_estrutura(estrutura)
+
+        # 3. Selecionar Ciclos
+        await ranking_page.selecionar_ciclos(ciclo, ciclo)
+
+        # 4. Filtros adicionais (Situação Fiscal, Agrupamento) e Buscar
+        await ranking_page.preencher_filtros_adicionais()
+        await ranking_page.buscar()
+
+        # 5. Extrair e Salvar (com ciclo no nome para evitar sobrescrita)
+        dados = await ranking_page.extrair_tabela(identificacao=f"{tipo}_{ciclo}")
+        cache.gravar(tipo, ciclo, estrutura, filtro_datas, dados,
+                     vazio_confirmado=ranking_page.motivo_vazio == "popup_nenhum_registro")
+        caminho_csv = f"extracoes/resultado_filtros_{tipo}_{ciclo}.csv"
+        salvar_csv(caminho_csv, dados)
+        return caminho_csv
+    except Exception:
+        try:
+            await ranking_page.page.screenshot(path=f"erro_execucao_{tipo}_{ciclo}.png")
+        except Exception:
+            pass
+        raise
+
 async def run():
-    navegador = Navegador()
+    navegador = Navegador(perfil_bloqueio="sgi")
+    # state.json só é salvo com a sessão confirmada; o índice só registra login novo
+    autenticado = False
+    login_realizado = False
     try:
         # Inicializa o browser
         page = await navegador.setup_browser()
-        
+
         # Instancia as páginas
         login_page = LoginPage(page)
-        ranking_page = RankingVendasPage(page)
-        
+
         # Navega para o link solicitado
         url = "https://sgi.e-boticario.com.br/Paginas/Acesso/Entrar.aspx?ReturnUrl=%2f"
         await login_page.navegar(url)
-        
-        # Aguarda um momento para possíveis redirecionamentos automáticos por cookie
-        logger.info("Aguardando redirecionamentos automáticos...")
-        await page.wait_for_timeout(5000)
 
-        # Verifica se já está logado
+        # Verifica se já está logado (só se os cookies críticos ainda tiverem vida)
         estamos_logados = False
-        try:
-             current_url = page.url.lower()
-             title = await page.title()
-             logger.info(f"URL atual: {current_url}")
-             logger.info(f"Título atual: {title}")
+        indice = IndiceCookies()
+        if not indice.sessao_valida():
+            logger.info(f"Cookies críticos vencidos ou ausentes ({indice.resumo()}). Indo direto ao login.")
+        else:
+            try:
+                # Aguarda um momento para possíveis redirecionamentos automáticos por cookie
+                logger.info("Aguardando redirecionamentos automáticos...")
+                await page.wait_for_timeout(5000)
 
-             # Se saiu da tela de login ou foi para uma tela de "Aguardar" ou Dashboard
-             if "entrar.aspx" not in current_url and "account/login" not in current_url:
-                 estamos_logados = True
-                 logger.info("URL mudou (não é mais login). Assumindo logado.")
-             elif "aguardaracao" in current_url:
-                 estamos_logados = True
-                 logger.info("Redirecionado para AguardarAcao. Assumindo logado.")
-             else:
-                 # URL ainda parece ser de login, mas pode ser um falso negativo (estado restaurado)
-                 logger.info("URL ainda é de login. Verificando se botão de login está visível...")
-                 botao_login_visivel = await login_page.is_login_button_visible()
-                 if not botao_login_visivel:
-                     estamos_logados = True
-                     logger.info("Botão de login NÃO está visível. Assumindo que sessão foi restaurada com sucesso!")
-
-             
-             # Verifica presença de elementos da Home se ainda estiver na dúvida
-             # Exemplo: Menu "Força de Vendas"
-             if not estamos_logados:
-                 try:
-                    # Pequeno timeout para check rápido
-                    if await page.get_by_text("Força de Vendas").is_visible(timeout=5000):
+                current_url = page.url.lower()
+                title = await page.title()
+                logger.info(f"URL atual: {current_url}")
+                logger.info(f"Título atual: {title}")
+
+                # Se saiu da tela de login ou foi para uma tela de "Aguardar" ou Dashboard
+                if "entrar.aspx" not in current_url and "account/login" not in current_url:
+                    estamos_logados = True
+                    logger.info("URL mudou (não é mais login). Assumindo logado.")
+                elif "aguardaracao" in current_url:
+                    estamos_logados = True
+                    logger.info("Redirecionado para AguardarAcao. Assumindo logado.")
+                else:
+                    # URL ainda parece ser de login, mas pode ser um falso negativo (estado restaurado)
+                    logger.info("URL ainda é de login. Verificando se botão de login está visível...")
+                    botao_login_visivel = await login_page.is_login_button_visible()
+                    if not botao_login_visivel:
                         estamos_logados = True
-                        logger.info("Elemento 'Força de Vendas' encontrado. Estamos logados!")
-                 except:
-                    pass
+                        logger.info("Botão de login NÃO está visível. Assumindo que sessão foi restaurada com sucesso!")
 
-        except Exception as e:
-             logger.warning(f"Erro ao verificar estado de login: {e}")
+
+                # Verifica presença de elementos da Home se ainda estiver na dúvida
+                # Exemplo: Menu "Força de Vendas"
+                if not estamos_logados:
+                    try:
+                       # Pequeno timeout para check rápido
+                       if await page.get_by_text("Força de Vendas").is_visible(timeout=5000):
+                           estamos_logados = True
+                           logger.info("Elemento 'Força de Vendas' encontrado. Estamos logados!")
+                    except:
+                       pass
+
+            except Exception as e:
+                logger.warning(f"Erro ao verificar estado de login: {e}")
 
         if estamos_logados:
              logger.info("Já estamos logados! Pulando etapas de login...")
 
         if not estamos_logados:
+            login_realizado = True
             # Realiza a interação de login
             nova_pagina = await login_page.realizar_login_externo()
             
@@ -93,7 +204,6 @@ async def run():
                 page = nova_pagina
                 navegador.update_page(page)  # Atualiza também no navegador
                 login_page.page = page
-                ranking_page.page = page
                 logger.info("Todas as páginas atualizadas para a nova aba.")
 
             # --- RE-VERIFICAÇÃO DE LOGIN ---
@@ -133,7 +243,7 @@ async def run():
                      await page.screenshot(path="debug_google_confirmation.png")
                      logger.info("Screenshot salvo em: debug_google_confirmation.png")
         
-        # O estado da sessão será salvo no bloco finally para garantir que seja salvo mesmo em caso de erro
+        # O estado da sessão será salvo no bloco finally (se a sessão for confirmada abaixo)
 
         # --- TRATAMENTO AGUARDAR AÇÃO ---
         # Se estivermos na página de AguardarAcao, devemos esperar ela sair.
@@ -151,31 +261,14 @@ async def run():
                 logger.warning(f"Timeout aguardando Dashboard/Menu. Pode ser que falhe a seguir. Erro: {e}")
 
 
-        # --- TRATAMENTO MODAL ONBOARDING ---
-        # Após o login, pode aparecer um modal de "Novidades na VD+" que precisa ser fechado
-        logger.info("Verificando se há modal de onboarding/novidades...")
-        try:
-            botao_fechar_modal = page.locator("#conteudoSemPainel_onboardingModal_BotaoFecharStep1")
-            if await botao_fechar_modal.is_visible(timeout=5000):
-                logger.info("Modal de onboarding detectado! Fechando...")
-                await botao_fechar_modal.click()
-                await page.wait_for_timeout(1000)  # Aguarda animação de fechamento
-                logger.info("Modal de onboarding fechado com sucesso.")
-        except Exception as e:
-            logger.info(f"Nenhum modal de onboarding detectado (ok, seguindo): {e}")
+        await fechar_modais(page)
 
-        # --- TRATAMENTO MODAL AVISO IMPORTANTE (Painel Superior) ---
-        # Após o login, pode aparecer um painel de "Aviso Importante" de segurança que precisa ser fechado
-        logger.info("Verificando se há painel de aviso importante...")
+        # Menu principal visível confirma a sessão (restaurada ou nova)
         try:
-            botao_fechar_aviso = page.locator("#painelSuperior a.btn-close")
-            if await botao_fechar_aviso.is_visible(timeout=5000):
-                logger.info("Painel de aviso importante detectado! Fechando...")
-                await botao_fechar_aviso.click()
-                await page.wait_for_timeout(1000)  # Aguarda animação de fechamento
-                logger.info("Painel de aviso importante fechado com sucesso.")
+            await page.locator("#menu-cod-4").wait_for(state="visible", timeout=15000)
+            autenticado = True
         except Exception as e:
-            logger.info(f"Nenhum painel de aviso importante detectado (ok, seguindo): {e}")
+            logger.warning(f"Menu principal não encontrado; sessão não confirmada: {e}")
 
         # --- Fluxo de Ranking de Vendas ---
         logger.info("Iniciando fluxo de filtros...")
@@ -192,46 +285,48 @@ async def run():
             {"tipo": "EUD", "estrutura": "22960"}
         ]
 
-        # Loop por cada ciclo configurado
+        cache = CacheResultados()
+        filtro_datas = RankingVendasPage.filtro_datas_faturamento()
+
+        # Ciclos encerrados com resultado guardado não vão ao SGI: o CSV sai do cache
+        combinacoes = []
         for ciclo in ciclos_lista:
-            logger.info(f"========== PROCESSANDO CICLO: {ciclo} ==========")
-            
             for config in configs_base:
-                tipo = config["tipo"]
-                estrutura = config["estrutura"]
-                logger.info(f"--- Iniciando extração: {tipo} (Ciclo: {ciclo}) ---")
-            
-                # 1. Navegar (Garante limpar estado/filtros anteriores)
-                await ranking_page.navegar_para_ranking_vendas()
-                
-                # 2. Selecionar Datas (Faturamento)
-                await ranking_page.selecionar_datas_faturamento()
-                
-                # Preencher estrutura se houver (EUD)
-                if estrutura:
-                    await ranking_page.preencher_estrutura(estrutura)
-                
-                # 3. Selecionar Ciclos (usando o ciclo atual do loop)
-                await ranking_page.selecionar_ciclos(ciclo, ciclo)
-                
-                # 4. Filtros adicionais (Situação Fiscal, Agrupamento) e Buscar
-                await ranking_page.preencher_filtros_adicionais()
-                await ranking_page.buscar()
+                linhas = cache.obter(config["tipo"], ciclo, config["estrutura"], filtro_datas)
+                if linhas is None:
+                    combinacoes.append((ciclo, config))
+                else:
+                    salvar_csv(f"extracoes/resultado_filtros_{config['tipo']}_{ciclo}.csv", linhas)
+        logger.info(f"Combinações a extrair do SGI: {len(combinacoes)} (cache: {len(ciclos_lista) * len(configs_base) - len(combinacoes)})")
+
+        # Combinações (ciclo, VD/EUD) distribuídas entre abas do contexto autenticado,
+        # com timeout e nova tentativa por combinação (PageExecutor)
+        concorrencia = int(os.environ.get("VD_CONCORRENCIA", "3"))
+        url_inicial = page.url
+        if combinacoes and not RankingVendasPage.rota_aprendida(page.context):
+            # Uma caminhada pelos menus na aba principal ensina a rota direta às abas
+            try:
+                await RankingVendasPage(page).navegar_para_ranking_vendas()
+            except Exception as e:
+                logger.warning(f"Rota do Ranking Vendas não aprendida na aba principal; abas partem da home: {e}")
+        executor = PageExecutor(
+            page.context, setup=lambda aba: abrir_aba_ranking(aba, url_inicial), first_page=page,
+            max_pages=concorrencia,
+        )
+        resultados = await executor.run(
+            combinacoes, lambda ranking_page, combinacao: extrair_combinacao(ranking_page, combinacao, cache, filtro_datas)
+        )
+        cache.salvar()
+
+        falhas = 0
+        for resultado in resultados:
+            if not resultado.ok:
+                falhas += 1
+                ciclo, config = resultado.item
+                logger.error(f"[{config['tipo']} {ciclo}] Falha na extração: {resultado.error}")
+        if falhas:
+            logger.warning(f"{falhas}/{len(combinacoes)} extração(ões) falharam.")
 
-                # 5. Extrair e Salvar
-                dados = await ranking_page.extrair_tabela()
-                
-                # Define caminho do arquivo (com ciclo para evitar sobrescrita)
-                caminho_csv = f"extracoes/resultado_filtros_{tipo}_{ciclo}.csv"
-                os.makedirs(os.path.dirname(caminho_csv), exist_ok=True)
-                
-                with open(caminho_csv, mode="w", newline="", encoding="utf-8") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["Gerencia", "Valor Praticado"])
-                    writer.writerows(dados)
-                    
-                logger.info(f"Dados salvos em: {caminho_csv}")
-        
         logger.info(f"========== EXTRAÇÃO COMPLETA: {len(ciclos_lista)} ciclo(s) processado(s) ==========")
 
 
@@ -253,12 +348,22 @@ async def run():
                 logger.error(f"Não foi possível salvar screenshot de erro: {screenshot_err}")
 
     finally:
-        # Sempre salva o estado da sessão antes de fechar
-        try:
-            await navegador.save_state()
-        except Exception as save_err:
-            logger.warning(f"Erro ao salvar estado da sessão: {save_err}")
+        # Salva o estado só com sessão confirmada: uma sessão morta não sobrescreve a anterior
+        if autenticado:
+            try:
+                await navegador.save_state()
+                if login_realizado:
+                    IndiceCookies().registrar_autenticacao()
+            except Exception as save_err:
+                logger.warning(f"Erro ao salvar estado da sessão: {save_err}")
+        else:
+            logger.warning("Sessão não confirmada: state.json NÃO será salvo.")
         
+        logger.info(f"Bloqueio de recursos: {navegador.resumo_bloqueio()}")
+        if navegador.context:
+            metricas = MetricasAcoes.do_contexto(navegador.context)
+            logger.info(f"Latência por ação: {metricas.resumo()}")
+            metricas.salvar()
         await navegador.stop_browser()
 
 if __name__ == "__main__":
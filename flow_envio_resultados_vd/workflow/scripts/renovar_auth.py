@@ -11,6 +11,7 @@ load_dotenv()
 # Adiciona o diretório raiz ao path para garantir importações corretas
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
+from workflow.components.indice_cookies import IndiceCookies
 from workflow.components.navegador import Navegador
 from workflow.pages.loja.login_page import LoginPage
 
@@ -27,7 +28,16 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 async def run():
+    # Sessão com vida de sobra: nada a renovar (sem abrir navegador)
+    indice = IndiceCookies()
+    if os.environ.get("VD_RENOVAR_FORCAR", "0") != "1" and not indice.precisa_renovar():
+        logger.info(f"Sessão ainda válida, renovação dispensada: {indice.resumo()}")
+        return
+    logger.info(f"Sessão perto de vencer (ou renovação forçada): {indice.resumo()}")
+
     navegador = Navegador()
+    # Só o dashboard visível confirma a sessão; só então a autenticação entra no índice
+    sessao_confirmada = False
     try:
         logger.info("Iniciando processo de renovação de autenticação...")
         
@@ -153,6 +163,7 @@ async def run():
                 await page.wait_for_selector("#menu-cod-4", state="visible", timeout=60000)
                 logger.info("Dashboard carregado! Sessão renovada com sucesso.")
                 estamos_logados = True # Confirma login
+                sessao_confirmada = True
             except Exception as e:
                 logger.warning(f"Timeout aguardando Dashboard/Menu. Sessão pode não ter sido totalmente estabelecida. Erro: {e}")
                 # Se falhar aqui, talvez seja melhor não confiar na sessão
@@ -161,13 +172,17 @@ async def run():
             # Se não for AguardarAcao, pode ser que já esteja no Dashboard, vamos tentar validar
             # Aguarda um tempo incondicional para processamento de login/scripts da página
             if estamos_logados: # Só espera se acharmos que estamos logados
-                logger.info("Aguardando 15 segundos para estabilização da página...")
-                await page.wait_for_timeout(15000)
+                logger.info("Aguardando estabilização da página (até 15 segundos)...")
+                try:
+                    await page.get_by_text("Força de Vendas").first.wait_for(state="visible", timeout=15000)
+                except Exception:
+                    pass
 
                 try:
                     if await page.get_by_text("Força de Vendas").is_visible(timeout=60000):
                         logger.info("Dashboard verificado via texto 'Força de Vendas'.")
                         estamos_logados = True
+                        sessao_confirmada = True
                     else:
                         logger.info("Elemento 'Força de Vendas' não encontrado após 60s")
                         # Se não achou, mantemos o estado anterior de estamos_logados ou marcamos como False?
@@ -196,6 +211,11 @@ async def run():
             try:
                 await navegador.save_state()
                 logger.info("Estado salvo com sucesso em state.json")
+                if sessao_confirmada:
+                    indice.registrar_autenticacao()
+                    logger.info(f"Autenticação registrada no índice de cookies: {indice.resumo()}")
+                else:
+                    logger.warning("Dashboard não confirmado: autenticação NÃO registrada no índice de cookies.")
             except Exception as save_err:
                 logger.error(f"Erro ao salvar estado da sessão: {save_err}")
         else:
@@ -18,15 +18,21 @@ import logging
 import os
 from urllib.parse import quote
 
+from workflow.components.gravacao_har import GravacaoHar, modo_har
+from workflow.components.bloqueio_recursos import BloqueadorRecursos, resolver_perfil
+
 logger = logging.getLogger(__name__)
 
 
 class Navegador:
-    def __init__(self):
+    def __init__(self, perfil_bloqueio: str = None):
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
+        self.perfil_bloqueio = resolver_perfil(perfil_bloqueio)
+        self.bloqueador = None
+        self.har = GravacaoHar(modo_har()) if modo_har() else None
 
     async def setup_browser(self):
         """
@@ -40,22 +46,34 @@ class Navegador:
         is_docker = os.path.exists("/.dockerenv")
         headless = True if is_docker else False
 
-        self.browser = await self.playwright.chromium.launch(
-            headless=headless,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--no-sandbox",
-                "--disable-setuid-sandbox"
-            ]
-        )
-
-        self.context = await self.browser.new_context(
-            # viewport={"width": 1366, "height": 768},
-            locale="pt-BR",
-            accept_downloads=True
-        )
+        if self.har and self.har.reproduzindo:
+            self.browser, self.context = await self.har.abrir_navegador_reproducao(self.playwright)
+        else:
+            self.browser = await self.playwright.chromium.launch(
+                headless=headless,
+                args=[
+                    "--disable-blink-features=AutomationControlled",
+                    "--no-sandbox",
+                    "--disable-setuid-sandbox"
+                ]
+            )
+
+            self.context = await self.browser.new_context(
+                # viewport={"width": 1366, "height": 768},
+                locale="pt-BR",
+                accept_downloads=True
+            )
         logger.info(f"Contexto criado (headless={headless}, downloads=ON).")
 
+        # Gravacao/reproducao de HAR (NAVEGADOR_HAR), registrada antes do bloqueio
+        if self.har:
+            await self.har.instalar(self.context)
+
+        # Bloqueio de recursos pesados (imagens, fontes, analytics) conforme o perfil do portal
+        if self.perfil_bloqueio:
+            self.bloqueador = BloqueadorRecursos(self.perfil_bloqueio)
+            await self.bloqueador.instalar(self.context)
+
         # Carrega cookies do state.json manualmente se existir
         script_dir = os.path.dirname(__file__)
         state_path = os.path.join(script_dir, "..", "..", "state.json")
@@ -95,9 +113,15 @@ class Navegador:
         except Exception as e:
             logger.error(f"Erro ao salvar estado da sessao: {e}")
 
+    def resumo_bloqueio(self) -> dict:
+        """Economia do bloqueio de recursos para o wide event (vazio se desativado)."""
+        return self.bloqueador.resumo() if self.bloqueador else {}
+
     async def stop_browser(self):
         """Fecha o browser e limpa os recursos."""
         try:
+            if self.har:
+                await self.har.finalizar(self.context)
             if self.browser:
                 await self.browser.close()
             if self.playwright:
@@ -8,6 +8,9 @@ import os
 import logging
 from datetime import datetime, timezone, timedelta
 
+from workflow.components.espera import Espera
+from workflow.components.metricas_acoes import MetricasAcoes
+
 # Fuso horário de Fortaleza/São Paulo (UTC-3)
 TZ_BRASIL = timezone(timedelta(hours=-3))
 
@@ -19,15 +22,19 @@ class RetaguardaPage:
 
     def __init__(self, page):
         self.page = page
+        self.espera = Espera.da_pagina(page)
+        self.metricas = MetricasAcoes.do_contexto(page.context)
 
     async def realizar_login(self, user: str, password: str):
         """Faz login no sistema Retaguarda."""
         url = "https://cp10356.retaguarda.grupoboticario.com.br/app/#/login" 
         logger.info(f"Navegando para {url}...")
-        await self.page.goto(url, wait_until="domcontentloaded")
+        async with self.metricas.medir("navegar", url):
+            await self.page.goto(url, wait_until="domcontentloaded")
         
         # Garante que o campo de login está presente (usando data-cy conforme fornecido)
-        await self.page.wait_for_selector('[data-cy="login-usuario-input-field"]', timeout=30000)
+        async with self.metricas.medir("aguardar", '[data-cy="login-usuario-input-field"]'):
+            await self.page.wait_for_selector('[data-cy="login-usuario-input-field"]', timeout=30000)
 
         logger.info("Preenchendo credenciais...")
         await self.page.fill('[data-cy="login-usuario-input-field"]', user)
@@ -40,9 +47,12 @@ class RetaguardaPage:
         logger.info("Aguardando carregamento pós-login...")
         try:
             # Espera a URL mudar para a home
-            await self.page.wait_for_url("**/app/#/", timeout=60000)
+            async with self.metricas.medir("aguardar_url", "**/app/#/"):
+                await self.page.wait_for_url("**/app/#/", timeout=60000)
             logger.info("Login realizado com sucesso.")
-            await asyncio.sleep(2)
+            # A rota "#/" casa antes de a SPA terminar de redirecionar: espera a URL parar
+            await self.espera.url_estavel(estavel_ms=500, timeout_ms=10000)
+            await self.espera.dom_quieto(substitui_ms=2000)
         except Exception as e:
             logger.warning(f"Timeout ou erro pós-login: {e}")
 
@@ -50,20 +60,22 @@ class RetaguardaPage:
         """Navega ate a tela de Baixas via link direto."""
         url_baixa = "https://cp10356.retaguarda.grupoboticario.com.br/app/#/estoque/requisicao-mercadoria/cadastro"
         logger.info(f"Navegando diretamente para: {url_baixa}")
-        await self.page.goto(url_baixa, wait_until="domcontentloaded")
+        async with self.metricas.medir("navegar", url_baixa):
+            await self.page.goto(url_baixa, wait_until="domcontentloaded")
         
         # Aguarda o formulário de requisição estar de fato renderizado na SPA
         try:
-            await self.page.wait_for_selector(
-                '[data-cy="select-requisicao-mercadoria-loja-input-field"]',
-                state='visible',
-                timeout=15000
-            )
+            async with self.metricas.medir("aguardar", '[data-cy="select-requisicao-mercadoria-loja-input-field"]'):
+                await self.page.wait_for_selector(
+                    '[data-cy="select-requisicao-mercadoria-loja-input-field"]',
+                    state='visible',
+                    timeout=15000
+                )
         except Exception:
             # Fallback: espera fixa caso o seletor mude
             await asyncio.sleep(3)
         
-        await asyncio.sleep(1)
+        await self.espera.dom_quieto(quieto_ms=300, substitui_ms=1000)
         logger.info("Página de Baixas (Requisicao Mercadoria) acessada.")
 
     async def selecionar_opcao_dropdown(self, selector_input: str, texto_opcao: str, max_tentativas: int = 3):
@@ -75,19 +87,24 @@ class RetaguardaPage:
         option_selector = f'.flora-dropdown__option:has-text("{texto_opcao}")'
 
         for tentativa in range(1, max_tentativas + 1):
+            if tentativa > 1:
+                self.metricas.retentativa("selecionar_dropdown", selector_input)
             try:
                 # Clica no input para abrir o dropdown
-                await self.page.click(selector_input)
+                async with self.metricas.medir("clicar", selector_input):
+                    await self.page.click(selector_input)
                 
                 # Aguarda as opções do dropdown aparecerem de fato
-                await self.page.wait_for_selector(
-                    option_selector,
-                    state='visible',
-                    timeout=10000
-                )
+                async with self.metricas.medir("aguardar", ".flora-dropdown__option"):
+                    await self.page.wait_for_selector(
+                        option_selector,
+                        state='visible',
+                        timeout=10000
+                    )
                 
                 # Clica na opção desejada
-                await self.page.click(option_selector)
+                async with self.metricas.medir("clicar", ".flora-dropdown__option"):
+                    await self.page.click(option_selector)
                 await asyncio.sleep(0.5)
                 return  # Sucesso, sai do loop
                 
@@ -186,16 +203,21 @@ class RetaguardaPage:
         await campo_produto.fill("")
         await campo_produto.type(codigo_produto, delay=50)
 
-        # 2. Aguardar a lista suspensa carregar e clicar no produto
-        await asyncio.sleep(1.5)
+        # 2. Aguardar a lista suspensa carregar (opções ou "sem resultado" paradas) e clicar no produto
+        await self.espera.seletor_estavel(
+            '.flora-dropdown__option:visible, [data-cy="select-list-options-no-result"]',
+            timeout_ms=4000,
+            substitui_ms=1500,
+        )
         nenhum_resultado = modal.locator('[data-cy="select-list-options-no-result"]')
 
         try:
             opcao_produto = self.page.locator(f'.flora-dropdown__option:has-text("{codigo_produto}")').locator("visible=true").first
             
             try:
-                await opcao_produto.wait_for(timeout=4000)
-                await opcao_produto.click()
+                async with self.metricas.medir("selecionar_produto", ".flora-dropdown__option"):
+                    await opcao_produto.wait_for(timeout=4000)
+                    await opcao_produto.click()
                 logger.info(f"Produto {codigo_produto} selecionado da lista.")
             except Exception:
                 if await nenhum_resultado.count() > 0 and await nenhum_resultado.is_visible():
@@ -224,7 +246,8 @@ class RetaguardaPage:
 
         # 4. Clicar no botao Adicionar do modal
         botao_confirmar = modal.locator('button.flora-button--standard:has-text("Adicionar")').first
-        await botao_confirmar.click()
+        async with self.metricas.medir("clicar", 'button.flora-button--standard:has-text("Adicionar")'):
+            await botao_confirmar.click()
         logger.info(f"Produto {codigo_produto} (qtd: {quantidade}) adicionado.")
 
         # 5. Verificar se apareceu o modal de "produto sem estoque suficiente"
@@ -232,7 +255,8 @@ class RetaguardaPage:
         
         try:
             # Aguarda até 4 segundos pelo alerta
-            await self.page.wait_for_selector(botao_continuar, state='visible', timeout=4000)
+            async with self.metricas.medir("aguardar_alerta_saldo", botao_continuar):
+                await self.page.wait_for_selector(botao_continuar, state='visible', timeout=4000)
             logger.info(f"Produto {codigo_produto} sem saldo suficiente. Confirmando continuacao...")
             await self.page.click(botao_continuar)
             # Aguarda o alerta sumir para continuar fluentemente
@@ -242,7 +266,7 @@ class RetaguardaPage:
             pass
 
         logger.info(f"Produto {codigo_produto} processado com sucesso.")
-        await asyncio.sleep(1)
+        await self.espera.dom_quieto(quieto_ms=300, substitui_ms=1000)
 
     async def iterar_produtos_guia(self, produtos: list) -> list:
         """
@@ -269,12 +293,14 @@ class RetaguardaPage:
             modal = self.page.locator('.flora-modal__content, [role="dialog"]').locator("visible=true")
             if await modal.count() == 0:
                 # Clicar no botao 'Adicionar' da pagina para abrir o modal
-                await self.page.click(botao_adicionar_pagina)
+                async with self.metricas.medir("clicar", botao_adicionar_pagina):
+                    await self.page.click(botao_adicionar_pagina)
                 logger.info("Modal de produto aberto.")
                 await asyncio.sleep(1)
 
                 # Aguardar o modal estar visivel
-                await self.page.wait_for_selector('.flora-modal__content, [role="dialog"]', timeout=10000)
+                async with self.metricas.medir("aguardar", '.flora-modal__content, [role="dialog"]'):
+                    await self.page.wait_for_selector('.flora-modal__content, [role="dialog"]', timeout=10000)
 
             # Adicionar o produto dentro do modal
             sucesso = await self.adicionar_produto(codigo, qtd)
@@ -299,9 +325,10 @@ class RetaguardaPage:
         """Clica no botao 'Gravar' para salvar a requisicao de mercadoria."""
         logger.info("Clicando em 'Gravar' para salvar a requisicao...")
         botao_gravar = '[data-cy="requisicao-mercadoria-gravar-button"]'
-        await self.page.click(botao_gravar)
+        async with self.metricas.medir("clicar", botao_gravar):
+            await self.page.click(botao_gravar)
         
-        # Aguarda o sistema processar a gravacao (algum feedback visual ou mudanca de URL)
-        await asyncio.sleep(3)
+        # Aguarda o sistema processar a gravacao (requisicao de gravacao concluida)
+        await self.espera.rede_ociosa(ociosa_ms=1000, substitui_ms=3000)
         logger.info("Requisicao gravada com sucesso.")
 
@@ -19,6 +19,8 @@ else:
 
 sys.path.insert(0, str(BASE_DIR))
 
+from workflow.components.espera import Espera
+from workflow.components.metricas_acoes import MetricasAcoes
 from workflow.components.navegador import Navegador
 from workflow.components.leitor_planilha import ler_planilha_baixas
 from workflow.pages.retaguarda import RetaguardaPage
@@ -189,7 +191,7 @@ async def main():
     logger.info(f"Encontrado(s) {len(arquivos)} arquivo(s) para processar.")
 
     # 3. Inicializar Navegador
-    navegador = Navegador()
+    navegador = Navegador(perfil_bloqueio="retaguarda")
     page = await navegador.setup_browser()
 
     try:
@@ -259,6 +261,12 @@ async def main():
         houve_erro_fatal = True
     finally:
         # 6. Encerrar Browser
+        logger.info(f"Bloqueio de recursos: {navegador.resumo_bloqueio()}")
+        if navegador.page:
+            logger.info(f"Esperas: {Espera.da_pagina(navegador.page).resumo()}")
+            metricas = MetricasAcoes.do_contexto(navegador.context)
+            logger.info(f"Latencia por acao: {metricas.resumo()}")
+            metricas.salvar()
         await navegador.stop_browser()
 
         # Emitir o output para o Kestra
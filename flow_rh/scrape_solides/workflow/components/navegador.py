@@ -18,6 +18,8 @@ import logging
 import os
 from urllib.parse import quote
 
+from workflow.components.gravacao_har import GravacaoHar, modo_har
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +29,7 @@ class Navegador:
         self.browser = None
         self.context = None
         self.page = None
+        self.har = GravacaoHar(modo_har()) if modo_har() else None
 
     async def setup_browser(self):
         """
@@ -40,22 +43,29 @@ class Navegador:
         is_docker = os.path.exists("/.dockerenv")
         headless = True if is_docker else False
 
-        self.browser = await self.playwright.chromium.launch(
-            headless=headless,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--no-sandbox",
-                "--disable-setuid-sandbox"
-            ]
-        )
-
-        self.context = await self.browser.new_context(
-            viewport={"width": 1366, "height": 768},
-            locale="pt-BR",
-            accept_downloads=True
-        )
+        if self.har and self.har.reproduzindo:
+            self.browser, self.context = await self.har.abrir_navegador_reproducao(self.playwright)
+        else:
+            self.browser = await self.playwright.chromium.launch(
+                headless=headless,
+                args=[
+                    "--disable-blink-features=AutomationControlled",
+                    "--no-sandbox",
+                    "--disable-setuid-sandbox"
+                ]
+            )
+
+            self.context = await self.browser.new_context(
+                viewport={"width": 1366, "height": 768},
+                locale="pt-BR",
+                accept_downloads=True
+            )
         logger.info(f"Contexto criado (headless={headless}, downloads=ON).")
 
+        # Gravacao/reproducao de HAR (NAVEGADOR_HAR)
+        if self.har:
+            await self.har.instalar(self.context)
+
         # Carrega cookies do state.json manualmente se existir
         script_dir = os.path.dirname(__file__)
         state_path = os.path.join(script_dir, "..", "..", "state.json")
@@ -98,6 +108,8 @@ class Navegador:
     async def stop_browser(self):
         """Fecha o browser e limpa os recursos."""
         try:
+            if self.har:
+                await self.har.finalizar(self.context)
             if self.browser:
                 await self.browser.close()
             if self.playwright:
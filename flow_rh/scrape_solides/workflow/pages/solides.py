@@ -7,6 +7,9 @@ import asyncio
 import os
 import logging
 
+from workflow.components.espera import Espera
+from workflow.components.metricas_acoes import MetricasAcoes
+
 logger = logging.getLogger(__name__)
 
 # Mapa de filiais disponíveis no sistema (value -> nome legível)
@@ -33,31 +36,39 @@ class SolidesPage:
 
     def __init__(self, page):
         self.page = page
+        self.espera = Espera.da_pagina(page)
+        self.metricas = MetricasAcoes.do_contexto(page.context)
 
     async def realizar_login(self, user: str, password: str):
         """Faz login no sistema Tangerino."""
         url = "https://app.tangerino.com.br/Tangerino/pages/LoginPage"
         logger.info(f"Navegando para {url}...")
-        await self.page.goto(url, wait_until="domcontentloaded")
+        async with self.metricas.medir("navegar", url):
+            await self.page.goto(url, wait_until="domcontentloaded")
         
         # Garante que o campo de login está presente
-        await self.page.wait_for_selector('input[name="login"]', timeout=30000)
+        async with self.metricas.medir("aguardar", 'input[name="login"]'):
+            await self.page.wait_for_selector('input[name="login"]', timeout=30000)
 
         logger.info("Preenchendo credenciais...")
         await self.page.fill('input[name="login"]', user)
         await self.page.fill('input[name="password"]', password)
 
         logger.info("Clicando no botão Entrar...")
-        await self.page.click('input[name="btnLogin"]')
+        async with self.metricas.medir("clicar", 'input[name="btnLogin"]'):
+            await self.page.click('input[name="btnLogin"]')
 
         logger.info("Aguardando carregamento pós-login...")
         try:
             # Espera o menu lateral carregar (um dos itens deve estar 'attached') como prova de login
-            await self.page.wait_for_selector("span.nome-menu", state="attached", timeout=60000)
+            async with self.metricas.medir("aguardar", "span.nome-menu"):
+                await self.page.wait_for_selector("span.nome-menu", state="attached", timeout=60000)
             logger.info("Menus renderizados pós-login.")
             
-            # Pequeno delay adicional para estabilidade de scripts de terceiros
-            await asyncio.sleep(2)
+            # O login ainda redireciona depois dos menus: deixa a URL assentar antes de observar o DOM
+            await self.espera.url_estavel(lambda url: "LoginPage" not in url, estavel_ms=500, timeout_ms=10000)
+            # Aguarda os scripts de terceiros assentarem (antes: delay fixo de 2s)
+            await self.espera.dom_quieto(substitui_ms=2000)
         except Exception as e:
             logger.warning(f"Timeout ou erro esperando renderização dos menus: {e}")
             
@@ -94,36 +105,44 @@ class SolidesPage:
         
         # Selector mais genérico para o menu Ponto
         selector_ponto = 'span.nome-menu:has-text("Ponto")'
-        await self.page.wait_for_selector(selector_ponto, state="visible", timeout=45000)
+        async with self.metricas.medir("aguardar", selector_ponto):
+            await self.page.wait_for_selector(selector_ponto, state="visible", timeout=45000)
         
         try:
-            await self.page.click(selector_ponto, timeout=10000)
+            async with self.metricas.medir("clicar", selector_ponto):
+                await self.page.click(selector_ponto, timeout=10000)
         except Exception:
             logger.warning("Falha no clique simples em 'Ponto', tentando clique forçado...")
+            self.metricas.retentativa("clicar", selector_ponto)
             await self.page.click(selector_ponto, force=True)
             
         await asyncio.sleep(1)
 
         logger.info("Clicando no submenu 'Relatórios'...")
         selector_relat = 'span.nome-menu-nivel-2:has-text("Relatórios")'
-        await self.page.wait_for_selector(selector_relat, state="visible", timeout=30000)
-        await self.page.click(selector_relat)
+        async with self.metricas.medir("clicar", selector_relat):
+            await self.page.wait_for_selector(selector_relat, state="visible", timeout=30000)
+            await self.page.click(selector_relat)
         await asyncio.sleep(1)
 
         logger.info("Clicando em 'Banco de horas / Hora extra'...")
         selector_bh = 'span:has-text("Banco de horas / Hora extra")'
-        await self.page.wait_for_selector(selector_bh, state="visible", timeout=30000)
-        await self.page.click(selector_bh)
+        async with self.metricas.medir("clicar", selector_bh):
+            await self.page.wait_for_selector(selector_bh, state="visible", timeout=30000)
+            await self.page.click(selector_bh)
 
         logger.info("Aguardando carregamento do relatório...")
         try:
-            await self.page.wait_for_selector(
-                'text="Banco de horas / Hora extra"', state="visible", timeout=10000
-            )
+            async with self.metricas.medir("aguardar", 'text="Banco de horas / Hora extra"'):
+                await self.page.wait_for_selector(
+                    'text="Banco de horas / Hora extra"', state="visible", timeout=10000
+                )
         except Exception:
             logger.warning("Texto do relatório demorou a aparecer, continuando...")
 
-        await self.page.wait_for_timeout(5000)
+        # Requisicoes Ajax do Wicket concluidas e formulario assentado (antes: 5s fixos)
+        await self.espera.rede_ociosa(substitui_ms=5000)
+        await self.espera.seletor_estavel('input[name="containerDataInicio:dataInicio"]')
         logger.info("Página de Banco de Horas carregada com sucesso!")
 
     async def selecionar_filial_select2(self, nome_filial: str):
@@ -137,7 +156,8 @@ class SolidesPage:
         select2_container = self.page.locator(
             'select.dropdown-empresa'
         ).locator('xpath=..').locator('.select2-selection')
-        await select2_container.click()
+        async with self.metricas.medir("clicar", "select.dropdown-empresa .select2-selection"):
+            await select2_container.click()
         await asyncio.sleep(1)
 
         # 2. Digita o nome da filial no campo de busca do Select2
@@ -147,7 +167,8 @@ class SolidesPage:
 
         # 3. Clica na opção que aparece no dropdown
         option = self.page.locator(f'.select2-results__option:has-text("{nome_filial}")')
-        await option.click()
+        async with self.metricas.medir("clicar", ".select2-results__option"):
+            await option.click()
         await asyncio.sleep(1)
 
         logger.info(f"Filial '{nome_filial}' selecionada.")
@@ -179,11 +200,13 @@ class SolidesPage:
         select2_container = self.page.locator(
             'select.containerFormat'
         ).locator('xpath=..').locator('.select2-selection')
-        await select2_container.click()
+        async with self.metricas.medir("clicar", "select.containerFormat .select2-selection"):
+            await select2_container.click()
         await asyncio.sleep(1)
 
         option = self.page.locator('.select2-results__option:has-text("Excel")')
-        await option.click()
+        async with self.metricas.medir("clicar", ".select2-results__option"):
+            await option.click()
         await asyncio.sleep(1)
 
         logger.info("Formato Excel selecionado.")
@@ -198,13 +221,14 @@ class SolidesPage:
         download_dir = os.path.join(base_dir, "relatorios")
         os.makedirs(download_dir, exist_ok=True)
         
-        async with self.page.expect_download(timeout=120000) as download_info:
-            await self.page.click(
-                'input.botaoConsultar[value="Gerar Relatório"]',
-                no_wait_after=True,
-            )
-            
-        download = await download_info.value
+        async with self.metricas.medir("baixar_relatorio", 'input.botaoConsultar[value="Gerar Relatório"]'):
+            async with self.page.expect_download(timeout=120000) as download_info:
+                await self.page.click(
+                    'input.botaoConsultar[value="Gerar Relatório"]',
+                    no_wait_after=True,
+                )
+                
+            download = await download_info.value
         file_path = os.path.join(download_dir, download.suggested_filename)
         
         logger.info(f"Salvando download em: {file_path}")
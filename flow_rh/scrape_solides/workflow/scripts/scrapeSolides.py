@@ -22,6 +22,8 @@ sys.path.insert(0, str(PROJECT_ROOT))
 
 from dotenv import load_dotenv
 from workflow.components.log_setup import setup_file_logging
+from workflow.components.espera import Espera
+from workflow.components.metricas_acoes import MetricasAcoes
 from workflow.components.navegador import Navegador
 from workflow.pages.solides import SolidesPage, FILIAIS
 
@@ -299,6 +301,11 @@ async def main():
         logger.error(f"Erro crítico durante a automação: {e}", exc_info=True)
         enviar_status_wa(f"❌ *Erro Crítico:* {str(e)}", args.remoteJid, args.ev_url, args.ev_key, args.ev_instance)
     finally:
+        if nav.page:
+            logger.info(f"Esperas: {Espera.da_pagina(nav.page).resumo()}")
+            metricas = MetricasAcoes.do_contexto(nav.context)
+            logger.info(f"Latencia por acao: {metricas.resumo()}")
+            metricas.salvar()
         await nav.stop_browser()
 
 